@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_perf_indexes'),
+    ]
+
+    # Trigram indexes for campshub360.typeahead
+    operations = [
+        # Other apps' trigram indexes use it too, so reversing leaves it installed
+        migrations.RunSQL('CREATE EXTENSION IF NOT EXISTS pg_trgm;', migrations.RunSQL.noop),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS course_code_trgm ON academics_course USING gin (code gin_trgm_ops);\n"
+                "CREATE INDEX IF NOT EXISTS course_title_trgm ON academics_course USING gin (title gin_trgm_ops);\n"
+            ),
+            reverse_sql=(
+                "DROP INDEX IF EXISTS course_code_trgm;\n"
+                "DROP INDEX IF EXISTS course_title_trgm;\n"
+            ),
+        ),
+    ]
@@ -0,0 +1,178 @@
+"""
+Bulk provisioning of login accounts.
+
+``User.objects.create_user`` runs the full password hasher for every account
+and the per-row signals add a few more queries each, which dominates batch
+onboarding. ``UserProvisioner`` creates many users and their
+``AuthIdentifier`` rows with a handful of queries:
+
+- the shared default password is hashed once per batch (or once per user,
+  fanned out over a thread pool, with ``ACCOUNT_PROVISIONING_UNIQUE_SALTS``);
+- usernames/emails already taken are found with one query and skipped;
+- users and identifiers are written with ``bulk_create``.
+
+Linking users back to their profile rows is left to the caller (see
+``students.services.provision_student_logins`` and
+``faculty.services.provision_faculty_logins``), normally with one
+``bulk_update``.
+
+Code paths that save profiles one at a time (serializers, ``Model.save``) can
+still batch their logins by running inside ``defer_login_provisioning()``;
+the per-row hooks call ``defer_login()`` and skip their own ``create_user``.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AuthIdentifier
+
+User = get_user_model()
+
+# Below this many passwords a thread pool costs more than it saves
+PARALLEL_HASH_THRESHOLD = 8
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash each password with its own salt, in parallel.
+
+    Django's PBKDF2/bcrypt/argon2 hashers spend their time in C code that
+    releases the GIL, so threads scale with cores without a process pool.
+    """
+    passwords = list(passwords)
+    if len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    workers = workers or getattr(settings, 'ACCOUNT_PROVISIONING_HASH_WORKERS', None) or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+class UserProvisioner:
+    """Collect accounts with ``add()`` and create them all with ``provision()``."""
+
+    def __init__(self, default_password, is_staff=False, batch_size=None, unique_salts=None, workers=None):
+        self.default_password = default_password
+        self.is_staff = is_staff
+        self.batch_size = batch_size or getattr(settings, 'ACCOUNT_PROVISIONING_BATCH_SIZE', 1000)
+        if unique_salts is None:
+            unique_salts = getattr(settings, 'ACCOUNT_PROVISIONING_UNIQUE_SALTS', False)
+        self.unique_salts = unique_salts
+        self.workers = workers
+        self.accounts = []
+        # (key, username, reason) for accounts that were not created
+        self.skipped = []
+
+    def add(self, key, username, email, identifiers=(), password=None):
+        """Queue an account.
+
+        ``key`` is returned alongside the created user. ``identifiers`` are
+        ``(identifier, id_type, is_primary, is_verified)`` tuples.
+        ``password`` defaults to the batch's default password.
+        """
+        self.accounts.append({
+            'key': key,
+            'username': username,
+            'email': User.objects.normalize_email(email) if email else '',
+            'identifiers': list(identifiers),
+            'password': password,
+        })
+
+    def provision(self):
+        """Create the queued users and identifiers. Returns ``[(key, user), ...]``."""
+        accounts = self.claimable()
+        if not accounts:
+            return []
+
+        passwords = self.hashed_passwords(accounts)
+        now = timezone.now()
+        users, identifiers = [], []
+        for account, password in zip(accounts, passwords):
+            user = User(
+                username=account['username'],
+                email=account['email'],
+                password=password,
+                password_updated_at=now,
+                is_active=True,
+                is_staff=self.is_staff,
+            )
+            users.append(user)
+            for identifier, id_type, is_primary, is_verified in account['identifiers']:
+                identifiers.append(AuthIdentifier(
+                    user=user, identifier=identifier, id_type=id_type,
+                    is_primary=is_primary, is_verified=is_verified,
+                ))
+
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        AuthIdentifier.objects.bulk_create(identifiers, batch_size=self.batch_size, ignore_conflicts=True)
+        self.accounts = []
+        return [(account['key'], user) for account, user in zip(accounts, users)]
+
+    def claimable(self):
+        """Drop accounts without an email or whose username/email is taken (in the DB or earlier in the batch)."""
+        usernames = [account['username'] for account in self.accounts if account['username']]
+        emails = [account['email'] for account in self.accounts if account['email']]
+        taken = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+        taken_names, taken_emails = set(), set()
+        for username, email in taken.values_list('username', 'email'):
+            taken_names.add(username)
+            taken_emails.add(email.lower())
+
+        accounts = []
+        for account in self.accounts:
+            username, email = account['username'], account['email']
+            if not email:
+                self.skipped.append((account['key'], username, 'no email address'))
+            elif username in taken_names or email.lower() in taken_emails:
+                self.skipped.append((account['key'], username, 'username or email already in use'))
+            else:
+                taken_names.add(username)
+                taken_emails.add(email.lower())
+                accounts.append(account)
+        return accounts
+
+    def hashed_passwords(self, accounts):
+        if self.unique_salts:
+            return hash_passwords(
+                [account['password'] or self.default_password for account in accounts], self.workers
+            )
+        shared = make_password(self.default_password)
+        custom = [account['password'] for account in accounts if account['password']]
+        hashed = iter(hash_passwords(custom, self.workers))
+        return [next(hashed) if account['password'] else shared for account in accounts]
+
+
+_deferred = ContextVar('deferred_logins', default=None)
+
+
+@contextmanager
+def defer_login_provisioning():
+    """Batch the logins created by per-row hooks inside the block.
+
+    On exit each deferred group is handed to its provisioning function, e.g.
+    ``students.services.provision_student_logins``. If the block raises,
+    nothing is provisioned.
+    """
+    pending = {}
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    for provision, instances in pending.items():
+        provision(list(instances.values()))
+
+
+def defer_login(instance, provision):
+    """Queue ``instance`` for ``provision`` when a deferral is active. Returns True if deferred."""
+    pending = _deferred.get()
+    if pending is None:
+        return False
+    pending.setdefault(provision, {})[id(instance)] = instance
+    return True
@@ -4,8 +4,29 @@ from django.contrib.auth.signals import user_logged_in, user_logged_out, user_lo
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from .models import AuditLog, User, FailedLogin
+from contextlib import contextmanager
+from contextvars import ContextVar
 import json
 
+_deferred_audit_logs = ContextVar('deferred_audit_logs', default=None)
+
+
+@contextmanager
+def defer_audit_logs():
+    """Collect audit logs created inside the block and write them with one bulk_create.
+
+    Used around bulk deletes, where every cascaded row would otherwise insert
+    its own log. If the block raises, the collected logs are dropped.
+    """
+    pending = []
+    token = _deferred_audit_logs.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred_audit_logs.reset(token)
+    if pending:
+        AuditLog.objects.bulk_create(pending, batch_size=1000)
+
 
 def get_client_ip(request):
     """Get client IP address from request"""
@@ -26,7 +47,7 @@ def create_audit_log(user, action, object_type=None, object_id=None, request=Non
         ip = get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
     
-    AuditLog.objects.create(
+    log = AuditLog(
         user=user,
         action=action,
         object_type=object_type or '',
@@ -35,6 +56,11 @@ def create_audit_log(user, action, object_type=None, object_id=None, request=Non
         user_agent=user_agent,
         meta=meta or {}
     )
+    pending = _deferred_audit_logs.get()
+    if pending is not None:
+        pending.append(log)
+    else:
+        log.save()
 
 
 @receiver(user_logged_in)
@@ -94,4 +94,5 @@ class RollOrEmailTokenSerializer(TokenObtainPairSerializer):
 class RollOrEmailTokenView(TokenObtainPairView):
     permission_classes = [AllowAny]
     serializer_class = RollOrEmailTokenSerializer
+    throttle_scope = 'login'
 
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from uploads.serializers import StoredFileFieldsMixin
 from .models import (
     Assignment, AssignmentSubmission, AssignmentFile, 
     AssignmentGrade, AssignmentComment, AssignmentCategory,
@@ -21,7 +22,7 @@ class AssignmentCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class AssignmentFileSerializer(serializers.ModelSerializer):
+class AssignmentFileSerializer(StoredFileFieldsMixin, serializers.ModelSerializer):
     """Serializer for AssignmentFile model"""
     
     file_url = serializers.SerializerMethodField()
@@ -37,6 +38,14 @@ class AssignmentFileSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'file_size', 'uploaded_at', 'created_at', 'updated_at'
         ]
+        extra_kwargs = {'file_name': {'required': False}}
+    stored_file_fields = {'file_path': 'upload_id'}
+    
+    def stored_file_attrs(self, file_field, stored_file, filename):
+        return {
+            'file_name': self.initial_data.get('file_name') or filename,
+            'mime_type': stored_file.content_type,
+        }
     
     def get_file_url(self, obj):
         """Get the URL for the file"""
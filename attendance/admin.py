@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import AttendanceSession, AttendanceRecord
+from django.db import transaction
+
+from .models import AttendanceArchive, AttendanceSession, AttendanceRecord
+from .summary import uncount_records
 
 
 @admin.register(AttendanceSession)
@@ -17,3 +20,19 @@ class AttendanceRecordAdmin(admin.ModelAdmin):
     search_fields = ['student__roll_number', 'student__user__first_name', 'student__user__last_name']
     ordering = ['session__date', 'student__roll_number']
 
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        uncount_records(AttendanceRecord.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        uncount_records(queryset)
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(AttendanceArchive)
+class AttendanceArchiveAdmin(admin.ModelAdmin):
+    list_display = ['academic_year', 'semester', 'records', 'first_date', 'last_date', 'file', 'archived_at']
+    readonly_fields = [field.name for field in AttendanceArchive._meta.fields]
@@ -6,3 +6,7 @@ class AttendanceConfig(AppConfig):
     name = 'attendance'
     verbose_name = 'Attendance'
 
+    def ready(self) -> None:
+        # Import signals
+        from . import signals  # noqa: F401
+        return super().ready()
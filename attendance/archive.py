@@ -0,0 +1,124 @@
+"""
+Archival of closed terms' attendance records.
+
+``AttendanceRecord`` grows by enrolled students x sessions every teaching
+day and nothing ever removed rows, so queries and vacuum over the current
+term kept paying for every past one. ``archive_term()`` moves a closed term
+(every course section of the academic year and semester inactive) out of
+the table:
+
+1. its records are streamed, oldest first, into a gzip-compressed CSV in
+   the default storage under ``ATTENDANCE_ARCHIVE_DIR``, one row per record
+   with the session date and the student's roll number alongside the ids;
+2. an ``AttendanceArchive`` row notes the file and the record count;
+3. the exported records are deleted by id, ``ARCHIVE_BATCH_SIZE`` per
+   statement and transaction, so locks stay short.
+
+The term's sessions stay, and so do its ``AttendanceSummary`` rows: they
+are the term's totals from now on, and ``reconcile_attendance_summary()``
+leaves archived terms alone. If a run is interrupted after the export, run
+it again: the leftover records go to a second file.
+
+Native range partitioning was not used: the partition key (the session
+date) is not on the record table, and Postgres requires it in the primary
+key and in the ``(session, student)`` unique key the attendance upserts
+conflict on.
+"""
+
+import csv
+import gzip
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, router, transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from academics.models import CourseSection
+from students.overview import invalidate_overviews
+
+from .models import AttendanceArchive, AttendanceRecord
+
+ARCHIVE_BATCH_SIZE = 5000
+# CSV header: lookup
+COLUMNS = {
+    'id': 'id', 'session_id': 'session_id', 'session_date': 'session__date',
+    'start_time': 'session__start_time', 'course_section_id': 'session__course_section_id',
+    'session_cancelled': 'session__is_cancelled', 'student_id': 'student_id',
+    'roll_number': 'student__roll_number', 'status': 'status', 'check_in_time': 'check_in_time',
+    'remarks': 'remarks', 'marked_at': 'marked_at', 'created_at': 'created_at', 'updated_at': 'updated_at',
+}
+
+
+def archived_sections(using=None):
+    """Course sections of the archived terms"""
+    terms = AttendanceArchive.objects.using(using).values_list('academic_year', 'semester').distinct()
+    query = Q()
+    for academic_year, semester in terms:
+        query |= Q(academic_year=academic_year, semester=semester)
+    if not query:
+        return CourseSection.objects.using(using).none()
+    return CourseSection.objects.using(using).filter(query)
+
+
+def term_records(academic_year, semester, using=None):
+    return AttendanceRecord.objects.using(using).filter(
+        session__course_section__academic_year=academic_year, session__course_section__semester=semester,
+    )
+
+
+def _delete(ids, using):
+    connection = connections[using]
+    table = connection.ops.quote_name(AttendanceRecord._meta.db_table)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(ids))})', ids)
+
+
+def archive_term(academic_year, semester, using=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Export the term's records to a compressed CSV and delete them.
+
+    Raises ``ValidationError`` unless the term has course sections and all
+    of them are inactive. Returns the ``AttendanceArchive``, or ``None`` if
+    the term had no records left.
+    """
+    using = using or router.db_for_write(AttendanceRecord)
+    sections = CourseSection.objects.using(using).filter(academic_year=academic_year, semester=semester)
+    if not sections.exists():
+        raise ValidationError(f'No course sections in {academic_year} {semester}.')
+    if sections.filter(is_active=True).exists():
+        raise ValidationError(f'{academic_year} {semester} still has active course sections.')
+
+    records = term_records(academic_year, semester, using)
+    span = records.aggregate(first=Min('session__date'), last=Max('session__date'))
+    ids = []
+    students = set()
+    with tempfile.TemporaryFile() as handle:
+        with gzip.open(handle, 'wt', newline='') as export:
+            writer = csv.writer(export)
+            writer.writerow(COLUMNS)
+            for row in records.order_by('id').values_list(*COLUMNS.values()).iterator(chunk_size=batch_size):
+                writer.writerow(row)
+                ids.append(row[0])
+                students.add(row[6])
+        if not ids:
+            return None
+        handle.seek(0)
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+        directory = getattr(settings, 'ATTENDANCE_ARCHIVE_DIR', 'archives/attendance')
+        name = default_storage.save(
+            f'{directory}/attendance-{slugify(academic_year)}-{slugify(semester)}-{stamp}.csv.gz', File(handle),
+        )
+
+    archive = AttendanceArchive.objects.using(using).create(
+        academic_year=academic_year, semester=semester, file=name, records=len(ids),
+        first_date=span['first'], last_date=span['last'],
+    )
+    for start in range(0, len(ids), batch_size):
+        _delete(ids[start:start + batch_size], using)
+    invalidate_overviews(students)
+    return archive
@@ -0,0 +1,21 @@
+import django_filters
+
+from .models import AttendanceShortage
+
+
+class AttendanceShortageFilter(django_filters.FilterSet):
+    """Filter for AttendanceShortage model; the latest snapshot unless ``snapshot_date`` is given"""
+
+    percentage_max = django_filters.NumberFilter(field_name='percentage', lookup_expr='lte')
+    course = django_filters.NumberFilter(field_name='course_section__course')
+    mentor = django_filters.UUIDFilter(method='filter_mentor', help_text='Faculty id; their active mentees')
+
+    class Meta:
+        model = AttendanceShortage
+        fields = ['snapshot_date', 'course_section', 'course', 'department', 'student', 'is_new', 'percentage_max', 'mentor']
+
+    def filter_mentor(self, queryset, name, value):
+        from mentoring.models import Mentorship
+
+        mentees = Mentorship.objects.filter(mentor=value, is_active=True).values('student_id')
+        return queryset.filter(student_id__in=mentees)
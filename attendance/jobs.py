@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.runner import register
+
+from .services import generate_sessions
+from .shortages import build_shortage_snapshot
+from .summary import reconcile_attendance_summary
+from .sync import purge_sync_batches
+
+
+@register('attendance.generate_sessions')
+def generate_upcoming_sessions(ctx, days=None):
+    """Create the missing sessions of the next ``days`` days (ATTENDANCE_SESSION_WINDOW_DAYS by default)"""
+    days = days or getattr(settings, 'ATTENDANCE_SESSION_WINDOW_DAYS', 14)
+    start = timezone.localdate()
+    return generate_sessions(start, start + timedelta(days=days - 1))
+
+
+@register('attendance.reconcile_summary')
+def reconcile_summary(ctx, course_section_id=None):
+    """Recount the attendance summary; returns the number of corrected rows"""
+    drift = reconcile_attendance_summary(course_section_id=course_section_id)
+    return {'corrected': len(drift)}
+
+
+@register('attendance.shortage_snapshot')
+def shortage_snapshot(ctx, threshold=None):
+    """Write today's attendance shortage snapshot"""
+    result = build_shortage_snapshot(threshold=threshold)
+    return {**result, 'snapshot_date': result['snapshot_date'].isoformat()}
+
+
+@register('attendance.purge_sync_batches')
+def purge_sync_keys(ctx):
+    """Forget offline sync idempotency keys past ATTENDANCE_SYNC_KEY_RETENTION_DAYS"""
+    return {'deleted': purge_sync_batches()}
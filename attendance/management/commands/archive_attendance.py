@@ -0,0 +1,61 @@
+"""
+Archive the attendance records of closed terms.
+
+    python manage.py archive_attendance --academic-year 2023-2024 --semester Fall [--dry-run]
+    python manage.py archive_attendance --closed [--dry-run]
+
+Each term (academic year and semester of its course sections) must have
+every section inactive. Its records are exported to a gzip-compressed CSV
+in the default storage (``ATTENDANCE_ARCHIVE_DIR``) and removed from the
+record table; sessions and attendance summaries stay (see
+``attendance.archive``). ``--closed`` archives every closed term that still
+has records. ``--dry-run`` only counts.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from academics.models import CourseSection
+from attendance.archive import ARCHIVE_BATCH_SIZE, archive_term, term_records
+
+
+class Command(BaseCommand):
+    help = 'Export closed terms\' attendance records to compressed CSV and remove them from the record table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help='e.g. 2023-2024')
+        parser.add_argument('--semester', help='e.g. Fall')
+        parser.add_argument('--closed', action='store_true', help='Archive every closed term that still has records')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Records deleted per statement')
+        parser.add_argument('--dry-run', action='store_true', help='Count the records without archiving')
+
+    def handle(self, *args, **options):
+        if options['closed']:
+            terms = [
+                (row['academic_year'], row['semester'])
+                for row in CourseSection.objects.order_by('academic_year', 'semester').values(
+                    'academic_year', 'semester',
+                ).annotate(active=Count('id', filter=Q(is_active=True))).filter(active=0)
+            ]
+        elif options['academic_year'] and options['semester']:
+            terms = [(options['academic_year'], options['semester'])]
+        else:
+            raise CommandError('Pass --academic-year and --semester, or --closed.')
+
+        for academic_year, semester in terms:
+            if options['dry_run']:
+                count = term_records(academic_year, semester).count()
+                self.stdout.write(f'{academic_year} {semester}: {count} records would be archived')
+                continue
+            try:
+                archive = archive_term(academic_year, semester, batch_size=options['batch_size'])
+            except ValidationError as e:
+                raise CommandError(' '.join(e.messages))
+            if archive is None:
+                self.stdout.write(f'{academic_year} {semester}: no records left')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{academic_year} {semester}: archived {archive.records} records '
+                    f'({archive.first_date} to {archive.last_date}) to {archive.file}'
+                ))
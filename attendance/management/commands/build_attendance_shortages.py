@@ -0,0 +1,32 @@
+"""
+Write the day's attendance shortage snapshot.
+
+    python manage.py build_attendance_shortages [--date YYYY-MM-DD] [--threshold 75]
+
+Lists every active student below the threshold (``ATTENDANCE_SHORTAGE_THRESHOLD``
+by default) in each active course section, from the attendance summary (see
+``attendance.shortages``). Run it early each morning (e.g. from cron, or
+queue the ``attendance.shortage_snapshot`` job) so the day's shortage lists
+are ready before the first requests. Re-running replaces that day's snapshot.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from attendance.shortages import build_shortage_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write the attendance shortage snapshot for a day (today by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Snapshot date YYYY-MM-DD')
+        parser.add_argument('--threshold', type=float, help='Attendance percentage below which students are listed')
+
+    def handle(self, *args, **options):
+        result = build_shortage_snapshot(options['date'], options['threshold'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Shortage snapshot for {result['snapshot_date']}: {result['shortages']} students below the threshold, "
+            f"{result['new']} new since the previous snapshot"
+        ))
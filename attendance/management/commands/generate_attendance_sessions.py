@@ -1,66 +1,59 @@
+"""
+Create attendance sessions from the active timetable.
+
+    python manage.py generate_attendance_sessions --start 2025-01-06 --end 2025-05-30
+    python manage.py generate_attendance_sessions --days 14 --records
+
+Give a date range, or ``--days N`` for the N days from today. Holidays and
+breaks in the academic calendar are skipped, and sessions that already exist
+are left alone, so the command is safe to re-run. Run the rolling form
+nightly (e.g. from cron, or queue the ``attendance.generate_sessions`` job)
+to keep the coming weeks populated. ``--records`` also creates the default
+record of every enrolled student for the range's sessions.
+"""
+
 from datetime import date, timedelta
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
 
-from academics.models import Timetable
 from attendance.models import AttendanceSession
+from attendance.services import generate_records, generate_sessions
 
 
 class Command(BaseCommand):
     help = 'Generate AttendanceSession entries from Timetable for a given date range.'
 
     def add_arguments(self, parser):
-        parser.add_argument('--start', type=str, required=True, help='Start date YYYY-MM-DD')
-        parser.add_argument('--end', type=str, required=True, help='End date YYYY-MM-DD')
+        parser.add_argument('--start', type=str, help='Start date YYYY-MM-DD')
+        parser.add_argument('--end', type=str, help='End date YYYY-MM-DD')
+        parser.add_argument('--days', type=int, help='Rolling window: the N days starting today')
         parser.add_argument('--section-id', type=int, help='Optional CourseSection ID to limit generation')
+        parser.add_argument('--records', action='store_true', help='Also create attendance records')
 
     def handle(self, *args, **options):
-        start = date.fromisoformat(options['start'])
-        end = date.fromisoformat(options['end'])
-        section_id = options.get('section_id')
-
+        if options['days']:
+            start = timezone.localdate()
+            end = start + timedelta(days=options['days'] - 1)
+        elif options['start'] and options['end']:
+            start = date.fromisoformat(options['start'])
+            end = date.fromisoformat(options['end'])
+        else:
+            raise CommandError('Give --start and --end, or --days')
         if end < start:
-            self.stderr.write('End date must be after start date')
-            return
-
-        days_map = {
-            'MON': 0,
-            'TUE': 1,
-            'WED': 2,
-            'THU': 3,
-            'FRI': 4,
-            'SAT': 5,
-            'SUN': 6,
-        }
-
-        timetables = Timetable.objects.filter(is_active=True)
-        if section_id:
-            timetables = timetables.filter(course_section_id=section_id)
-
-        by_weekday = {}
-        for t in timetables.select_related('course_section'):
-            by_weekday.setdefault(days_map[t.day_of_week], []).append(t)
-
-        created_count = 0
-        with transaction.atomic():
-            current = start
-            while current <= end:
-                weekday = current.weekday()
-                for t in by_weekday.get(weekday, []):
-                    session, created = AttendanceSession.objects.get_or_create(
-                        course_section=t.course_section,
-                        date=current,
-                        start_time=t.start_time,
-                        defaults={
-                            'end_time': t.end_time,
-                            'room': t.room,
-                            'timetable': t,
-                        }
-                    )
-                    if created:
-                        created_count += 1
-                current += timedelta(days=1)
-
-        self.stdout.write(self.style.SUCCESS(f'Created {created_count} attendance sessions.'))
+            raise CommandError('End date must be after start date')
+        section_id = options.get('section_id')
 
+        result = generate_sessions(start, end, section_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} attendance sessions ({result['existing']} already existed, "
+            f"{result['skipped_days']} non-teaching days skipped)."
+        ))
+        if options['records']:
+            sessions = AttendanceSession.objects.filter(date__range=(start, end), is_cancelled=False)
+            if section_id:
+                sessions = sessions.filter(course_section_id=section_id)
+            records = generate_records(sessions)
+            self.stdout.write(self.style.SUCCESS(
+                f"Created {records['created']} attendance records for {records['sessions']} sessions."
+            ))
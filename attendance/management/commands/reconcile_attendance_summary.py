@@ -0,0 +1,29 @@
+"""
+Rebuild the attendance summary from the attendance records.
+
+    python manage.py reconcile_attendance_summary [--section-id ID]
+
+The per-student, per-section counters are maintained incrementally (see
+``attendance.summary``); run this periodically (e.g. nightly from cron, or
+queue the ``attendance.reconcile_summary`` job) to correct drift from writes
+that bypass the ORM. Drifted rows are reported.
+"""
+
+from django.core.management.base import BaseCommand
+
+from attendance.summary import reconcile_attendance_summary
+
+
+class Command(BaseCommand):
+    help = 'Recount the attendance summary and report drifted rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--section-id', type=int, help='Only reconcile this CourseSection')
+        parser.add_argument('--database', default=None, help='Database alias to reconcile')
+
+    def handle(self, *args, **options):
+        drift = reconcile_attendance_summary(using=options['database'], course_section_id=options['section_id'])
+        for (student_id, section_id), (stored, actual) in sorted(drift.items(), key=lambda item: str(item[0])):
+            self.stdout.write(f'student {student_id} section {section_id}: {stored} -> {actual}')
+        style = self.style.WARNING if drift else self.style.SUCCESS
+        self.stdout.write(style(f'Reconciled attendance summary; {len(drift)} rows corrected'))
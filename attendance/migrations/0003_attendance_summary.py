@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-17 05:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_summary(apps, schema_editor):
+    # Counted with attendance.summary so the initial rows match what the
+    # receivers maintain; it only reads records and their sessions.
+    from attendance.summary import reconcile_attendance_summary
+    reconcile_attendance_summary(using=schema_editor.connection.alias)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_course_trgm_indexes'),
+        ('attendance', '0002_perf_indexes'),
+        ('students', '0011_student_custom_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('excused', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course_section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academics.coursesection')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='students.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance summaries',
+                'indexes': [models.Index(fields=['course_section', 'student'], name='attendance_summary_section_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'course_section'), name='attendance_summary_student_section')],
+            },
+        ),
+        migrations.RunPython(build_summary, migrations.RunPython.noop),
+    ]
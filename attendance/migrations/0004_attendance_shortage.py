@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-17 05:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_course_trgm_indexes'),
+        ('attendance', '0003_attendance_summary'),
+        ('students', '0011_student_custom_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceShortage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('attended', models.IntegerField()),
+                ('total', models.IntegerField()),
+                ('percentage', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('is_new', models.BooleanField(default=False)),
+                ('course_section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_shortages', to='academics.coursesection')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academics.department')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_shortages', to='students.student')),
+            ],
+            options={
+                'ordering': ['percentage', 'id'],
+                'indexes': [models.Index(fields=['snapshot_date', 'course_section', 'percentage'], name='att_shortage_section_idx'), models.Index(fields=['snapshot_date', 'department', 'percentage'], name='att_shortage_dept_idx'), models.Index(fields=['snapshot_date', 'student'], name='att_shortage_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('snapshot_date', 'student', 'course_section'), name='attendance_shortage_unique')],
+            },
+        ),
+    ]
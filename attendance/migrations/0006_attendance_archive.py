@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-17 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendance_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(max_length=9)),
+                ('semester', models.CharField(max_length=20)),
+                ('file', models.CharField(help_text='Storage name of the .csv.gz export', max_length=255)),
+                ('records', models.IntegerField()),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='attendancerecord',
+            options={},
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -36,13 +38,124 @@ class AttendanceRecord(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PRESENT')
     check_in_time = models.DateTimeField(null=True, blank=True)
     remarks = models.TextField(blank=True)
+    # When the status was taken, for last-writer-wins offline sync (see attendance.sync):
+    # the device's clock for synced marks, the server's for every other write
+    marked_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # No default ordering: it joined students into every query; order explicitly where it matters
         unique_together = ('session', 'student')
-        ordering = ['student__roll_number']
+        indexes = [
+            # Sync deltas page through changes by (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='attendancerecord_changes_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.roll_number} - {self.session.date} - {self.status}"
 
+
+
+class AttendanceSyncBatch(models.Model):
+    """A sync batch already applied, kept so a retry with the same key gets the same response."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=100)
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='attendance_sync_batch_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
+
+
+class AttendanceArchive(models.Model):
+    """The records of a closed term, exported to a compressed CSV and removed from ``AttendanceRecord``.
+
+    Written by ``attendance.archive``. The term's sessions and summary rows stay.
+    """
+    academic_year = models.CharField(max_length=9)
+    semester = models.CharField(max_length=20)
+    file = models.CharField(max_length=255, help_text="Storage name of the .csv.gz export")
+    records = models.IntegerField()
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return f"{self.academic_year} {self.semester}: {self.records} records"
+
+
+class AttendanceSummary(models.Model):
+    """Attendance counters of one student in one course section.
+
+    Only records of sessions that are not cancelled count. Maintained
+    incrementally and reconciled periodically by ``attendance.summary``.
+    """
+    student = models.ForeignKey('students.Student', on_delete=models.CASCADE, related_name='attendance_summaries')
+    course_section = models.ForeignKey('academics.CourseSection', on_delete=models.CASCADE, related_name='attendance_summaries')
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    excused = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Attendance summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course_section'], name='attendance_summary_student_section'),
+        ]
+        indexes = [
+            models.Index(fields=['course_section', 'student'], name='attendance_summary_section_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} in {self.course_section_id}: {self.attended}/{self.total}"
+
+    @property
+    def attended(self):
+        """Late counts as attended"""
+        return self.present + self.late
+
+    @property
+    def percentage(self):
+        return round(self.attended * 100 / self.total, 2) if self.total else None
+
+
+class AttendanceShortage(models.Model):
+    """A student below the attendance threshold in a course section on ``snapshot_date``.
+
+    Written in bulk by ``attendance.shortages``; one snapshot per day.
+    """
+    snapshot_date = models.DateField()
+    student = models.ForeignKey('students.Student', on_delete=models.CASCADE, related_name='attendance_shortages')
+    course_section = models.ForeignKey('academics.CourseSection', on_delete=models.CASCADE, related_name='attendance_shortages')
+    # The student's department at snapshot time, for department-wide lists
+    department = models.ForeignKey('academics.Department', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    attended = models.IntegerField()
+    total = models.IntegerField()
+    percentage = models.DecimalField(max_digits=5, decimal_places=2)
+    # Not short in the previous snapshot
+    is_new = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['percentage', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot_date', 'student', 'course_section'], name='attendance_shortage_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['snapshot_date', 'course_section', 'percentage'], name='att_shortage_section_idx'),
+            models.Index(fields=['snapshot_date', 'department', 'percentage'], name='att_shortage_dept_idx'),
+            models.Index(fields=['snapshot_date', 'student'], name='att_shortage_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.snapshot_date}: {self.student_id} in {self.course_section_id} at {self.percentage}%"
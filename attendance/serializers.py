@@ -1,5 +1,9 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import AttendanceSession, AttendanceRecord
+
+from academics.models import CourseSection
+from .models import AttendanceSession, AttendanceRecord, AttendanceShortage, AttendanceSummary
+from .sync import MAX_SYNC_MARKS
 
 
 class AttendanceRecordSerializer(serializers.ModelSerializer):
@@ -7,9 +11,9 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
         model = AttendanceRecord
         fields = [
             'id', 'session', 'student', 'status', 'check_in_time', 'remarks',
-            'created_at', 'updated_at'
+            'marked_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'marked_at', 'created_at', 'updated_at']
 
 
 class AttendanceSessionSerializer(serializers.ModelSerializer):
@@ -23,3 +27,84 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+
+
+class AttendanceMarkSerializer(serializers.Serializer):
+    marks = serializers.DictField(
+        child=serializers.CharField(), allow_empty=False,
+        help_text='Status per student id, e.g. {"<student id>": "PRESENT"}',
+    )
+    remarks = serializers.DictField(
+        child=serializers.CharField(allow_blank=True), required=False,
+        help_text='Optional remarks per student id; students left out keep theirs',
+    )
+
+
+class SyncMarkSerializer(serializers.Serializer):
+    session = serializers.IntegerField()
+    student = serializers.CharField()
+    status = serializers.ChoiceField(choices=AttendanceRecord.STATUS_CHOICES)
+    remarks = serializers.CharField(allow_blank=True, required=False, default='')
+    marked_at = serializers.DateTimeField(help_text='Device time the mark was taken')
+
+    def validate_student(self, value):
+        try:
+            return AttendanceRecord._meta.get_field('student').target_field.to_python(value)
+        except DjangoValidationError:
+            raise serializers.ValidationError('Not a valid student id')
+
+
+class AttendanceSyncSerializer(serializers.Serializer):
+    idempotency_key = serializers.CharField(
+        max_length=100, required=False,
+        help_text='Client-generated key of the batch; the Idempotency-Key header works too',
+    )
+    marks = SyncMarkSerializer(many=True, allow_empty=True, max_length=MAX_SYNC_MARKS)
+    cursor = serializers.CharField(
+        required=False, allow_blank=True, help_text='Return the server changes since this cursor as well',
+    )
+    course_section = serializers.ListField(
+        child=serializers.IntegerField(), required=False, help_text='Limit the returned changes to these sections',
+    )
+
+
+class GenerateRecordsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    course_section = serializers.PrimaryKeyRelatedField(
+        queryset=CourseSection.objects.all(), required=False, help_text='Limit to one section',
+    )
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'End date must not be before the start date.'})
+        return attrs
+
+
+class AttendanceSummarySerializer(serializers.ModelSerializer):
+    roll_number = serializers.CharField(source='student.roll_number', read_only=True)
+    student_name = serializers.CharField(source='student.full_name', read_only=True)
+    course_code = serializers.CharField(source='course_section.course.code', read_only=True)
+    attended = serializers.IntegerField(read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = AttendanceSummary
+        fields = [
+            'student', 'roll_number', 'student_name', 'course_section', 'course_code',
+            'present', 'absent', 'late', 'excused', 'total', 'attended', 'percentage', 'updated_at',
+        ]
+
+
+class AttendanceShortageSerializer(serializers.ModelSerializer):
+    roll_number = serializers.CharField(source='student.roll_number', read_only=True)
+    student_name = serializers.CharField(source='student.full_name', read_only=True)
+    course_code = serializers.CharField(source='course_section.course.code', read_only=True)
+    section_number = serializers.CharField(source='course_section.section_number', read_only=True)
+
+    class Meta:
+        model = AttendanceShortage
+        fields = [
+            'id', 'snapshot_date', 'student', 'roll_number', 'student_name', 'course_section', 'course_code',
+            'section_number', 'department', 'attended', 'total', 'percentage', 'is_new',
+        ]
@@ -0,0 +1,292 @@
+"""
+Attendance writes.
+
+``generate_sessions()`` turns the active timetable into sessions for a date
+range. It works out the wanted ``(course_section, date, start_time)`` keys in
+memory, skipping ``AcademicCalendar`` holidays and breaks, fetches the
+existing keys of the range in one query and bulk-inserts only the missing
+ones. Re-running it is cheap and creates nothing twice, so it can run nightly
+over a rolling window (``manage.py generate_attendance_sessions --days N`` or
+the ``attendance.generate_sessions`` job).
+
+``generate_records()`` creates the default record of every enrolled student
+for any number of sessions: one enrolment query for all their sections, one
+for the sessions' existing records, then batched inserts of the missing
+ones, so a semester of sessions takes a handful of statements.
+
+``mark_attendance()`` applies a whole period's statuses (``{student_id:
+status}``) with a few statements however many students the class has: the
+current statuses (for the diff), the enrolment check and insert of new rows,
+and one ``INSERT ... ON CONFLICT (session, student) DO UPDATE`` for the
+rest. Rows whose status and remarks already match are not written at all.
+
+New rows go in with ``insert_records()`` (``ON CONFLICT DO NOTHING
+RETURNING``), so a row a concurrent writer created first is never counted
+as created. Both keep the attendance summary (see ``attendance.summary``)
+up to date with one delta write.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academics.models import AcademicCalendar, CourseEnrollment, Timetable
+from students.overview import invalidate_overviews
+
+from .models import AttendanceRecord, AttendanceSession
+from .summary import SummaryDelta
+
+STATUSES = dict(AttendanceRecord.STATUS_CHOICES)
+# Rows per request; a section never comes close
+MAX_MARKS = 1000
+# Records per INSERT when generating
+GENERATE_BATCH_SIZE = 2000
+# Calendar events that cancel classes; so does any event marked as not an academic day
+NON_TEACHING_EVENTS = ('HOLIDAY', 'BREAK')
+WEEKDAYS = {code: index for index, (code, _) in enumerate(Timetable.DAYS_OF_WEEK)}
+
+
+def non_teaching_days(start, end):
+    """Dates from ``start`` to ``end`` on which the academic calendar has no classes"""
+    days = set()
+    events = AcademicCalendar.objects.filter(
+        Q(event_type__in=NON_TEACHING_EVENTS) | Q(is_academic_day=False),
+        start_date__lte=end, end_date__gte=start,
+    ).values_list('start_date', 'end_date')
+    for first, last in events:
+        day = max(first, start)
+        while day <= min(last, end):
+            days.add(day)
+            day += timedelta(days=1)
+    return days
+
+
+def generate_sessions(start, end, course_section_id=None):
+    """
+    Create the missing sessions of the active timetable from ``start`` to ``end``.
+
+    Returns ``{'created': n, 'existing': n, 'skipped_days': n}``, where
+    ``skipped_days`` counts the non-teaching days in the range.
+    """
+    timetables = Timetable.objects.filter(is_active=True, course_section__isnull=False)
+    sessions = AttendanceSession.objects.filter(date__range=(start, end))
+    if course_section_id:
+        timetables = timetables.filter(course_section_id=course_section_id)
+        sessions = sessions.filter(course_section_id=course_section_id)
+    by_weekday = defaultdict(list)
+    for slot in timetables.order_by('pk').values('pk', 'course_section_id', 'day_of_week', 'start_time',
+                                                 'end_time', 'room'):
+        by_weekday[WEEKDAYS[slot['day_of_week']]].append(slot)
+
+    skipped = non_teaching_days(start, end)
+    wanted = {}
+    day = start
+    while day <= end:
+        if day not in skipped:
+            for slot in by_weekday[day.weekday()]:
+                # Two active slots for the same start time make one session, as before
+                wanted.setdefault((slot['course_section_id'], day, slot['start_time']), slot)
+        day += timedelta(days=1)
+
+    existing = set(sessions.order_by().values_list('course_section_id', 'date', 'start_time'))
+    missing = [
+        AttendanceSession(course_section_id=course_section, date=date, start_time=start_time,
+                          end_time=slot['end_time'], room=slot['room'], timetable_id=slot['pk'])
+        for (course_section, date, start_time), slot in wanted.items()
+        if (course_section, date, start_time) not in existing
+    ]
+    # ignore_conflicts: a concurrent run may have created some of them since the read
+    AttendanceSession.objects.bulk_create(missing, batch_size=GENERATE_BATCH_SIZE, ignore_conflicts=True)
+    return {'created': len(missing), 'existing': len(wanted) - len(missing), 'skipped_days': len(skipped)}
+
+
+def insert_records(rows, using):
+    """
+    Insert ``(session_id, student_id, status, remarks, marked_at)`` rows that do not exist yet.
+
+    ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` in batches; returns the
+    ``(session_id, student_id)`` keys actually inserted, so rows a concurrent
+    writer inserted first are not counted.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(AttendanceRecord._meta.db_table)
+    student_field = AttendanceRecord._meta.get_field('student').target_field
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), GENERATE_BATCH_SIZE):
+            batch = rows[start:start + GENERATE_BATCH_SIZE]
+            cursor.execute(
+                f'INSERT INTO {table} (session_id, student_id, status, remarks, marked_at, created_at, updated_at) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(batch))} '
+                f'ON CONFLICT (session_id, student_id) DO NOTHING RETURNING session_id, student_id',
+                [param for session_id, student_id, status, remarks, marked_at in batch for param in (
+                    session_id, student_field.get_db_prep_value(student_id, connection), status, remarks,
+                    connection.ops.adapt_datetimefield_value(marked_at), now, now,
+                )],
+            )
+            inserted.update((session_id, student_field.to_python(student_id)) for session_id, student_id in cursor)
+    return inserted
+
+
+def generate_records(sessions):
+    """
+    Create the missing records (default status) of the enrolled students of ``sessions``.
+
+    Returns ``{'sessions': n, 'created': n, 'existing': n}``; ``existing``
+    counts enrolled students who already had a record.
+    """
+    sessions = list(sessions.order_by().values_list('pk', 'course_section_id', 'is_cancelled'))
+    if not sessions:
+        return {'sessions': 0, 'created': 0, 'existing': 0}
+    students = defaultdict(list)
+    for course_section_id, student_id in CourseEnrollment.objects.filter(
+        course_section_id__in={course_section_id for _, course_section_id, _ in sessions}, status='ENROLLED',
+    ).order_by().values_list('course_section_id', 'student_id').distinct():
+        students[course_section_id].append(student_id)
+
+    using = router.db_for_write(AttendanceRecord)
+    default_status = AttendanceRecord._meta.get_field('status').default
+    by_session = {pk: (course_section_id, cancelled) for pk, course_section_id, cancelled in sessions}
+    with transaction.atomic(using=using):
+        existing = set(AttendanceRecord.objects.using(using).filter(
+            session_id__in=by_session,
+        ).order_by().values_list('session_id', 'student_id'))
+        wanted = 0
+        missing = []
+        for session_id, course_section_id, _ in sessions:
+            for student_id in students[course_section_id]:
+                wanted += 1
+                if (session_id, student_id) not in existing:
+                    missing.append((session_id, student_id, default_status, '', None))
+        # A concurrent writer may have created some of them since the read; only count what went in
+        created = insert_records(missing, using) if missing else set()
+        delta = SummaryDelta()
+        for session_id, student_id in created:
+            course_section_id, cancelled = by_session[session_id]
+            if not cancelled:
+                delta.add(student_id, course_section_id, default_status)
+        if created:
+            delta.apply(using)
+            invalidate_overviews(student_id for _, student_id in created)
+    return {'sessions': len(sessions), 'created': len(created), 'existing': wanted - len(created)}
+
+
+def _upsert(records, update_remarks, using):
+    """Write statuses of existing, locked rows; rows whose values already match are skipped"""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(AttendanceRecord._meta.db_table)
+    update = ['status = EXCLUDED.status', 'marked_at = EXCLUDED.marked_at', 'updated_at = EXCLUDED.updated_at']
+    changed = [f'{table}.status <> EXCLUDED.status']
+    if update_remarks:
+        update.append('remarks = EXCLUDED.remarks')
+        changed.append(f'{table}.remarks <> EXCLUDED.remarks')
+    student_field = AttendanceRecord._meta.get_field('student').target_field
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (session_id, student_id, status, remarks, marked_at, created_at, updated_at) '
+            f'VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(records))} '
+            f'ON CONFLICT (session_id, student_id) DO UPDATE SET {", ".join(update)} '
+            f'WHERE {" OR ".join(changed)}',
+            [param for session_id, student_id, status, remarks in records
+             for param in (session_id, student_field.get_db_prep_value(student_id, connection),
+                           status, remarks, now, now, now)],
+        )
+
+
+def mark_attendance(session, statuses, remarks=None):
+    """
+    Set the status of each student in ``statuses`` (``{student_id: status}``) for ``session``.
+
+    ``remarks`` (``{student_id: text}``) optionally replaces remarks too. Every
+    student must be enrolled in the session's section or already have a
+    record; otherwise nothing is written and ``ValidationError`` lists the
+    offenders. Returns the diff::
+
+        {'created': {student_id: status},
+         'updated': {student_id: [old status, new status]},
+         'unchanged': <count>}
+    """
+    if session.is_cancelled:
+        raise ValidationError('Attendance cannot be marked for a cancelled session.')
+    if len(statuses) > MAX_MARKS:
+        raise ValidationError(f'At most {MAX_MARKS} students can be marked at once.')
+    remarks = remarks or {}
+    student_field = AttendanceRecord._meta.get_field('student').target_field
+    errors = {}
+    marks = {}
+    for raw, status in statuses.items():
+        try:
+            student_id = student_field.to_python(raw)
+        except ValidationError:
+            errors[str(raw)] = 'Not a valid student id'
+            continue
+        if status not in STATUSES:
+            errors[str(raw)] = f'"{status}" is not a valid status'
+            continue
+        marks[student_id] = (status, remarks.get(raw))
+    if errors:
+        raise ValidationError(errors)
+
+    using = router.db_for_write(AttendanceRecord)
+    with transaction.atomic(using=using):
+        locked = AttendanceRecord.objects.using(using).select_for_update().filter(session=session)
+        current = {
+            student_id: (status, text) for student_id, status, text in
+            locked.filter(student_id__in=marks).values_list('student_id', 'status', 'remarks')
+        }
+        new = set(marks) - set(current)
+        if new:
+            enrolled = set(CourseEnrollment.objects.using(using).filter(
+                course_section_id=session.course_section_id, status='ENROLLED', student_id__in=new,
+            ).values_list('student_id', flat=True))
+            errors = {str(student_id): 'Not enrolled in this section' for student_id in new - enrolled}
+            if errors:
+                raise ValidationError(errors)
+            now = timezone.now()
+            created = {student_id for _, student_id in insert_records(
+                [(session.pk, student_id, marks[student_id][0], marks[student_id][1] or '', now)
+                 for student_id in new], using,
+            )}
+            # Created concurrently since the read: they are updates now
+            if new - created:
+                current.update({
+                    student_id: (status, text) for student_id, status, text in
+                    locked.filter(student_id__in=new - created).values_list('student_id', 'status', 'remarks')
+                })
+            new = created
+
+        diff = {'created': {}, 'updated': {}, 'unchanged': 0}
+        delta = SummaryDelta()
+        writes = []
+        for student_id, (status, text) in marks.items():
+            if student_id in new:
+                diff['created'][str(student_id)] = status
+                delta.add(student_id, session.course_section_id, status)
+                continue
+            old = current[student_id][0]
+            if current[student_id] != (status, text if text is not None else current[student_id][1]):
+                diff['updated'][str(student_id)] = [old, status]
+                delta.move(student_id, session.course_section_id, old, status)
+            else:
+                diff['unchanged'] += 1
+                continue
+            writes.append((session.pk, student_id, status, text or ''))
+        if writes:
+            # Rows sent without remarks keep theirs, so they need a statement of their own
+            with_remarks = [row for row in writes if marks[row[1]][1] is not None]
+            without = [row for row in writes if marks[row[1]][1] is None]
+            if with_remarks:
+                _upsert(with_remarks, True, using)
+            if without:
+                _upsert(without, False, using)
+        if new or writes:
+            delta.apply(using)
+            invalidate_overviews([*new, *(row[1] for row in writes)])
+    return diff
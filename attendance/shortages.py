@@ -0,0 +1,81 @@
+"""
+Daily attendance shortage snapshots.
+
+``build_shortage_snapshot()`` writes every active student below
+``ATTENDANCE_SHORTAGE_THRESHOLD`` percent in an active course section to
+``AttendanceShortage``, stamped with the day's date. It is one
+``INSERT ... SELECT`` over the attendance summary (see
+``attendance.summary``), so no record is read. The shortage lists that
+mentors and HODs open in the morning are indexed reads of the latest
+snapshot. ``is_new`` marks the rows that were not in the previous snapshot,
+which are the day's alerts.
+
+Run it early each morning with ``manage.py build_attendance_shortages`` or
+the ``attendance.shortage_snapshot`` job. Re-running it replaces that day's
+snapshot. Snapshots older than ``ATTENDANCE_SHORTAGE_RETENTION_DAYS`` are
+dropped.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from academics.models import CourseSection
+from students.models import Student
+
+from .models import AttendanceShortage, AttendanceSummary
+
+
+def shortage_threshold():
+    return Decimal(str(getattr(settings, 'ATTENDANCE_SHORTAGE_THRESHOLD', 75)))
+
+
+def latest_snapshot_date(using=None):
+    return AttendanceShortage.objects.using(using).aggregate(latest=Max('snapshot_date'))['latest']
+
+
+def build_shortage_snapshot(snapshot_date=None, threshold=None, using=None):
+    """
+    Write the shortage snapshot for ``snapshot_date`` (today by default).
+
+    Returns ``{'snapshot_date': date, 'shortages': n, 'new': n}``.
+    """
+    snapshot_date = snapshot_date or timezone.localdate()
+    threshold = shortage_threshold() if threshold is None else Decimal(str(threshold))
+    using = using or router.db_for_write(AttendanceShortage)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    shortages = AttendanceShortage.objects.using(using)
+    with transaction.atomic(using=using):
+        previous = shortages.filter(snapshot_date__lt=snapshot_date).aggregate(
+            previous=Max('snapshot_date')
+        )['previous']
+        shortages.filter(snapshot_date=snapshot_date).delete()
+        table = quote(AttendanceShortage._meta.db_table)
+        snapshot = connection.ops.adapt_datefield_value(snapshot_date)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (snapshot_date, student_id, course_section_id, department_id, '
+                f'attended, total, percentage, is_new) '
+                f'SELECT %s, summary.student_id, summary.course_section_id, student.department_id, '
+                f'summary.present + summary.late, summary.total, '
+                f'ROUND((summary.present + summary.late) * 100.0 / summary.total, 2), '
+                f'NOT EXISTS (SELECT 1 FROM {table} earlier WHERE earlier.snapshot_date = %s '
+                f'AND earlier.student_id = summary.student_id '
+                f'AND earlier.course_section_id = summary.course_section_id) '
+                f'FROM {quote(AttendanceSummary._meta.db_table)} summary '
+                f'JOIN {quote(Student._meta.db_table)} student ON student.id = summary.student_id '
+                f'JOIN {quote(CourseSection._meta.db_table)} section ON section.id = summary.course_section_id '
+                f'WHERE summary.total > 0 AND student.status = %s AND section.is_active '
+                f'AND (summary.present + summary.late) * 100 < %s * summary.total',
+                [snapshot, connection.ops.adapt_datefield_value(previous), 'ACTIVE',
+                 connection.ops.adapt_decimalfield_value(threshold, 5, 2)],
+            )
+        retention = getattr(settings, 'ATTENDANCE_SHORTAGE_RETENTION_DAYS', 30)
+        shortages.filter(snapshot_date__lt=snapshot_date - timedelta(days=retention)).delete()
+        today = shortages.filter(snapshot_date=snapshot_date)
+        return {'snapshot_date': snapshot_date, 'shortages': today.count(), 'new': today.filter(is_new=True).count()}
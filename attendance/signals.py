@@ -0,0 +1,84 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from academics.models import CourseSection
+
+from .models import AttendanceRecord, AttendanceSession
+from .summary import SummaryDelta, uncount_records
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _session_key(session_id, using):
+    return AttendanceSession.objects.using(using).filter(pk=session_id).values_list(
+        'course_section_id', 'is_cancelled'
+    ).first()
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def load_counted_record(sender, instance: AttendanceRecord, using, **kwargs):
+    """Read the stored record so the summary can move it between counters."""
+    instance._counted = None if instance._state.adding else AttendanceRecord.objects.using(using).filter(
+        pk=instance.pk
+    ).values_list('student_id', 'status', 'session_id', 'session__course_section_id', 'session__is_cancelled').first()
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def stamp_marked_at(sender, instance: AttendanceRecord, raw=False, update_fields=None, **kwargs):
+    """Saves through the ORM are server-side marks; offline sync compares device times against this."""
+    if not raw and (update_fields is None or 'marked_at' in update_fields):
+        instance.marked_at = timezone.now()
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def update_summary_on_record_save(sender, instance: AttendanceRecord, using, raw=False, **kwargs):
+    """Move the record between attendance summary counters (see attendance.summary)."""
+    if raw:
+        return
+    old = getattr(instance, '_counted', None)
+    if old is not None and old[2] == instance.session_id:
+        course_section_id, cancelled = old[3], old[4]
+    else:
+        course_section_id, cancelled = _session_key(instance.session_id, using)
+    delta = SummaryDelta()
+    if old is not None and not old[4]:
+        delta.add(old[0], old[3], old[1], -1)
+    if not cancelled:
+        delta.add(instance.student_id, course_section_id, instance.status)
+    delta.apply(using)
+    instance._counted = (instance.student_id, instance.status, instance.session_id, course_section_id, cancelled)
+
+
+@receiver(pre_save, sender=AttendanceSession)
+def load_counted_session(sender, instance: AttendanceSession, using, **kwargs):
+    instance._counted = None if instance._state.adding else _session_key(instance.pk, using)
+
+
+@receiver(post_save, sender=AttendanceSession)
+def update_summary_on_session_save(sender, instance: AttendanceSession, created, using, raw=False, **kwargs):
+    """Cancelling a session (or moving it to another section) moves its records' counts."""
+    old = getattr(instance, '_counted', None)
+    new = (instance.course_section_id, instance.is_cancelled)
+    instance._counted = new
+    if raw or created or old is None or old == new:
+        return
+    records = AttendanceRecord.objects.using(using).filter(session=instance)
+    delta = SummaryDelta()
+    if not old[1]:
+        delta.add_records(records, -1, course_section_id=old[0])
+    if not new[1]:
+        delta.add_records(records)
+    delta.apply(using)
+
+
+@receiver(pre_delete, sender=AttendanceSession)
+def update_summary_on_session_delete(sender, instance: AttendanceSession, using, origin=None, **kwargs):
+    """Uncount the session's records before they are cascade-deleted."""
+    # Summary rows go with a deleted section
+    if _origin_model(origin) is CourseSection:
+        return
+    uncount_records(AttendanceRecord.objects.using(using).filter(session_id=instance.pk), using)
@@ -0,0 +1,193 @@
+"""
+Attendance percentages per student and course section.
+
+``AttendanceSummary`` keeps one row per (student, course section) with the
+present/absent/late/excused counts and the total, over the sessions that
+were not cancelled. Shortage reports and student views read those rows
+instead of grouping ``AttendanceRecord``.
+
+Counters are maintained incrementally in the writer's transaction:
+
+- ``save()`` of records and ``save()``/``delete()`` of sessions through the
+  receivers in ``attendance.signals`` (cancelling a session takes its records
+  out);
+- the bulk paths in ``attendance.services`` build and apply their own
+  ``SummaryDelta``;
+- record deletes call ``uncount_records()`` first, which counts any number
+  of records in one grouped query instead of a session lookup per deleted
+  record (the API, the admin and session deletes do).
+
+A delta is written with ``INSERT ... ON CONFLICT DO UPDATE``, ``BATCH_SIZE``
+rows per statement in a fixed order. ``reconcile_attendance_summary()``
+rebuilds the rows from the record table and reports any drift; run it
+periodically with ``manage.py reconcile_attendance_summary`` or the
+``attendance.reconcile_summary`` job.
+Terms archived by ``attendance.archive`` keep their rows as they were.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from students.overview import invalidate_overviews
+
+from .archive import archived_sections
+from .models import AttendanceRecord, AttendanceSummary
+
+COUNTERS = ('present', 'absent', 'late', 'excused', 'total')
+STATUS_COUNTERS = {status: status.lower() for status, _ in AttendanceRecord.STATUS_CHOICES}
+# Summary rows per INSERT
+BATCH_SIZE = 1000
+
+
+class SummaryDelta:
+    """Pending counter changes, keyed by (student id, course section id)."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, student_id, course_section_id, status, n=1):
+        """Count ``n`` records of ``status`` (negative ``n`` uncounts them)."""
+        self.counts[(student_id, course_section_id, STATUS_COUNTERS[status])] += n
+        self.counts[(student_id, course_section_id, 'total')] += n
+
+    def move(self, student_id, course_section_id, old, new):
+        if old != new:
+            self.add(student_id, course_section_id, old, -1)
+            self.add(student_id, course_section_id, new)
+
+    def add_records(self, records, sign=1, course_section_id=None):
+        """
+        Count every record in the ``AttendanceRecord`` queryset (``sign=-1`` uncounts them); one query.
+
+        ``course_section_id`` overrides the sessions' section, e.g. to uncount
+        a session's records from the section it was just moved away from.
+        """
+        rows = records.order_by().values(
+            'student_id', 'status', section_id=F('session__course_section_id'),
+        ).annotate(n=Count('id'))
+        for row in rows:
+            self.add(row['student_id'], course_section_id or row['section_id'], row['status'], sign * row['n'])
+
+    def rows(self):
+        rows = {}
+        for (student_id, course_section_id, counter), n in self.counts.items():
+            rows.setdefault((student_id, course_section_id), dict.fromkeys(COUNTERS, 0))[counter] += n
+        return rows
+
+    def apply(self, using=None):
+        """Write the changes now."""
+        rows = self.rows()
+        self.counts = Counter()
+        using = using or router.db_for_write(AttendanceSummary)
+        # Sorted so concurrent writers lock the rows in the same order
+        rows = sorted((key, counts) for key, counts in rows.items() if any(counts.values()))
+        # Removals never create a row: the student or section may be going away in this transaction
+        upserts = [(key, counts) for key, counts in rows if counts['total'] >= 0]
+        removals = [(key, counts) for key, counts in rows if counts['total'] < 0]
+        now = timezone.now()
+        for (student_id, course_section_id), counts in removals:
+            AttendanceSummary.objects.using(using).filter(
+                student_id=student_id, course_section_id=course_section_id,
+            ).update(updated_at=now, **{counter: F(counter) + n for counter, n in counts.items() if n})
+        if not upserts:
+            return
+
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = quote(AttendanceSummary._meta.db_table)
+        student_field = AttendanceSummary._meta.get_field('student').target_field
+        columns = ', '.join(f'{counter} = {table}.{counter} + EXCLUDED.{counter}' for counter in COUNTERS)
+        with connection.cursor() as cursor:
+            for start in range(0, len(upserts), BATCH_SIZE):
+                batch = upserts[start:start + BATCH_SIZE]
+                cursor.execute(
+                    f'INSERT INTO {table} (student_id, course_section_id, {", ".join(COUNTERS)}, updated_at) '
+                    f'VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(batch))} '
+                    f'ON CONFLICT (student_id, course_section_id) DO UPDATE '
+                    f'SET {columns}, updated_at = EXCLUDED.updated_at',
+                    [param for (student_id, course_section_id), counts in batch for param in (
+                        student_field.get_db_prep_value(student_id, connection), course_section_id,
+                        *(counts[counter] for counter in COUNTERS), now,
+                    )],
+                )
+
+
+def uncount_records(records, using=None):
+    """Take the ``AttendanceRecord`` queryset out of the summary; call before deleting the records."""
+    delta = SummaryDelta()
+    delta.add_records(records.filter(session__is_cancelled=False), -1)
+    delta.apply(using)
+
+
+def count_attendance(using=None, **filters):
+    """``{(student id, course section id): counters}`` counted from the record table"""
+    records = AttendanceRecord.objects.using(using).filter(session__is_cancelled=False, **filters)
+    return {
+        (row['student_id'], row['course_section_id']): {counter: row[counter] for counter in COUNTERS}
+        for row in records.order_by().values(
+            'student_id', course_section_id=F('session__course_section_id'),
+        ).annotate(
+            total=Count('id'),
+            **{counter: Count('id', filter=Q(status=status)) for status, counter in STATUS_COUNTERS.items()},
+        )
+    }
+
+
+def reconcile_attendance_summary(using=None, course_section_id=None):
+    """Rebuild the summary rows from the record table.
+
+    Returns ``{(student id, course section id): (stored, actual)}`` for the
+    rows that had drifted, counters as dicts. On PostgreSQL the summary table
+    is locked against writes for the duration, so no concurrent increment is
+    lost. Sections of archived terms are skipped: their records are gone.
+    """
+    using = using or router.db_for_write(AttendanceSummary)
+    connection = connections[using]
+    summaries = AttendanceSummary.objects.using(using)
+    if course_section_id is not None:
+        summaries = summaries.filter(course_section_id=course_section_id)
+        filters = {'session__course_section_id': course_section_id}
+    else:
+        filters = {}
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                table = connection.ops.quote_name(AttendanceSummary._meta.db_table)
+                cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+        archived = set(archived_sections(using).values_list('pk', flat=True))
+        actual = {key: counts for key, counts in count_attendance(using, **filters).items() if key[1] not in archived}
+        stored = {
+            (row['student_id'], row['course_section_id']): {counter: row[counter] for counter in COUNTERS}
+            for row in summaries.exclude(course_section_id__in=archived).values(
+                'student_id', 'course_section_id', *COUNTERS
+            )
+        }
+        empty = dict.fromkeys(COUNTERS, 0)
+        drift = {
+            key: (stored.get(key, empty), actual.get(key, empty))
+            for key in set(stored) | set(actual)
+            if stored.get(key, empty) != actual.get(key, empty)
+        }
+
+        stale = defaultdict(list)
+        for student_id, section_id in stored:
+            if (student_id, section_id) not in actual:
+                stale[section_id].append(student_id)
+        for section_id, student_ids in stale.items():
+            summaries.filter(course_section_id=section_id, student_id__in=student_ids).delete()
+        now = timezone.now()
+        summaries.bulk_create(
+            [AttendanceSummary(student_id=student_id, course_section_id=section_id, updated_at=now,
+                               **actual[(student_id, section_id)])
+             for student_id, section_id in drift if (student_id, section_id) in actual],
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['student', 'course_section'],
+            update_fields=[*COUNTERS, 'updated_at'],
+        )
+        # Student overviews read these rows
+        invalidate_overviews(student_id for student_id, _ in drift)
+    return drift
@@ -0,0 +1,277 @@
+"""
+Offline attendance sync.
+
+Devices mark attendance without a connection, then send everything in one
+batch: ``apply_sync()`` takes marks across any number of sessions, each
+with the device time it was taken (``marked_at``), and applies them in one
+transaction:
+
+- the batch carries a client-generated key, and a retried batch gets the
+  stored response of the first attempt without writing anything again;
+- each ``(session, student)`` keeps the latest mark (last writer wins). A
+  mark older than what the server has (a later sync or a mark made on the
+  server) is reported as ``stale`` and not applied;
+- new records go in with ``INSERT ... ON CONFLICT DO NOTHING RETURNING``
+  (a row created concurrently in the meantime is re-read and compared like
+  any other), the rest with one
+  ``INSERT ... ON CONFLICT (session_id, student_id) DO UPDATE``. Invalid
+  marks are reported per index and do not block the rest of the batch.
+
+``changes_since()`` pages through records and sessions changed after a
+cursor, so a device can pull what others wrote in the same round-trip.
+Deleted records are not reported. Faculty sync the sections they teach;
+staff sync everything.
+"""
+
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academics.models import CourseEnrollment, CourseSection
+from students.overview import invalidate_overviews
+
+from .models import AttendanceRecord, AttendanceSession, AttendanceSyncBatch
+from .services import insert_records
+from .summary import SummaryDelta
+
+# Marks per batch; a day of classes for one teacher is well below it
+MAX_SYNC_MARKS = 2000
+CHANGES_PAGE_SIZE = 500
+
+
+def sync_sections(user):
+    """Ids of the course sections ``user`` may sync: those they teach, or ``None`` (all) for staff"""
+    if user.is_staff:
+        return None
+    return set(CourseSection.objects.filter(faculty__user=user).values_list('pk', flat=True))
+
+
+def _last_change(row):
+    return row['marked_at'] or row['updated_at']
+
+
+def _upsert(marks, using):
+    """Write marks over existing, locked rows that were last changed before them"""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(AttendanceRecord._meta.db_table)
+    student_field = AttendanceRecord._meta.get_field('student').target_field
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (session_id, student_id, status, remarks, marked_at, created_at, updated_at) '
+            f'VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(marks))} '
+            f'ON CONFLICT (session_id, student_id) DO UPDATE SET status = EXCLUDED.status, '
+            f'remarks = EXCLUDED.remarks, marked_at = EXCLUDED.marked_at, updated_at = EXCLUDED.updated_at '
+            f'WHERE COALESCE({table}.marked_at, {table}.updated_at) < EXCLUDED.marked_at',
+            [param for mark in marks for param in (
+                mark['session'], student_field.get_db_prep_value(mark['student'], connection), mark['status'],
+                mark['remarks'], connection.ops.adapt_datetimefield_value(mark['marked_at']), now, now,
+            )],
+        )
+
+
+def _apply(marks, using, sections_allowed=None):
+    """Validate and write ``marks``; returns the response body"""
+    rejected = []
+    latest = {}
+    now = timezone.now()
+    for index, mark in enumerate(marks):
+        # A device clock running ahead must not win every later conflict
+        mark = {**mark, 'marked_at': min(mark['marked_at'], now)}
+        key = (mark['session'], mark['student'])
+        if key not in latest or latest[key][1]['marked_at'] < mark['marked_at']:
+            latest[key] = (index, mark)
+
+    sessions = dict(AttendanceSession.objects.using(using).filter(
+        pk__in={session_id for session_id, _ in latest}
+    ).values_list('pk', 'course_section_id'))
+    cancelled = set(AttendanceSession.objects.using(using).filter(pk__in=sessions, is_cancelled=True)
+                    .values_list('pk', flat=True))
+    locked = AttendanceRecord.objects.using(using).select_for_update()
+    fields = ('session_id', 'student_id', 'status', 'remarks', 'marked_at', 'updated_at')
+    current = {
+        (row['session_id'], row['student_id']): row
+        for row in locked.filter(
+            session_id__in=sessions, student_id__in={student_id for _, student_id in latest},
+        ).values(*fields)
+    }
+    new = {key for key in latest if key[0] in sessions and key not in current}
+    enrolled = set()
+    if new:
+        enrolled = set(CourseEnrollment.objects.using(using).filter(
+            course_section_id__in={sessions[session_id] for session_id, _ in new},
+            student_id__in={student_id for _, student_id in new}, status='ENROLLED',
+        ).values_list('course_section_id', 'student_id'))
+
+    accepted = []
+    for key, (index, mark) in sorted(latest.items(), key=lambda item: item[1][0]):
+        session_id, student_id = key
+        if session_id not in sessions:
+            rejected.append({'index': index, 'error': 'Unknown session'})
+        elif sections_allowed is not None and sessions[session_id] not in sections_allowed:
+            rejected.append({'index': index, 'error': 'Not a section you teach'})
+        elif session_id in cancelled:
+            rejected.append({'index': index, 'error': 'Session is cancelled'})
+        elif key in new and (sessions[session_id], student_id) not in enrolled:
+            rejected.append({'index': index, 'error': 'Student is not enrolled in this section'})
+        else:
+            accepted.append((key, mark))
+
+    delta = SummaryDelta()
+    inserts = [(key, mark) for key, mark in accepted if key in new]
+    created = insert_records(
+        [(*key, mark['status'], mark['remarks'], mark['marked_at']) for key, mark in inserts], using,
+    ) if inserts else set()
+    for key, mark in inserts:
+        if key in created:
+            delta.add(key[1], sessions[key[0]], mark['status'])
+    lost = {key for key, _ in inserts} - created
+    if lost:
+        # Created concurrently since the read: last writer wins against them too
+        current.update(
+            ((row['session_id'], row['student_id']), row)
+            for row in locked.filter(
+                session_id__in={session_id for session_id, _ in lost},
+                student_id__in={student_id for _, student_id in lost},
+            ).values(*fields)
+        )
+
+    writes = []
+    stale = 0
+    for key, mark in accepted:
+        if key in created:
+            continue
+        if _last_change(current[key]) >= mark['marked_at']:
+            stale += 1
+        else:
+            delta.move(key[1], sessions[key[0]], current[key]['status'], mark['status'])
+            writes.append(mark)
+    if writes:
+        _upsert(writes, using)
+    if created or writes:
+        delta.apply(using)
+        invalidate_overviews([*(student_id for _, student_id in created), *(mark['student'] for mark in writes)])
+    return {
+        'applied': len(created) + len(writes),
+        'stale': stale,
+        'duplicates': len(marks) - len(latest),
+        'rejected': rejected,
+    }
+
+
+def apply_sync(user, key, marks):
+    """
+    Apply a sync batch once per ``(user, key)``.
+
+    ``marks`` are dicts with ``session`` (id), ``student`` (id), ``status``,
+    ``remarks`` and ``marked_at`` (aware datetime), already validated for
+    shape. A ``marked_at`` in the future counts as now. Marks for sections
+    the user does not teach are rejected unless they are staff. Returns
+    ``(response, replayed)``.
+    """
+    using = router.db_for_write(AttendanceRecord)
+    batches = AttendanceSyncBatch.objects.using(using)
+    done = batches.filter(user=user, key=key).values_list('response', flat=True).first()
+    if done is not None:
+        return done, True
+    try:
+        with transaction.atomic(using=using):
+            response = _apply(marks, using, sync_sections(user))
+            batches.create(user=user, key=key, response=response)
+    except IntegrityError:
+        # The same batch was applied concurrently (another retry); this attempt rolled back
+        done = batches.filter(user=user, key=key).values_list('response', flat=True).first()
+        if done is None:
+            raise
+        return done, True
+    return response, False
+
+
+def purge_sync_batches():
+    """Forget batch keys older than ATTENDANCE_SYNC_KEY_RETENTION_DAYS; returns the number deleted"""
+    days = getattr(settings, 'ATTENDANCE_SYNC_KEY_RETENTION_DAYS', 7)
+    deleted, _ = AttendanceSyncBatch.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+def encode_cursor(records, sessions):
+    """Opaque cursor of the record and session positions, each ``(updated_at, id)`` or ``None``"""
+    raw = json.dumps([[position[0].isoformat(), position[1]] if position else None
+                      for position in (records, sessions)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _position(value):
+    if value is None:
+        return None
+    updated_at, pk = value
+    updated_at = parse_datetime(updated_at)
+    if updated_at is None or not isinstance(pk, int):
+        raise ValueError
+    return updated_at, pk
+
+
+def decode_cursor(cursor):
+    """The ``(records, sessions)`` positions of ``encode_cursor()``; raises ValueError for anything else"""
+    try:
+        records, sessions = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _position(records), _position(sessions)
+    except (TypeError, ValueError, UnicodeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def _page(queryset, position, until, limit, fields):
+    """Rows changed after ``position`` up to ``until``, oldest first; returns ``(rows, position, has_more)``"""
+    queryset = queryset.filter(updated_at__lte=until).order_by('updated_at', 'id')
+    if position:
+        since, last_id = position
+        queryset = queryset.filter(Q(updated_at__gt=since) | Q(updated_at=since, id__gt=last_id))
+    rows = list(queryset.values(*fields)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = (rows[-1]['updated_at'], rows[-1]['id'])
+    return rows, position, has_more
+
+
+def changes_since(cursor=None, course_section_ids=None, session_ids=None, limit=CHANGES_PAGE_SIZE):
+    """
+    Records and sessions changed after ``cursor``, oldest first, up to ``limit`` of each.
+
+    Returns ``{'records': [...], 'sessions': [...], 'cursor': str, 'has_more': bool}``.
+    Pass the returned cursor back to continue; without one, everything is
+    returned page by page. Changes of the last ATTENDANCE_SYNC_CHANGES_LAG_SECONDS
+    are held back: ``updated_at`` is stamped before commit, and a cursor past
+    a write that has not committed yet would skip it for good.
+    """
+    records = AttendanceRecord.objects.all()
+    sessions = AttendanceSession.objects.all()
+    if course_section_ids is not None:
+        records = records.filter(session__course_section_id__in=course_section_ids)
+        sessions = sessions.filter(course_section_id__in=course_section_ids)
+    if session_ids:
+        records = records.filter(session_id__in=session_ids)
+        sessions = sessions.filter(pk__in=session_ids)
+    record_position, session_position = decode_cursor(cursor) if cursor else (None, None)
+    until = timezone.now() - timedelta(seconds=getattr(settings, 'ATTENDANCE_SYNC_CHANGES_LAG_SECONDS', 10))
+    record_rows, record_position, more_records = _page(
+        records, record_position, until, limit,
+        ('id', 'session_id', 'student_id', 'status', 'remarks', 'marked_at', 'updated_at'),
+    )
+    session_rows, session_position, more_sessions = _page(
+        sessions, session_position, until, limit,
+        ('id', 'course_section_id', 'date', 'start_time', 'end_time', 'room', 'is_cancelled', 'updated_at'),
+    )
+    return {
+        'records': record_rows,
+        'sessions': session_rows,
+        'cursor': encode_cursor(record_position, session_position),
+        'has_more': more_records or more_sessions,
+    }
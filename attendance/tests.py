@@ -0,0 +1,211 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import AcademicProgram, Course, CourseEnrollment, CourseSection, Department
+from faculty.models import Faculty
+from students.models import Student
+
+from .models import AttendanceRecord, AttendanceSession, AttendanceSummary, AttendanceSyncBatch
+from .services import generate_records, mark_attendance
+from .summary import reconcile_attendance_summary, uncount_records
+from .sync import apply_sync
+
+
+class AttendanceTestCase(TestCase):
+    """A course section with three enrolled students and one session"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CS')
+        program = AcademicProgram.objects.create(
+            name='Bachelor of Computer Science', code='BCS', department=department, total_credits=160,
+        )
+        course = Course.objects.create(code='CS101', title='Programming', description='Programming')
+        course.programs.add(program)
+        cls.teacher = get_user_model().objects.create_user(
+            email='asha@example.com', username='asha', password='secret',
+        )
+        faculty = Faculty.objects.create(
+            name='Asha Rao', apaar_faculty_id='APAAR-1', employee_id='EMP-1', email='asha@example.com',
+            user=cls.teacher,
+        )
+        cls.section = CourseSection.objects.create(
+            course=course, section_number='A', academic_year='2025-2026', semester='Fall',
+            faculty=faculty, max_students=30,
+        )
+        cls.students = [
+            Student.objects.create(
+                roll_number=f'CS-{n}', first_name='Student', last_name=str(n),
+                date_of_birth=date(2005, 1, 1), gender='F',
+            )
+            for n in range(3)
+        ]
+        for student in cls.students:
+            CourseEnrollment.objects.create(student=student, course_section=cls.section)
+        cls.session = AttendanceSession.objects.create(
+            course_section=cls.section, date=date(2025, 9, 1), start_time=time(9), end_time=time(10),
+        )
+
+    def summary(self, student):
+        row = AttendanceSummary.objects.filter(student=student, course_section=self.section).first()
+        if row is None:
+            return None
+        return {'present': row.present, 'absent': row.absent, 'late': row.late, 'total': row.total}
+
+    def assertNoDrift(self):
+        self.assertEqual(reconcile_attendance_summary(), {})
+
+
+class MarkAttendanceTests(AttendanceTestCase):
+
+    def test_creates_and_updates_in_one_call(self):
+        first, second, third = self.students
+        mark_attendance(self.session, {str(first.pk): 'PRESENT', str(second.pk): 'PRESENT'})
+
+        diff = mark_attendance(self.session, {
+            str(first.pk): 'ABSENT', str(second.pk): 'PRESENT', str(third.pk): 'LATE',
+        })
+
+        self.assertEqual(diff, {
+            'created': {str(third.pk): 'LATE'},
+            'updated': {str(first.pk): ['PRESENT', 'ABSENT']},
+            'unchanged': 1,
+        })
+        self.assertEqual(AttendanceRecord.objects.get(session=self.session, student=first).status, 'ABSENT')
+        self.assertEqual(self.summary(first), {'present': 0, 'absent': 1, 'late': 0, 'total': 1})
+        self.assertEqual(self.summary(second), {'present': 1, 'absent': 0, 'late': 0, 'total': 1})
+        self.assertEqual(self.summary(third), {'present': 0, 'absent': 0, 'late': 1, 'total': 1})
+        self.assertNoDrift()
+
+    def test_remarks_are_kept_unless_sent(self):
+        student = self.students[0]
+        mark_attendance(self.session, {str(student.pk): 'EXCUSED'}, {str(student.pk): 'Medical'})
+
+        diff = mark_attendance(self.session, {str(student.pk): 'EXCUSED'})
+        self.assertEqual(diff, {'created': {}, 'updated': {}, 'unchanged': 1})
+
+        diff = mark_attendance(self.session, {str(student.pk): 'EXCUSED'}, {str(student.pk): ''})
+        self.assertEqual(diff['updated'], {str(student.pk): ['EXCUSED', 'EXCUSED']})
+        self.assertEqual(AttendanceRecord.objects.get(session=self.session, student=student).remarks, '')
+
+    def test_rejects_students_not_enrolled(self):
+        outsider = Student.objects.create(
+            roll_number='ME-1', first_name='Other', last_name='Student', date_of_birth=date(2005, 1, 1), gender='M',
+        )
+        with self.assertRaises(ValidationError) as raised:
+            mark_attendance(self.session, {str(self.students[0].pk): 'PRESENT', str(outsider.pk): 'PRESENT'})
+
+        self.assertEqual(list(raised.exception.message_dict), [str(outsider.pk)])
+        self.assertFalse(AttendanceRecord.objects.filter(session=self.session).exists())
+
+    def test_rejects_cancelled_session(self):
+        self.session.is_cancelled = True
+        self.session.save()
+        with self.assertRaises(ValidationError):
+            mark_attendance(self.session, {str(self.students[0].pk): 'PRESENT'})
+
+
+class SummaryTests(AttendanceTestCase):
+
+    def test_generate_records_counts_each_record_once(self):
+        result = generate_records(AttendanceSession.objects.filter(pk=self.session.pk))
+        self.assertEqual(result, {'sessions': 1, 'created': 3, 'existing': 0})
+        result = generate_records(AttendanceSession.objects.filter(pk=self.session.pk))
+        self.assertEqual(result, {'sessions': 1, 'created': 0, 'existing': 3})
+
+        for student in self.students:
+            self.assertEqual(self.summary(student), {'present': 1, 'absent': 0, 'late': 0, 'total': 1})
+        self.assertNoDrift()
+
+    def test_generate_records_skips_cancelled_sessions_in_summary(self):
+        self.session.is_cancelled = True
+        self.session.save()
+        generate_records(AttendanceSession.objects.filter(pk=self.session.pk))
+
+        self.assertEqual(AttendanceRecord.objects.filter(session=self.session).count(), 3)
+        self.assertIsNone(self.summary(self.students[0]))
+        self.assertNoDrift()
+
+    def test_deleting_records_and_sessions_uncounts_them(self):
+        first, second, _ = self.students
+        mark_attendance(self.session, {str(first.pk): 'ABSENT', str(second.pk): 'LATE'})
+
+        records = AttendanceRecord.objects.filter(session=self.session, student=first)
+        uncount_records(records)
+        records.delete()
+        self.assertEqual(self.summary(first), {'present': 0, 'absent': 0, 'late': 0, 'total': 0})
+        self.assertNoDrift()
+
+        self.session.delete()
+        self.assertEqual(self.summary(second), {'present': 0, 'absent': 0, 'late': 0, 'total': 0})
+        self.assertNoDrift()
+
+    def test_cancelling_a_session_takes_its_records_out(self):
+        mark_attendance(self.session, {str(student.pk): 'PRESENT' for student in self.students})
+        self.session.is_cancelled = True
+        self.session.save()
+
+        self.assertEqual(self.summary(self.students[0]), {'present': 0, 'absent': 0, 'late': 0, 'total': 0})
+        self.assertNoDrift()
+
+
+class SyncTests(AttendanceTestCase):
+
+    def mark(self, student, status, marked_at=None):
+        return {
+            'session': self.session.pk, 'student': student.pk, 'status': status, 'remarks': '',
+            'marked_at': marked_at or timezone.now() - timedelta(minutes=1),
+        }
+
+    def test_replayed_batch_writes_nothing(self):
+        marks = [self.mark(student, 'ABSENT') for student in self.students]
+        response, replayed = apply_sync(self.teacher, 'batch-1', marks)
+        self.assertFalse(replayed)
+        self.assertEqual(response['applied'], 3)
+
+        again, replayed = apply_sync(self.teacher, 'batch-1', [self.mark(self.students[0], 'PRESENT')])
+        self.assertTrue(replayed)
+        self.assertEqual(again, response)
+        self.assertEqual(AttendanceSyncBatch.objects.count(), 1)
+        self.assertEqual(AttendanceRecord.objects.get(session=self.session, student=self.students[0]).status, 'ABSENT')
+        self.assertEqual(self.summary(self.students[0]), {'present': 0, 'absent': 1, 'late': 0, 'total': 1})
+        self.assertNoDrift()
+
+    def test_replay_through_the_api(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        body = {'marks': [{**self.mark(self.students[0], 'LATE'), 'student': str(self.students[0].pk)}]}
+
+        first = client.post(reverse('attendance-sync-list'), body, format='json', HTTP_IDEMPOTENCY_KEY='k-1')
+        second = client.post(reverse('attendance-sync-list'), body, format='json', HTTP_IDEMPOTENCY_KEY='k-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()['replayed'])
+        self.assertEqual(second.json()['applied'], first.json()['applied'])
+        self.assertEqual(self.summary(self.students[0]), {'present': 0, 'absent': 0, 'late': 1, 'total': 1})
+
+    def test_older_marks_are_stale(self):
+        student = self.students[0]
+        mark_attendance(self.session, {str(student.pk): 'PRESENT'})
+
+        earlier = timezone.now() - timedelta(hours=1)
+        response, _ = apply_sync(self.teacher, 'batch-2', [self.mark(student, 'ABSENT', earlier)])
+
+        self.assertEqual((response['applied'], response['stale']), (0, 1))
+        self.assertEqual(AttendanceRecord.objects.get(session=self.session, student=student).status, 'PRESENT')
+
+    def test_marks_outside_the_users_sections_are_rejected(self):
+        other = get_user_model().objects.create_user(email='ravi@example.com', username='ravi', password='secret')
+
+        response, _ = apply_sync(other, 'batch-3', [self.mark(self.students[0], 'ABSENT')])
+
+        self.assertEqual(response['applied'], 0)
+        self.assertEqual(response['rejected'], [{'index': 0, 'error': 'Not a section you teach'}])
+        self.assertFalse(AttendanceRecord.objects.exists())
@@ -1,10 +1,16 @@
 from rest_framework.routers import DefaultRouter
-from .views import AttendanceSessionViewSet, AttendanceRecordViewSet
+from .views import (
+    AttendanceRecordViewSet, AttendanceSessionViewSet, AttendanceShortageViewSet, AttendanceSummaryViewSet,
+    AttendanceSyncViewSet,
+)
 
 
 router = DefaultRouter()
 router.register(r'attendance/sessions', AttendanceSessionViewSet, basename='attendance-session')
 router.register(r'attendance/records', AttendanceRecordViewSet, basename='attendance-record')
+router.register(r'attendance/summaries', AttendanceSummaryViewSet, basename='attendance-summary')
+router.register(r'attendance/shortages', AttendanceShortageViewSet, basename='attendance-shortage')
+router.register(r'attendance/sync', AttendanceSyncViewSet, basename='attendance-sync')
 
 urlpatterns = router.urls
 
@@ -1,36 +1,209 @@
-from datetime import date
-
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import Prefetch
-from rest_framework import viewsets, status
+from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, mixins, permissions, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from .models import AttendanceSession, AttendanceRecord
-from .serializers import AttendanceSessionSerializer, AttendanceRecordSerializer
-from academics.models import Timetable, CourseEnrollment
+from .filters import AttendanceShortageFilter
+from .models import AttendanceSession, AttendanceRecord, AttendanceShortage, AttendanceSummary
+from .serializers import (
+    AttendanceMarkSerializer, AttendanceSessionSerializer, AttendanceRecordSerializer, AttendanceShortageSerializer,
+    AttendanceSummarySerializer, AttendanceSyncSerializer, GenerateRecordsSerializer,
+)
+from .services import generate_records, mark_attendance
+from .shortages import latest_snapshot_date
+from .summary import uncount_records
+from .sync import apply_sync, changes_since, sync_sections
 
 
 class AttendanceSessionViewSet(viewsets.ModelViewSet):
     queryset = AttendanceSession.objects.all().select_related('course_section', 'timetable').prefetch_related(
-        Prefetch('records', queryset=AttendanceRecord.objects.select_related('student'))
+        Prefetch('records', queryset=AttendanceRecord.objects.select_related('student').order_by(
+            'student__roll_number'
+        ))
     )
     serializer_class = AttendanceSessionSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['date', 'id']
+    ordering = ['-date', '-id']
 
     @action(detail=True, methods=['post'])
     def generate_records(self, request, pk=None):
-        session = self.get_object()
-        enrollments = CourseEnrollment.objects.filter(course_section=session.course_section, status='ENROLLED').select_related('student')
-        created = 0
-        for enrollment in enrollments:
-            AttendanceRecord.objects.get_or_create(session=session, student=enrollment.student)
-            created += 1
+        """Create the missing record of every enrolled student"""
+        session = get_object_or_404(AttendanceSession.objects.only('id'), pk=pk)
+        self.check_object_permissions(request, session)
+        result = generate_records(AttendanceSession.objects.filter(pk=session.pk))
+        return Response({
+            'created_records': result['created'],
+            'existing_records': result['existing'],
+            'total_records': AttendanceRecord.objects.filter(session=session).count(),
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], serializer_class=GenerateRecordsSerializer)
+    def bulk_generate_records(self, request):
+        """Create the missing records of every non-cancelled session from ``start`` to ``end`` (optionally one ``course_section``)"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        sessions = AttendanceSession.objects.filter(date__range=(data['start'], data['end']), is_cancelled=False)
+        if data.get('course_section'):
+            sessions = sessions.filter(course_section=data['course_section'])
+        result = generate_records(sessions)
         return Response({
-            'created_records': created,
-            'total_records': session.records.count(),
+            'sessions': result['sessions'],
+            'created_records': result['created'],
+            'existing_records': result['existing'],
         }, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['post'], serializer_class=AttendanceMarkSerializer)
+    def mark(self, request, pk=None):
+        """
+        Mark the whole session at once: ``{"marks": {student_id: status}}``.
+
+        Written with a single upsert; returns what changed
+        (``created``/``updated``/``unchanged``).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = get_object_or_404(AttendanceSession.objects.only('id', 'course_section_id', 'is_cancelled'), pk=pk)
+        self.check_object_permissions(request, session)
+        try:
+            diff = mark_attendance(session, serializer.validated_data['marks'], serializer.validated_data.get('remarks'))
+        except DjangoValidationError as e:
+            raise ValidationError({'marks': e.message_dict if hasattr(e, 'error_dict') else e.messages})
+        return Response({'session': session.pk, **diff})
+
 
 class AttendanceRecordViewSet(viewsets.ModelViewSet):
     queryset = AttendanceRecord.objects.all().select_related('session', 'student')
     serializer_class = AttendanceRecordSerializer
+    filter_backends = [filters.OrderingFilter]
+    # Newest first by primary key: the cursor walks the pk index, no join or sort
+    ordering_fields = ['id', 'updated_at']
+    ordering = ['-id']
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        uncount_records(AttendanceRecord.objects.filter(pk=instance.pk))
+        instance.delete()
+
+
+
+class AttendanceSummaryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Attendance percentages from the summary table (see attendance.summary).
+
+    ``?student=<id>`` lists one student's sections, ``?course_section=<id>``
+    one section's students; one of them is required. Late counts as
+    attended. Not paginated: either list is one indexed read of a few
+    hundred rows at most.
+    """
+
+    queryset = AttendanceSummary.objects.select_related('student', 'course_section__course').only(
+        'student', 'course_section', 'present', 'absent', 'late', 'excused', 'total', 'updated_at',
+        'student__roll_number', 'student__first_name', 'student__middle_name', 'student__last_name',
+        'course_section__course__code',
+    )
+    serializer_class = AttendanceSummarySerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        params = self.request.query_params
+        filters = {}
+        try:
+            if params.get('student'):
+                filters['student_id'] = AttendanceSummary._meta.get_field('student').target_field.to_python(
+                    params['student']
+                )
+            if params.get('course_section'):
+                filters['course_section_id'] = int(params['course_section'])
+        except (DjangoValidationError, ValueError):
+            raise ValidationError({'detail': 'student must be a student id and course_section a section id.'})
+        if not filters:
+            raise ValidationError({'detail': 'Filter by student or course_section.'})
+        queryset = super().get_queryset().filter(**filters)
+        if 'course_section_id' in filters:
+            return queryset.order_by('student__roll_number')
+        return queryset.order_by('course_section__course__code')
+
+
+class AttendanceShortageViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Students below the attendance threshold, from the daily snapshot (see attendance.shortages).
+
+    Lists the latest snapshot unless ``snapshot_date`` is given. Filter by
+    ``course_section``, ``course``, ``department`` (the student's, for HODs),
+    ``mentor`` (a faculty id, for their mentees), ``student``,
+    ``percentage_max`` or ``is_new`` (short since the previous snapshot).
+    Lowest percentage first.
+    """
+
+    queryset = AttendanceShortage.objects.select_related('student', 'course_section__course')
+    serializer_class = AttendanceShortageSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = AttendanceShortageFilter
+    ordering_fields = ['percentage', 'id']
+    ordering = ['percentage', 'id']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and not self.request.query_params.get('snapshot_date'):
+            queryset = queryset.filter(snapshot_date=latest_snapshot_date())
+        return queryset
+
+
+class AttendanceSyncViewSet(viewsets.ViewSet):
+    """
+    Offline attendance sync (see attendance.sync).
+
+    ``POST attendance/sync/`` applies a batch of marks across sessions, each
+    with the device time it was taken, once per idempotency key (body
+    ``idempotency_key`` or ``Idempotency-Key`` header): a retry returns the
+    first response. With ``cursor`` the response also carries the server
+    changes since it, so a device syncs in one round-trip.
+    ``GET attendance/sync/changes/?cursor=&course_section=`` pages through
+    the changes alone. Faculty see and mark the sections they teach, staff
+    all of them.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _changes(self, cursor, course_section_ids, session_ids=None):
+        course_section_ids = course_section_ids or None
+        allowed = sync_sections(self.request.user)
+        if allowed is not None:
+            course_section_ids = allowed if course_section_ids is None else set(course_section_ids) & allowed
+        try:
+            return changes_since(cursor, course_section_ids, session_ids)
+        except ValueError:
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+
+    def create(self, request):
+        serializer = AttendanceSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        key = data.get('idempotency_key') or request.headers.get('Idempotency-Key')
+        if not key:
+            raise ValidationError({'idempotency_key': 'Send idempotency_key or the Idempotency-Key header.'})
+        if len(key) > 100:
+            raise ValidationError({'idempotency_key': 'At most 100 characters.'})
+        response, replayed = apply_sync(request.user, key, data['marks'])
+        body = {'idempotency_key': key, 'replayed': replayed, **response}
+        if 'cursor' in data:
+            body['changes'] = self._changes(data['cursor'] or None, data.get('course_section'))
+        return Response(body, status=status.HTTP_200_OK if replayed else status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Records and sessions changed since ``cursor``, oldest first"""
+        params = request.query_params
+        try:
+            course_section_ids = [int(value) for value in params.getlist('course_section')]
+            session_ids = [int(value) for value in params.getlist('session')]
+        except ValueError:
+            raise ValidationError({'detail': 'course_section and session must be ids.'})
+        return Response(self._changes(params.get('cursor') or None, course_section_ids, session_ids))
@@ -1,2 +1,9 @@
 
 default_app_config = 'campshub360.apps.CoreConfig'
+
+try:
+    from .celery import app as celery_app
+except ImportError:  # Celery is optional (see jobs.runner)
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -5,4 +5,11 @@ class CoreConfig(AppConfig):
     name = 'campshub360'
     default_auto_field = 'django.db.models.BigAutoField'
 
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .typeahead import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='campshub360.typeahead')
+
 
@@ -0,0 +1,273 @@
+"""
+Query/result caching layer for the CampsHub360 API.
+
+Entries are stored in the ``query_cache`` alias and are validated against a set
+of *tags* (one per model, one per model instance). Every tag carries a version
+counter; a write to a registered model bumps the tags it touches, which makes
+every entry computed under the old version a miss without having to know or
+scan its key. Tag versions are read together with the entry in a single
+``get_many`` call, so a cache lookup is one round-trip.
+"""
+
+import functools
+import hashlib
+import logging
+import time
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .performance_monitor import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ALIAS = getattr(settings, 'QUERY_CACHE_ALIAS', 'query_cache')
+DEFAULT_PREFIX = getattr(settings, 'QUERY_CACHE_PREFIX', 'ch360')
+
+_MISS = object()
+
+
+def _label(model) -> str:
+    return model._meta.label_lower
+
+
+class CacheManager:
+    """Tag-versioned cache on top of a Django cache alias."""
+
+    def __init__(self, alias: str = DEFAULT_ALIAS, prefix: str = DEFAULT_PREFIX):
+        self.alias = alias
+        self.prefix = prefix
+        self._registered = {}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    # ------------------------------------------------------------------
+    # Keys and tags
+    # ------------------------------------------------------------------
+    def model_tag(self, model) -> str:
+        """Namespace tag covering every row of ``model``."""
+        return f"model:{_label(model)}"
+
+    def instance_tag(self, model, pk) -> str:
+        """Tag covering a single ``model`` row."""
+        return f"model:{_label(model)}:{pk}"
+
+    def make_key(self, namespace: str, *parts) -> str:
+        digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+        return f"{self.prefix}:{namespace}:{digest}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.prefix}:tagv:{tag}"
+
+    def _fresh_version(self) -> int:
+        # Seeded from the clock so an evicted counter never restarts at a
+        # value an older entry was stored under.
+        return int(time.time() * 1000)
+
+    def get_tag_versions(self, tags: Iterable[str]) -> dict:
+        tags = list(tags)
+        if not tags:
+            return {}
+        keys = {self._version_key(tag): tag for tag in tags}
+        found = self.cache.get_many(list(keys))
+        versions = {}
+        for key, tag in keys.items():
+            if key in found:
+                versions[tag] = found[key]
+            else:
+                self.cache.add(key, self._fresh_version(), None)
+                versions[tag] = self.cache.get(key)
+        return versions
+
+    # ------------------------------------------------------------------
+    # Reads and writes
+    # ------------------------------------------------------------------
+    def _lookup(self, key: str, tags: list):
+        """Return ``(value, versions)`` from a single round-trip.
+
+        ``versions`` are the tag versions observed *before* any recompute, so
+        a write racing with the recompute still invalidates the new entry.
+        """
+        version_keys = [self._version_key(tag) for tag in tags]
+        try:
+            found = self.cache.get_many([key] + version_keys)
+        except Exception:
+            logger.warning('Cache read failed for %s', key, exc_info=True)
+            return _MISS, None
+
+        versions = {tag: found.get(vk) for tag, vk in zip(tags, version_keys)}
+        entry = found.get(key)
+        if entry is None:
+            record_cache_access(False)
+            return _MISS, versions
+        stored_versions, value = entry
+        if any(stored_versions.get(tag) != version for tag, version in versions.items()):
+            record_cache_access(False)
+            return _MISS, versions
+        record_cache_access(True)
+        return value, versions
+
+    def get(self, key: str, tags: Iterable[str] = (), default=None):
+        """Return the cached value for ``key`` or ``default`` if stale/missing."""
+        value, _ = self._lookup(key, list(tags))
+        return default if value is _MISS else value
+
+    def set(self, key: str, value, tags: Iterable[str] = (), ttl: Optional[int] = None, versions: Optional[dict] = None):
+        """Store ``value`` under ``key`` stamped with the tag versions."""
+        tags = list(tags)
+        try:
+            if versions is None or any(versions.get(tag) is None for tag in tags):
+                current = self.get_tag_versions(tags)
+                versions = {tag: (versions or {}).get(tag) or current[tag] for tag in tags}
+            if ttl is None:
+                self.cache.set(key, (versions, value))
+            else:
+                self.cache.set(key, (versions, value), ttl)
+        except Exception:
+            logger.warning('Cache write failed for %s', key, exc_info=True)
+
+    def get_or_set(self, key: str, producer: Callable, tags: Iterable[str] = (), ttl: Optional[int] = None):
+        tags = list(tags)
+        value, versions = self._lookup(key, tags)
+        if value is _MISS:
+            value = producer()
+            self.set(key, value, tags, ttl, versions=versions)
+        return value
+
+    def delete(self, key: str):
+        self.cache.delete(key)
+
+    def get_instance(self, model, pk, ttl: Optional[int] = None, queryset=None):
+        """Fetch a single model instance through the cache."""
+        key = self.make_key(f"obj:{_label(model)}", str(pk))
+        qs = queryset if queryset is not None else model._default_manager.all()
+        return self.get_or_set(key, lambda: qs.get(pk=pk), [self.instance_tag(model, pk)], ttl)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate_tags(self, *tags: str):
+        for tag in tags:
+            key = self._version_key(tag)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, self._fresh_version(), None)
+            except Exception:
+                logger.warning('Cache invalidation failed for tag %s', tag, exc_info=True)
+
+    def invalidate_model(self, model, pks: Iterable = ()):
+        """Invalidate the model namespace and, optionally, specific rows.
+
+        Use this from bulk paths (``QuerySet.update``, ``bulk_create``) that do
+        not emit model signals.
+        """
+        tags = [self.model_tag(model)]
+        tags.extend(self.instance_tag(model, pk) for pk in pks)
+        transaction.on_commit(lambda: self.invalidate_tags(*tags))
+
+    def register_model(self, model, parents: Iterable[str] = ()):
+        """Invalidate ``model`` tags on save/delete.
+
+        ``parents`` names foreign keys whose target rows should be invalidated
+        too, e.g. ``StudentDocument`` with ``parents=('student',)`` so cached
+        student detail pages pick up new documents.
+        """
+        parents = tuple(parents)
+        label = _label(model)
+        if label in self._registered:
+            self._registered[label] = tuple(set(self._registered[label]) | set(parents))
+            return model
+        self._registered[label] = parents
+
+        def _invalidate(sender, instance, **kwargs):
+            tags = [self.model_tag(sender), self.instance_tag(sender, instance.pk)]
+            for field_name in self._registered.get(_label(sender), ()):
+                field = sender._meta.get_field(field_name)
+                parent_pk = getattr(instance, field.attname, None)
+                if parent_pk is not None:
+                    tags.append(self.model_tag(field.related_model))
+                    tags.append(self.instance_tag(field.related_model, parent_pk))
+            transaction.on_commit(lambda: self.invalidate_tags(*tags))
+
+        post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"cache_utils:{label}:save")
+        post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"cache_utils:{label}:delete")
+        return model
+
+
+cache_manager = CacheManager()
+
+
+def cached_model(model=None, *, parents: Iterable[str] = ()):
+    """Register a model for signal-driven cache invalidation.
+
+    Works as a class decorator (``@cached_model`` or
+    ``@cached_model(parents=('student',))``) or as a plain call
+    ``cached_model(StudentDocument, parents=('student',))``.
+    """
+    def register(cls):
+        return cache_manager.register_model(cls, parents=parents)
+
+    if model is None:
+        return register
+    return register(model)
+
+
+def cached_query(ttl: Optional[int] = None, models: Iterable = (), per_object: bool = False,
+                 vary_on_user: bool = False, key_func: Optional[Callable] = None):
+    """Cache the ``Response.data`` of a DRF view method.
+
+    Only safe requests with a 200 response are cached. Entries are tagged with
+    the namespace of each model in ``models``; with ``per_object=True`` and a
+    ``pk`` URL kwarg, the entry is tagged with that row of the first model
+    instead, so writes to other rows leave it alone.
+    """
+    models = tuple(models)
+    for model in models:
+        cache_manager.register_model(model)
+
+    def decorator(view_method):
+        namespace = f"view:{view_method.__module__}.{view_method.__qualname__}"
+
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            from rest_framework.response import Response
+
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            if key_func is not None:
+                parts = (key_func(self, request, *args, **kwargs),)
+            else:
+                parts = (request.get_full_path(), sorted(kwargs.items()))
+            if vary_on_user:
+                parts += (getattr(request.user, 'pk', None),)
+            key = cache_manager.make_key(namespace, *parts)
+
+            pk = kwargs.get('pk')
+            if per_object and models and pk is not None:
+                tags = [cache_manager.instance_tag(models[0], pk)]
+                tags.extend(cache_manager.model_tag(m) for m in models[1:])
+            else:
+                tags = [cache_manager.model_tag(m) for m in models]
+
+            data, versions = cache_manager._lookup(key, tags)
+            if data is not _MISS:
+                request._cache_hit = True
+                return Response(data)
+
+            request._cache_hit = False
+            response = view_method(self, request, *args, **kwargs)
+            if getattr(response, 'status_code', None) == 200 and hasattr(response, 'data'):
+                cache_manager.set(key, response.data, tags, ttl, versions=versions)
+            return response
+
+        return wrapper
+
+    return decorator
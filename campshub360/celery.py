@@ -0,0 +1,15 @@
+"""
+Celery application, used only when JOBS_BACKEND is 'celery'.
+
+    celery -A campshub360 worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'campshub360.settings')
+
+app = Celery('campshub360')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
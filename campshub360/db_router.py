@@ -0,0 +1,201 @@
+"""
+Read-replica routing for the CampsHub360 API.
+
+``ReadReplicaMiddleware`` decides per request whether ORM reads may be served
+by the ``read_replica`` alias: safe-method requests under
+``READ_REPLICA_PATH_PREFIXES`` (the API by default) and any view marked with
+``use_read_replica`` (reporting pages, analytics viewsets). ``ReplicaRouter``
+then sends reads to the replica while:
+
+* no write has happened earlier in the same request (per-request pinning),
+* the client has not written within ``READ_REPLICA_PIN_SECONDS`` (clients are
+  identified by their Authorization header or session cookie, so JWT API
+  clients and dashboard users both read their own writes),
+* the replica answers and its replay lag is below ``READ_REPLICA_MAX_LAG_SECONDS``.
+
+Outside a request (management commands, workers) everything uses ``default``.
+"""
+
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+PRIMARY = 'default'
+REPLICA = 'read_replica'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = contextvars.ContextVar('db_router_state', default=None)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class _RequestState:
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+class _ReplicaHealth:
+    """Process-wide, periodically refreshed replica availability flag."""
+
+    LAG_SQL = (
+        "SELECT CASE "
+        "WHEN NOT pg_is_in_recovery() THEN 0 "
+        "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+        "END"
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._healthy = False
+
+    def reset(self):
+        with self._lock:
+            self._checked_at = 0.0
+
+    def is_healthy(self) -> bool:
+        interval = _setting('READ_REPLICA_HEALTH_CHECK_INTERVAL', 10)
+        now = time.monotonic()
+        if now - self._checked_at < interval:
+            return self._healthy
+        with self._lock:
+            if now - self._checked_at < interval:
+                return self._healthy
+            self._healthy = self._check()
+            self._checked_at = time.monotonic()
+            return self._healthy
+
+    def _check(self) -> bool:
+        connection = connections[REPLICA]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(self.LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+        except Exception as exc:
+            logger.warning('Read replica unavailable, using primary: %s', exc)
+            connection.close()
+            return False
+        max_lag = _setting('READ_REPLICA_MAX_LAG_SECONDS', 5)
+        if lag > max_lag:
+            logger.warning('Read replica lag %.1fs exceeds %ss, using primary', lag, max_lag)
+            return False
+        return True
+
+
+replica_health = _ReplicaHealth()
+
+
+def use_read_replica(view):
+    """Mark a function view or view class as safe to serve from the replica."""
+    view.use_read_replica = True
+    return view
+
+
+class ReplicaRouter:
+    """Route reads to ``read_replica`` when the current request allows it."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        if connections[PRIMARY].in_atomic_block:
+            return None
+        if not replica_health.is_healthy():
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def _client_key(request):
+    identity = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not identity:
+        return None
+    return 'dbrouter:pin:' + hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def _view_allows_replica(view_func) -> bool:
+    if getattr(view_func, 'use_read_replica', False):
+        return True
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    return bool(getattr(view_class, 'use_read_replica', False))
+
+
+class ReadReplicaMiddleware:
+    """Enable replica reads for eligible requests and pin clients after writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @property
+    def enabled(self) -> bool:
+        return _setting('READ_REPLICA_ENABLED', False) and REPLICA in settings.DATABASES
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        state = _RequestState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote or request.method not in SAFE_METHODS:
+            key = _client_key(request)
+            if key:
+                try:
+                    caches['default'].set(key, 1, _setting('READ_REPLICA_PIN_SECONDS', 10))
+                except Exception:
+                    logger.warning('Could not record read-your-writes pin', exc_info=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if state is None or request.method not in SAFE_METHODS:
+            return None
+
+        prefixes = tuple(_setting('READ_REPLICA_PATH_PREFIXES', ('/api/',)))
+        if not (request.path.startswith(prefixes) or _view_allows_replica(view_func)):
+            return None
+
+        key = _client_key(request)
+        if key:
+            try:
+                if caches['default'].get(key):
+                    return None
+            except Exception:
+                return None
+        state.use_replica = True
+        return None
@@ -3,7 +3,7 @@ Health check views for the CampsHub360 application.
 These views provide endpoints for monitoring application health, readiness, and liveness.
 """
 
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.db import connection
 from django.core.cache import cache
 from django.conf import settings
@@ -150,3 +150,16 @@ def liveness_check(request):
         'status': 'alive',
         'message': 'Application is alive and running'
     })
+
+
+def metrics(request):
+    """
+    Prometheus metrics endpoint.
+    Exposes per-route latency, DB query, cache and response size histograms
+    collected by PerformanceMonitorMiddleware in this worker process.
+    """
+    from .performance_monitor import registry
+    return HttpResponse(
+        registry.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,271 @@
+"""
+Benchmark every GET-able DRF route against the current database.
+
+Routes are discovered from the root URLconf. List routes are requested as is;
+detail routes get a sample primary key from the view's ``queryset`` (or the
+``kwargs`` declared for the route in the budgets file). Each route is
+requested ``--iterations`` times after ``--warmup`` requests and the command
+records the number of DB queries (the highest seen, i.e. the uncached path),
+p50/p95 latency and payload size.
+
+Results are written as a JSON baseline. Budgets are read from
+``benchmarks/budgets.json``::
+
+    {
+      "defaults": {"max_queries": 50, "p95_ms": 2000, "max_bytes": 5000000},
+      "routes": {
+        "students_api:student-list": {"max_queries": 10, "p95_ms": 300},
+        "fees:*": {"max_queries": 20}
+      }
+    }
+
+A route's ``query`` is sent as query parameters; a parameter set to ``null``
+takes a sample value of the same-named field from the view's ``queryset``,
+e.g. ``"query": {"course_section": null}`` for a list that must be filtered.
+
+Route keys are URL names (``namespace:name``) and may use shell-style
+wildcards; the first matching entry is merged over the defaults. A response
+outside 2xx is a violation too, unless the route declares the ``status``
+(a code or a list of codes) it is expected to answer with. The command exits
+with an error when any endpoint exceeds its budget, so it can run in CI
+after ``generate_benchmark_data``.
+"""
+
+import fnmatch
+import json
+import math
+import re
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from campshub360.performance_monitor import RequestMetrics
+
+User = get_user_model()
+
+BUDGET_KEYS = ('max_queries', 'p50_ms', 'p95_ms', 'max_bytes')
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _pattern_kwargs(pattern):
+    regex = getattr(pattern, 'regex', None)
+    names = set(regex.groupindex) if regex is not None else set()
+    names.update(getattr(pattern, 'converters', {}))
+    return names
+
+
+def iter_api_routes(patterns=None, namespace=None, kwargs=frozenset()):
+    """Yield ``(url_name, view_class, url_kwarg_names)`` for GET-able DRF routes."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for entry in patterns:
+        entry_kwargs = kwargs | _pattern_kwargs(entry.pattern)
+        if isinstance(entry, URLResolver):
+            child_namespace = ':'.join(filter(None, [namespace, entry.namespace])) or None
+            yield from iter_api_routes(entry.url_patterns, child_namespace, entry_kwargs)
+            continue
+
+        view_class = getattr(entry.callback, 'cls', None)
+        if not entry.name or view_class is None or not issubclass(view_class, APIView):
+            continue
+        if 'format' in entry_kwargs:
+            continue
+        actions = getattr(entry.callback, 'actions', None)
+        if actions is not None and 'get' not in actions:
+            continue
+        if actions is None and not hasattr(view_class, 'get'):
+            continue
+        name = f'{namespace}:{entry.name}' if namespace else entry.name
+        yield name, view_class, entry_kwargs
+
+
+class Command(BaseCommand):
+    help = 'Measure query counts, latency and payload size of API endpoints and check them against budgets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budgets', type=str, default='benchmarks/budgets.json', help='Budgets JSON file')
+        parser.add_argument('--output', type=str, default='benchmarks/baseline.json', help='Where to write results')
+        parser.add_argument('--iterations', type=int, default=10, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=1, help='Unmeasured requests per endpoint')
+        parser.add_argument('--include', type=str, help='Only benchmark route names matching this regex')
+        parser.add_argument('--exclude', type=str, help='Skip route names matching this regex')
+        parser.add_argument('--user', type=str, help='Username or email to authenticate as (default: first superuser)')
+        parser.add_argument('--no-fail', action='store_true', help='Report budget violations without failing')
+
+    def handle(self, *args, **options):
+        budgets = self.load_budgets(options['budgets'])
+        client = self.make_client(options['user'])
+        include = re.compile(options['include']) if options['include'] else None
+        exclude = re.compile(options['exclude']) if options['exclude'] else None
+        iterations = max(1, options['iterations'])
+
+        results, violations, seen = {}, [], set()
+        for name, view_class, url_kwargs in iter_api_routes():
+            if name in seen or (include and not include.search(name)) or (exclude and exclude.search(name)):
+                continue
+            seen.add(name)
+            budget = self.budget_for(name, budgets)
+            path = self.resolve_path(name, view_class, url_kwargs, budget.get('kwargs'))
+            if path is None:
+                self.stdout.write(f'  skip {name}: no sample value for {", ".join(sorted(url_kwargs))}')
+                continue
+
+            query = self.resolve_query(view_class, budget.get('query'))
+            if query is None:
+                self.stdout.write(f'  skip {name}: no sample value for its query parameters')
+                continue
+
+            result = self.measure(client, path, query, options['warmup'], iterations)
+            result['budget'] = {key: budget[key] for key in BUDGET_KEYS if key in budget}
+            result['violations'] = self.unexpected_status(result, budget.get('status')) + self.over_budget(result)
+            results[name] = result
+            violations.extend(f'{name}: {violation}' for violation in result['violations'])
+
+            marker = self.style.ERROR('FAIL') if result['violations'] else self.style.SUCCESS('ok  ')
+            self.stdout.write(
+                f'  {marker} {name} [{result["status"]}] {result["queries"]} queries, '
+                f'p50 {result["p50_ms"]}ms, p95 {result["p95_ms"]}ms, {result["bytes"]} bytes'
+            )
+
+        self.write_output(options['output'], results, iterations)
+        if violations and not options['no_fail']:
+            raise CommandError('Performance budgets exceeded:\n' + '\n'.join(violations))
+        self.stdout.write(self.style.SUCCESS(f'Benchmarked {len(results)} endpoints, {len(violations)} budget violations.'))
+
+    def load_budgets(self, path):
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path(settings.BASE_DIR) / path
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f'No budgets file at {path}; recording results only'))
+            return {'defaults': {}, 'routes': {}}
+        with path.open() as handle:
+            data = json.load(handle)
+        return {'defaults': data.get('defaults', {}), 'routes': data.get('routes', {})}
+
+    def budget_for(self, name, budgets):
+        budget = dict(budgets['defaults'])
+        for pattern, route_budget in budgets['routes'].items():
+            if pattern == name or fnmatch.fnmatchcase(name, pattern):
+                budget.update(route_budget)
+                break
+        return budget
+
+    def make_client(self, identifier):
+        if identifier:
+            user = User.objects.filter(username=identifier).first() or User.objects.filter(email=identifier).first()
+            if user is None:
+                raise CommandError(f'User {identifier} not found')
+        else:
+            user = User.objects.filter(is_superuser=True, is_active=True).order_by('date_joined').first()
+            if user is None:
+                raise CommandError('No active superuser found; create one or pass --user')
+        hosts = [host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')]
+        client = APIClient(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        client.force_authenticate(user=user)
+        return client
+
+    def resolve_path(self, name, view_class, url_kwargs, declared):
+        kwargs = dict(declared or {})
+        missing = set(url_kwargs) - set(kwargs)
+        if missing:
+            lookup_kwarg = getattr(view_class, 'lookup_url_kwarg', None) or getattr(view_class, 'lookup_field', 'pk')
+            queryset = getattr(view_class, 'queryset', None)
+            if missing != {lookup_kwarg} or queryset is None:
+                return None
+            value = queryset.order_by().values_list(getattr(view_class, 'lookup_field', 'pk'), flat=True).first()
+            if value is None:
+                return None
+            kwargs[lookup_kwarg] = value
+        try:
+            return reverse(name, kwargs=kwargs)
+        except NoReverseMatch:
+            return None
+
+    def resolve_query(self, view_class, declared):
+        query = dict(declared or {})
+        queryset = getattr(view_class, 'queryset', None)
+        for param, value in query.items():
+            if value is None:
+                if queryset is None:
+                    return None
+                value = queryset.order_by().values_list(param, flat=True).first()
+                if value is None:
+                    return None
+                query[param] = str(value)
+        return query
+
+    def measure(self, client, path, query, warmup, iterations):
+        for _ in range(warmup):
+            client.get(path, query)
+
+        latencies, queries, statuses, size = [], [], set(), 0
+        for _ in range(iterations):
+            metrics = RequestMetrics(method='GET', route=path)
+            with ExitStack() as stack:
+                metrics.instrument(stack)
+                started = time.perf_counter()
+                response = client.get(path, query)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(metrics.query_count)
+            statuses.add(response.status_code)
+            size = len(b''.join(response.streaming_content) if response.streaming else response.content)
+
+        return {
+            'path': path,
+            'status': response.status_code,
+            'statuses': sorted(statuses),
+            'queries': max(queries),
+            'queries_min': min(queries),
+            'p50_ms': round(_percentile(latencies, 0.5), 2),
+            'p95_ms': round(_percentile(latencies, 0.95), 2),
+            'bytes': size,
+        }
+
+    def unexpected_status(self, result, expected):
+        """Every measured response must be 2xx, or one of the route's declared ``status`` codes"""
+        if expected is None:
+            unexpected = [status for status in result['statuses'] if not 200 <= status < 300]
+        else:
+            expected = expected if isinstance(expected, list) else [expected]
+            unexpected = [status for status in result['statuses'] if status not in expected]
+        return [f'status {status}' for status in unexpected]
+
+    def over_budget(self, result):
+        budget = result['budget']
+        measured = {'max_queries': result['queries'], 'p50_ms': result['p50_ms'],
+                    'p95_ms': result['p95_ms'], 'max_bytes': result['bytes']}
+        return [
+            f'{key.replace("max_", "")} {measured[key]} > {budget[key]}'
+            for key in BUDGET_KEYS
+            if key in budget and measured[key] > budget[key]
+        ]
+
+    def write_output(self, output, results, iterations):
+        path = Path(output)
+        if not path.is_absolute():
+            path = Path(settings.BASE_DIR) / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'endpoints': results,
+        }
+        with path.open('w') as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True, default=str)
+        self.stdout.write(f'Results written to {path}')
@@ -0,0 +1,620 @@
+"""
+Generate a production-sized, deterministic dataset for performance work.
+
+The generated campus has departments and programs, faculty and students (with
+login users), course sections with timetables and enrollments, a term of
+attendance sessions and records, fees and payments, end-semester exam
+registrations and results, and assignments with submissions. All identifiers
+start with ``--prefix`` so the data can be told apart from (and flushed
+without touching) real records, and the same ``--seed`` always produces the
+same rows.
+
+Lookup tables are written with ``bulk_create``; high-volume tables are
+streamed with PostgreSQL ``COPY`` (chunked ``bulk_create`` on other
+databases or with ``--no-copy``). Signals are not fired, so users, section
+counts and fee balances are computed here instead of by ``save()``.
+"""
+
+import itertools
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+from academics.models import AcademicProgram, Course, CourseEnrollment, CourseSection, Department, Timetable
+from accounts.models import AuthIdentifier, IdentifierType
+from assignments.models import Assignment, AssignmentCategory, AssignmentSubmission
+from attendance.models import AttendanceRecord, AttendanceSession, AttendanceSummary
+from attendance.summary import reconcile_attendance_summary
+from campshub360.cache_utils import cache_manager
+from exams.models import ExamRegistration, ExamResult, ExamSchedule, ExamSession
+from faculty.models import Faculty
+from fees.models import FeeCategory, FeeStructure, FeeStructureDetail, Payment, StudentFee
+from students.models import Student
+from students.services import invalidate_divisions
+from students.stats import defer_stats, reconcile_student_stats
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'bench.campushub.local'
+DEFAULT_PASSWORD = 'Campus@360'
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Bhavya', 'Deepak', 'Divya', 'Gaurav', 'Ishita',
+    'Karan', 'Kavya', 'Lakshmi', 'Manish', 'Meera', 'Nikhil', 'Pooja', 'Rahul', 'Sneha', 'Vikram',
+]
+LAST_NAMES = [
+    'Agarwal', 'Bhat', 'Chopra', 'Das', 'Iyer', 'Joshi', 'Kapoor', 'Kumar', 'Menon', 'Nair',
+    'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma', 'Yadav',
+]
+CITIES = [
+    ('Bengaluru', 'Karnataka'), ('Chennai', 'Tamil Nadu'), ('Hyderabad', 'Telangana'),
+    ('Mumbai', 'Maharashtra'), ('Pune', 'Maharashtra'), ('Kochi', 'Kerala'),
+]
+DAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT']
+PERIODS = [dtime(9, 0), dtime(10, 0), dtime(11, 15), dtime(12, 15), dtime(14, 0), dtime(15, 0), dtime(16, 0)]
+PAYMENT_METHODS = ['CASH', 'BANK_TRANSFER', 'ONLINE', 'CARD', 'UPI']
+# (category, frequency, amount, installments paid in full)
+FEE_ITEMS = [
+    ('Tuition', 'MONTHLY', Decimal('60000.00'), 10),
+    ('Examination', 'SEMESTER', Decimal('2500.00'), 1),
+    ('Library', 'ANNUAL', Decimal('1500.00'), 1),
+]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _grade(percentage):
+    for bound, grade in ((90, 'A+'), (80, 'A'), (70, 'B+'), (60, 'B'), (50, 'C+'), (40, 'C'), (30, 'D')):
+        if percentage >= bound:
+            return grade
+    return 'F'
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic synthetic dataset for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50000, help='Number of students')
+        parser.add_argument('--faculty', type=int, default=1000, help='Number of faculty members')
+        parser.add_argument('--departments', type=int, default=10, help='Number of departments')
+        parser.add_argument('--courses-per-department', type=int, default=32, help='Courses per department (spread over 4 years)')
+        parser.add_argument('--courses-per-student', type=int, default=6, help='Courses each student is enrolled in')
+        parser.add_argument('--section-size', type=int, default=60, help='Students per course section')
+        parser.add_argument('--classes-per-week', type=int, default=3, help='Timetable slots per section')
+        parser.add_argument('--weeks', type=int, default=16, help='Weeks of attendance sessions to generate')
+        parser.add_argument('--assignments-per-section', type=int, default=4, help='Assignments per course section')
+        parser.add_argument('--start-date', type=str, default='2024-07-01', help='Term start date YYYY-MM-DD')
+        parser.add_argument('--academic-year', type=str, default='2024-2025', help='Academic year, e.g. 2024-2025')
+        parser.add_argument('--prefix', type=str, default='BM', help='Prefix for generated identifiers')
+        parser.add_argument('--seed', type=int, default=360, help='Random seed')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk_create batch')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create even on PostgreSQL')
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated data for this prefix first')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.prefix = options['prefix'].upper()
+        self.rng = Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.use_copy = connection.vendor == 'postgresql' and is_psycopg3 and not options['no_copy']
+        self.academic_year = options['academic_year']
+        self.term_start = date.fromisoformat(options['start_date'])
+        self.term_start -= timedelta(days=self.term_start.weekday())
+        self.now = timezone.now()
+
+        if len(self.prefix) > 4 or not self.prefix.isalnum():
+            raise CommandError('--prefix must be 1-4 alphanumeric characters')
+        if options['flush']:
+            self.flush()
+        elif Student.objects.filter(roll_number__startswith=self.prefix).exists():
+            raise CommandError(f'Benchmark data with prefix {self.prefix} already exists; use --flush to regenerate it')
+
+        self.stdout.write(
+            f'Generating benchmark data (seed={options["seed"]}, loader={"COPY" if self.use_copy else "bulk_create"})...'
+        )
+        started = time.perf_counter()
+        self.stage('departments and programs', self.create_departments)
+        self.stage('faculty', self.create_faculty)
+        self.stage('courses', self.create_courses)
+        self.stage('students', self.create_students)
+        self.stage('student stats', self.rebuild_student_stats)
+        self.stage('course sections and enrollments', self.create_sections)
+        self.stage('timetables', self.create_timetables)
+        self.stage('attendance sessions', self.create_attendance_sessions)
+        self.stage('attendance records', self.create_attendance_records)
+        self.stage('attendance summary', self.rebuild_attendance_summary)
+        self.stage('student fees and payments', self.create_fees)
+        self.stage('exam registrations and results', self.create_exams)
+        self.stage('assignments and submissions', self.create_assignments)
+
+        for model in (Student, Faculty, Course, CourseSection, AttendanceRecord, StudentFee, Payment):
+            cache_manager.invalidate_model(model)
+        self.stdout.write(self.style.SUCCESS(f'Benchmark data generated in {time.perf_counter() - started:.1f}s.'))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def stage(self, label, func):
+        started = time.perf_counter()
+        with transaction.atomic():
+            counts = func()
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(f'  {label}: {summary} ({time.perf_counter() - started:.1f}s)')
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def aware(self, day, at=dtime(9, 0)):
+        return timezone.make_aware(datetime.combine(day, at))
+
+    def insert(self, model, fields, rows):
+        """Insert ``rows`` (tuples ordered like the ``fields`` attnames).
+
+        Columns not listed get their model default. Returns the row count.
+        """
+        if self.use_copy:
+            return self._copy(model, fields, rows)
+        count = 0
+        manager = model._default_manager
+        for chunk in _chunks(rows, self.chunk_size):
+            manager.bulk_create([model(**dict(zip(fields, row))) for row in chunk], batch_size=self.chunk_size)
+            count += len(chunk)
+        return count
+
+    def _copy(self, model, fields, rows):
+        opts = model._meta
+        by_attname = {field.attname: field for field in opts.concrete_fields}
+        columns = [by_attname[name] for name in fields]
+        converters = [
+            (index, field) for index, field in enumerate(columns) if field.get_internal_type() == 'JSONField'
+        ]
+
+        extra_columns, extra_values = [], []
+        for field in opts.concrete_fields:
+            if field.attname in fields or field.null or isinstance(field, models.AutoField):
+                continue
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                value = self.now if isinstance(field, models.DateTimeField) else self.now.date()
+            else:
+                value = field.get_default()
+            extra_columns.append(field)
+            extra_values.append(field.get_db_prep_save(value, connection))
+        extra_values = tuple(extra_values)
+
+        quote = connection.ops.quote_name
+        column_sql = ', '.join(quote(field.column) for field in columns + extra_columns)
+        sql = f'COPY {quote(opts.db_table)} ({column_sql}) FROM STDIN'
+
+        count = 0
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for row in rows:
+                    if converters:
+                        row = list(row)
+                        for index, field in converters:
+                            row[index] = field.get_db_prep_save(row[index], connection)
+                        row = tuple(row)
+                    copy.write_row(row + extra_values)
+                    count += 1
+        return count
+
+    def create_users(self, accounts, is_staff=False):
+        """Insert login users for ``(username, email)`` pairs; returns their ids.
+
+        The password is hashed once and shared, which is what makes this fast
+        compared to ``create_user`` per row.
+        """
+        password = make_password(DEFAULT_PASSWORD)
+        ids = [self.uuid() for _ in accounts]
+        self.insert(
+            User,
+            ['id', 'username', 'email', 'password', 'is_active', 'is_staff'],
+            ((user_id, username, email, password, True, is_staff) for user_id, (username, email) in zip(ids, accounts)),
+        )
+        return ids
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+    def create_departments(self):
+        count = self.options['departments']
+        self.departments = Department.objects.bulk_create([
+            Department(name=f'{self.prefix} Department {i:02d}', code=f'{self.prefix}D{i:02d}',
+                       description='Generated for benchmarking')
+            for i in range(count)
+        ])
+        self.programs = AcademicProgram.objects.bulk_create([
+            AcademicProgram(name=f'{department.name} B.Tech', code=f'{self.prefix}P{i:02d}', level='UG',
+                            department=department, duration_years=4, total_credits=160)
+            for i, department in enumerate(self.departments)
+        ])
+        return {'departments': len(self.departments), 'programs': len(self.programs)}
+
+    def create_faculty(self):
+        count = self.options['faculty']
+        designations = [choice for choice, _ in Faculty.DESIGNATION_CHOICES[:5]]
+        subjects = [choice for choice, _ in Faculty.DEPARTMENT_CHOICES]
+        accounts = [
+            (f'faculty_{self.prefix}F{i:06d}', f'{self.prefix.lower()}f{i:06d}@{EMAIL_DOMAIN}')
+            for i in range(count)
+        ]
+        user_ids = self.create_users(accounts, is_staff=True)
+
+        self.faculty_by_department = {department.pk: [] for department in self.departments}
+        rows = []
+        for i, user_id in enumerate(user_ids):
+            department = self.departments[i % len(self.departments)]
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            city, state = self.rng.choice(CITIES)
+            designation = self.rng.choice(designations)
+            faculty_id = self.uuid()
+            self.faculty_by_department[department.pk].append(faculty_id)
+            rows.append((
+                faculty_id, user_id, f'{first} {last}', f'{self.prefix}F{i:06d}', f'{self.prefix}E{i:06d}',
+                first, last, accounts[i][1], f'+91{9000000000 + i}', designation, designation,
+                subjects[i % len(subjects)], department.pk, 'Ph.D', 'Ph.D',
+                self.term_start - timedelta(days=self.rng.randint(200, 7000)),
+                date(1965, 1, 1) + timedelta(days=self.rng.randint(0, 9000)),
+                self.rng.choice('MF'), city, state,
+            ))
+        self.insert(Faculty, [
+            'id', 'user_id', 'name', 'apaar_faculty_id', 'employee_id', 'first_name', 'last_name', 'email',
+            'phone_number', 'designation', 'present_designation', 'department', 'department_ref_id',
+            'highest_degree', 'highest_qualification', 'date_of_joining', 'date_of_birth', 'gender', 'city', 'state',
+        ], rows)
+        return {'faculty': len(rows)}
+
+    def create_courses(self):
+        per_department = self.options['courses_per_department']
+        courses = []
+        for d, department in enumerate(self.departments):
+            for c in range(per_department):
+                courses.append(Course(
+                    code=f'{self.prefix}C{d:02d}{c:03d}', title=f'{department.code} Course {c + 1}',
+                    description='Generated for benchmarking', department=department,
+                    credits=self.rng.choice([2, 3, 4]), max_students=self.options['section_size'],
+                ))
+        courses = Course.objects.bulk_create(courses, batch_size=self.chunk_size)
+
+        # Course year is 1-4 by position, so each student picks from their own year.
+        self.course_pool = {}
+        program_by_department = {program.department_id: program for program in self.programs}
+        links = []
+        for index, course in enumerate(courses):
+            year = str(index % per_department % 4 + 1)
+            self.course_pool.setdefault((course.department_id, year), []).append(course)
+            links.append((course.pk, program_by_department[course.department_id].pk))
+        self.insert(Course.programs.through, ['course_id', 'academicprogram_id'], links)
+        self.courses = courses
+        return {'courses': len(courses)}
+
+    def create_students(self):
+        count = self.options['students']
+        accounts = [
+            (f'{self.prefix}{i:07d}', f'{self.prefix.lower()}{i:07d}@{EMAIL_DOMAIN}') for i in range(count)
+        ]
+        user_ids = self.create_users(accounts)
+        self.insert(AuthIdentifier, ['id', 'user_id', 'identifier', 'id_type', 'is_primary', 'is_verified'], (
+            row
+            for user_id, (username, email) in zip(user_ids, accounts)
+            for row in (
+                (self.uuid(), user_id, email, IdentifierType.EMAIL, True, False),
+                (self.uuid(), user_id, username, IdentifierType.USERNAME, False, True),
+            )
+        ))
+
+        start_year = int(self.academic_year[:4])
+        self.students = []
+        rows = []
+        for i, user_id in enumerate(user_ids):
+            department = self.departments[i % len(self.departments)]
+            program = self.programs[i % len(self.programs)]
+            year = str(self.rng.randint(1, 4))
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            city, state = self.rng.choice(CITIES)
+            student_id = self.uuid()
+            # Per-student attendance propensity so shortage reports have something to find.
+            self.students.append((student_id, department.pk, year, self.rng.uniform(0.55, 0.98)))
+            rows.append((
+                student_id, user_id, accounts[i][0], first, last,
+                date(start_year - 17 - int(year), 1, 1) + timedelta(days=self.rng.randint(0, 364)),
+                self.rng.choice('MF'), self.rng.choice('ABCD'), self.academic_year, year, str(int(year) * 2 - 1),
+                department.pk, program.pk, accounts[i][1], f'+91{8000000000 + i}', city, state,
+                date(start_year - int(year) + 1, 7, 15), 'ACTIVE',
+            ))
+        self.insert(Student, [
+            'id', 'user_id', 'roll_number', 'first_name', 'last_name', 'date_of_birth', 'gender', 'section',
+            'academic_year', 'year_of_study', 'semester', 'department_id', 'academic_program_id', 'email',
+            'student_mobile', 'city', 'state', 'enrollment_date', 'status',
+        ], rows)
+        return {'users': count, 'students': count}
+
+    def rebuild_student_stats(self):
+        # Students are loaded without signals, so the stats snapshot is counted afterwards
+        drift = reconcile_student_stats()
+        invalidate_divisions()
+        return {'stats counters': len(drift)}
+
+    def create_sections(self):
+        per_student = self.options['courses_per_student']
+        section_size = self.options['section_size']
+
+        students_by_course = {}
+        for student_id, department_id, year, _ in self.students:
+            pool = self.course_pool.get((department_id, year), [])
+            for course in self.rng.sample(pool, min(per_student, len(pool))):
+                students_by_course.setdefault(course.pk, []).append(student_id)
+
+        sections, members = [], []
+        for course in self.courses:
+            enrolled = students_by_course.get(course.pk, [])
+            faculty = self.faculty_by_department[course.department_id]
+            for number, start in enumerate(range(0, len(enrolled), section_size), 1):
+                group = enrolled[start:start + section_size]
+                sections.append(CourseSection(
+                    course=course, section_number=f'{number:02d}', academic_year=self.academic_year,
+                    semester='Fall', faculty_id=self.rng.choice(faculty), max_students=section_size,
+                    current_enrollment=len(group),
+                ))
+                members.append(group)
+        self.sections = CourseSection.objects.bulk_create(sections, batch_size=self.chunk_size)
+        self.section_students = {section.pk: group for section, group in zip(self.sections, members)}
+
+        enrollments = self.insert(CourseEnrollment, ['student_id', 'course_section_id', 'status'], (
+            (student_id, section_id, 'ENROLLED')
+            for section_id, group in self.section_students.items()
+            for student_id in group
+        ))
+        return {'sections': len(self.sections), 'enrollments': enrollments}
+
+    def create_timetables(self):
+        slots = [(day, period) for day in DAYS for period in PERIODS]
+        per_week = min(self.options['classes_per_week'], len(slots))
+        timetables = []
+        for section in self.sections:
+            for day, period in self.rng.sample(slots, per_week):
+                end = (datetime.combine(self.term_start, period) + timedelta(minutes=50)).time()
+                timetables.append(Timetable(
+                    course_section=section, day_of_week=day, start_time=period, end_time=end,
+                    room=f'{self.prefix}-R{self.rng.randint(100, 499)}',
+                ))
+        self.timetables = Timetable.objects.bulk_create(timetables, batch_size=self.chunk_size)
+        return {'timetables': len(self.timetables)}
+
+    def create_attendance_sessions(self):
+        today = timezone.localdate()
+        sessions = []
+        for week in range(self.options['weeks']):
+            week_start = self.term_start + timedelta(weeks=week)
+            for timetable in self.timetables:
+                day = week_start + timedelta(days=DAYS.index(timetable.day_of_week))
+                if day > today:
+                    continue
+                sessions.append(AttendanceSession(
+                    course_section_id=timetable.course_section_id, timetable=timetable, date=day,
+                    start_time=timetable.start_time, end_time=timetable.end_time, room=timetable.room,
+                ))
+        self.sessions = []
+        for chunk in _chunks(sessions, self.chunk_size):
+            self.sessions.extend(AttendanceSession.objects.bulk_create(chunk))
+        return {'sessions': len(self.sessions)}
+
+    def create_attendance_records(self):
+        propensity = {student_id: p for student_id, _, _, p in self.students}
+
+        def rows():
+            for session in self.sessions:
+                start = self.aware(session.date, session.start_time)
+                for student_id in self.section_students[session.course_section_id]:
+                    roll = self.rng.random()
+                    if roll < propensity[student_id]:
+                        late = self.rng.random() < 0.05
+                        minutes = self.rng.randint(6, 20) if late else self.rng.randint(0, 5)
+                        yield (session.pk, student_id, 'LATE' if late else 'PRESENT', start + timedelta(minutes=minutes))
+                    else:
+                        yield (session.pk, student_id, 'EXCUSED' if self.rng.random() < 0.1 else 'ABSENT', None)
+
+        count = self.insert(AttendanceRecord, ['session_id', 'student_id', 'status', 'check_in_time'], rows())
+        return {'records': count}
+
+    def rebuild_attendance_summary(self):
+        # Records are loaded without signals, so the summary is counted afterwards
+        drift = reconcile_attendance_summary()
+        return {'summary rows': len(drift)}
+
+    def create_fees(self):
+        details = []
+        for name, frequency, amount, installments in FEE_ITEMS:
+            category, _ = FeeCategory.objects.get_or_create(name=f'{self.prefix} {name}')
+            for year in '1234':
+                structure, _ = FeeStructure.objects.get_or_create(
+                    academic_year=self.academic_year, grade_level=year,
+                    defaults={'name': f'Year {year} fees {self.academic_year}'},
+                )
+                detail, _ = FeeStructureDetail.objects.get_or_create(
+                    fee_structure=structure, fee_category=category,
+                    defaults={'amount': amount, 'frequency': frequency,
+                              'due_date': self.term_start + timedelta(days=30)},
+                )
+                details.append((year, detail, installments))
+
+        fees, payments = [], []
+        receipt = itertools.count(1)
+        for student_id, _, year, _ in self.students:
+            for detail_year, detail, installments in details:
+                if detail_year != year:
+                    continue
+                fee_id = self.uuid()
+                outcome = self.rng.random()
+                paid_installments = installments if outcome < 0.55 else (
+                    self.rng.randint(1, max(1, installments - 1)) if outcome < 0.8 else 0
+                )
+                share = (detail.amount / installments).quantize(Decimal('0.01'))
+                amount_paid = Decimal('0.00')
+                for n in range(paid_installments):
+                    amount = detail.amount - share * (installments - 1) if n == installments - 1 else share
+                    amount_paid += amount
+                    method = self.rng.choice(PAYMENT_METHODS)
+                    number = next(receipt)
+                    payments.append((
+                        self.uuid(), fee_id, amount, method,
+                        self.aware(self.term_start + timedelta(days=30 * n + self.rng.randint(0, 20))),
+                        f'TXN{self.prefix}{number:010d}' if method != 'CASH' else None,
+                        'COMPLETED', f'RCPT{self.prefix}{number:010d}',
+                    ))
+                if amount_paid >= detail.amount:
+                    status = 'PAID'
+                elif amount_paid > 0:
+                    status = 'PARTIAL'
+                else:
+                    status = 'OVERDUE' if self.rng.random() < 0.5 else 'PENDING'
+                fees.append((fee_id, student_id, detail.pk, self.academic_year, detail.due_date,
+                             detail.amount, amount_paid, status))
+
+        self.insert(StudentFee, [
+            'id', 'student_id', 'fee_structure_detail_id', 'academic_year', 'due_date',
+            'amount_due', 'amount_paid', 'status',
+        ], fees)
+        self.insert(Payment, [
+            'id', 'student_fee_id', 'amount', 'payment_method', 'payment_date',
+            'transaction_id', 'status', 'receipt_number',
+        ], payments)
+        return {'student fees': len(fees), 'payments': len(payments)}
+
+    def create_exams(self):
+        exam_start = self.term_start + timedelta(weeks=self.options['weeks'] + 1)
+        enrolled = {}
+        for section in self.sections:
+            enrolled[section.course_id] = enrolled.get(section.course_id, 0) + section.current_enrollment
+        session = ExamSession.objects.create(
+            name=f'{self.prefix} End Semester {self.academic_year}', session_type='END_SEM',
+            academic_year=self.academic_year, semester=1, start_date=exam_start,
+            end_date=exam_start + timedelta(days=14), registration_start=self.aware(exam_start - timedelta(days=30)),
+            registration_end=self.aware(exam_start - timedelta(days=7)), status='COMPLETED',
+        )
+        schedules = ExamSchedule.objects.bulk_create([
+            ExamSchedule(
+                exam_session=session, course=course, exam_type='THEORY', title=f'{course.title} End Semester',
+                exam_date=exam_start + timedelta(days=index % 14), start_time=dtime(10, 0), end_time=dtime(13, 0),
+                duration_minutes=180, total_marks=100, passing_marks=40,
+                max_students=max(1, enrolled.get(course.pk, 0)),
+                status='COMPLETED',
+            )
+            for index, course in enumerate(self.courses)
+        ], batch_size=self.chunk_size)
+        schedule_by_course = {schedule.course_id: schedule for schedule in schedules}
+        faculty_by_section = {section.pk: section.faculty_id for section in self.sections}
+        course_by_section = {section.pk: section.course_id for section in self.sections}
+
+        registrations, results = [], []
+        evaluated_at = self.aware(session.end_date + timedelta(days=7))
+        for section_id, group in self.section_students.items():
+            schedule = schedule_by_course[course_by_section[section_id]]
+            for student_id in group:
+                registration_id = self.uuid()
+                registrations.append((registration_id, student_id, schedule.pk, 'COMPLETED'))
+                marks = Decimal(min(100, max(0, round(self.rng.gauss(62, 15))))).quantize(Decimal('0.01'))
+                published = self.rng.random() < 0.9
+                results.append((
+                    self.uuid(), registration_id, marks, _grade(marks), marks, marks >= schedule.passing_marks,
+                    faculty_by_section[section_id], evaluated_at, published, evaluated_at if published else None,
+                ))
+
+        self.insert(ExamRegistration, ['id', 'student_id', 'exam_schedule_id', 'status'], registrations)
+        self.insert(ExamResult, [
+            'id', 'exam_registration_id', 'marks_obtained', 'grade', 'percentage', 'is_pass',
+            'evaluated_by_id', 'evaluated_at', 'is_published', 'published_at',
+        ], results)
+        return {'exam schedules': len(schedules), 'registrations': len(registrations), 'results': len(results)}
+
+    def create_assignments(self):
+        category, _ = AssignmentCategory.objects.get_or_create(name=f'{self.prefix} Homework')
+        per_section = self.options['assignments_per_section']
+        weeks = max(1, self.options['weeks'])
+
+        assignments, links, due_dates = [], [], {}
+        for section in self.sections:
+            for n in range(per_section):
+                assignment_id = self.uuid()
+                due = self.aware(self.term_start + timedelta(weeks=(n + 1) * weeks // (per_section + 1)), dtime(23, 59))
+                due_dates[assignment_id] = (section.pk, due)
+                assignments.append((
+                    assignment_id, f'Assignment {n + 1}', 'Generated for benchmarking', category.pk,
+                    section.faculty_id, Decimal('20.00'), due, 'PUBLISHED', self.academic_year, 'Fall',
+                ))
+                links.append((assignment_id, section.pk))
+        self.insert(Assignment, [
+            'id', 'title', 'description', 'category_id', 'faculty_id', 'max_marks', 'due_date',
+            'status', 'academic_year', 'semester',
+        ], assignments)
+        self.insert(Assignment.assigned_to_course_sections.through, ['assignment_id', 'coursesection_id'], links)
+
+        def submissions():
+            for assignment_id, (section_id, _) in due_dates.items():
+                for student_id in self.section_students[section_id]:
+                    if self.rng.random() < 0.85:
+                        late = self.rng.random() < 0.1
+                        yield (self.uuid(), assignment_id, student_id, 'Generated submission',
+                               'LATE' if late else 'SUBMITTED', late)
+
+        count = self.insert(AssignmentSubmission, [
+            'id', 'assignment_id', 'student_id', 'content', 'status', 'is_late',
+        ], submissions())
+        return {'assignments': len(assignments), 'submissions': count}
+
+    # ------------------------------------------------------------------
+    # Cleanup
+    # ------------------------------------------------------------------
+    def flush(self):
+        """Delete data generated for this prefix, leaf tables first so deletes stay set-based."""
+        prefix = self.prefix
+        steps = [
+            AttendanceSummary.objects.filter(student__roll_number__startswith=prefix),
+            AttendanceRecord.objects.filter(student__roll_number__startswith=prefix),
+            AttendanceSession.objects.filter(course_section__course__code__startswith=f'{prefix}C'),
+            AssignmentSubmission.objects.filter(student__roll_number__startswith=prefix),
+            Assignment.objects.filter(category__name__startswith=f'{prefix} '),
+            ExamResult.objects.filter(exam_registration__student__roll_number__startswith=prefix),
+            ExamRegistration.objects.filter(student__roll_number__startswith=prefix),
+            ExamSession.objects.filter(name__startswith=f'{prefix} '),
+            Payment.objects.filter(student_fee__student__roll_number__startswith=prefix),
+            StudentFee.objects.filter(student__roll_number__startswith=prefix),
+            CourseEnrollment.objects.filter(student__roll_number__startswith=prefix),
+            Timetable.objects.filter(course_section__course__code__startswith=f'{prefix}C'),
+            CourseSection.objects.filter(course__code__startswith=f'{prefix}C'),
+            Course.objects.filter(code__startswith=f'{prefix}C'),
+            Student.objects.filter(roll_number__startswith=prefix),
+            Faculty.objects.filter(apaar_faculty_id__startswith=f'{prefix}F'),
+            AcademicProgram.objects.filter(code__startswith=f'{prefix}P'),
+            Department.objects.filter(code__startswith=f'{prefix}D'),
+            FeeCategory.objects.filter(name__startswith=f'{prefix} '),
+            AssignmentCategory.objects.filter(name__startswith=f'{prefix} '),
+            User.objects.filter(email__startswith=prefix.lower(), email__endswith=f'@{EMAIL_DOMAIN}'),
+        ]
+        with transaction.atomic():
+            # Per-student stats deltas of the deletes are merged into one write
+            with defer_stats():
+                for queryset in steps:
+                    deleted, _ = queryset.delete()
+                    if deleted:
+                        self.stdout.write(f'  removed {deleted} rows via {queryset.model.__name__}')
+            # Data generated before the stats stage existed was never counted
+            reconcile_student_stats()
+            invalidate_divisions()
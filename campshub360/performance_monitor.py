@@ -0,0 +1,330 @@
+"""
+Per-request performance monitoring for the CampsHub360 API.
+
+``PerformanceMonitorMiddleware`` measures every request: wall time, number of
+DB queries and time spent in the database (through
+``connection.execute_wrapper``), cache hits/misses reported by
+``campshub360.cache_utils`` and response size. Measurements are aggregated
+per route into in-process histograms and exposed in Prometheus text format by
+``campshub360.health_views.metrics``.
+
+Metrics live in the memory of the worker process that served the request, so
+with several gunicorn workers each scrape sees one worker's numbers; scrape
+often or add a ``worker`` label on the Prometheus side when that matters.
+"""
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+SLOW_REQUEST_SECONDS = getattr(settings, 'PERFORMANCE_SLOW_REQUEST_MS', 1000) / 1000.0
+
+_current = contextvars.ContextVar('performance_request_metrics', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram compatible with the Prometheus format."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Approximate quantile as the upper bound of the covering bucket."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, cumulative in zip(self.buckets, self.counts):
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-route histograms and counters."""
+
+    HISTOGRAMS = {
+        'campshub_request_duration_seconds': ('Request wall time in seconds', DURATION_BUCKETS),
+        'campshub_request_db_queries': ('DB queries executed per request', QUERY_COUNT_BUCKETS),
+        'campshub_request_db_duration_seconds': ('Time spent in the database per request', DURATION_BUCKETS),
+        'campshub_response_size_bytes': ('Response body size in bytes', SIZE_BUCKETS),
+    }
+    COUNTERS = {
+        'campshub_cache_requests_total': 'Query cache lookups by result',
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        if not amount:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record(self, metrics: 'RequestMetrics'):
+        labels = {'route': metrics.route, 'method': metrics.method, 'status': metrics.status_class}
+        route_labels = {'route': metrics.route}
+        self.observe('campshub_request_duration_seconds', labels, metrics.duration)
+        self.observe('campshub_request_db_queries', route_labels, metrics.query_count)
+        self.observe('campshub_request_db_duration_seconds', route_labels, metrics.db_time)
+        if metrics.response_size is not None:
+            self.observe('campshub_response_size_bytes', route_labels, metrics.response_size)
+        self.inc('campshub_cache_requests_total', dict(route_labels, result='hit'), metrics.cache_hits)
+        self.inc('campshub_cache_requests_total', dict(route_labels, result='miss'), metrics.cache_misses)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        for name, (help_text, _) in self.HISTOGRAMS.items():
+            series = [(labels, h) for (n, labels), h in histograms if n == name]
+            if not series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in series:
+                for bound, cumulative in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'{name}_bucket{_format_labels(labels, le=_format_value(bound))} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(labels, le="+Inf")} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        for name, help_text in self.COUNTERS.items():
+            series = [(labels, v) for (n, labels), v in counters if n == name]
+            if not series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in series:
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def summarize(self):
+        """Per-route summary used by the analytics endpoints."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+
+        routes = {}
+        for (name, labels), histogram in histograms.items():
+            route = dict(labels)['route']
+            entry = routes.setdefault(route, {
+                'requests': 0, 'avg_duration': 0.0, 'p95_duration': 0.0,
+                'avg_queries': 0.0, 'avg_db_time': 0.0, 'cache_hits': 0, 'cache_misses': 0,
+                '_duration': [],
+            })
+            if name == 'campshub_request_duration_seconds':
+                entry['_duration'].append(histogram)
+            elif name == 'campshub_request_db_queries' and histogram.count:
+                entry['avg_queries'] = histogram.sum / histogram.count
+            elif name == 'campshub_request_db_duration_seconds' and histogram.count:
+                entry['avg_db_time'] = histogram.sum / histogram.count
+
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            entry = routes.get(labels['route'])
+            if entry is not None:
+                entry['cache_hits' if labels['result'] == 'hit' else 'cache_misses'] += value
+
+        for entry in routes.values():
+            durations = entry.pop('_duration')
+            merged = Histogram(DURATION_BUCKETS)
+            for histogram in durations:
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            entry['requests'] = merged.count
+            if merged.count:
+                entry['avg_duration'] = merged.sum / merged.count
+                entry['p95_duration'] = merged.quantile(0.95)
+        return routes
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels, **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in items
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    """Measurements collected while a single request is being served."""
+
+    def __init__(self, method: str = '', route: str = ''):
+        self.method = method
+        self.route = route
+        self.status_class = ''
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.query_count = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.response_size: Optional[int] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting queries and DB time."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.query_count += 1
+
+    def instrument(self, stack: ExitStack):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def record_cache_access(hit: bool):
+    """Called by the cache layer for every lookup made during a request."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def _response_size(response) -> Optional[int]:
+    if getattr(response, 'streaming', False):
+        return None
+    if response.has_header('Content-Length'):
+        try:
+            return int(response['Content-Length'])
+        except (TypeError, ValueError):
+            pass
+    content = getattr(response, 'content', None)
+    return len(content) if content is not None else None
+
+
+def _resolve_route(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.route or match.view_name or '<unknown>'
+
+
+class PerformanceMonitorMiddleware:
+    """Record per-route timings, DB usage, cache usage and response size."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(method=request.method)
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                metrics.instrument(stack)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        metrics.duration = time.perf_counter() - metrics.start
+        if not metrics.route:
+            metrics.route = _resolve_route(request)
+        metrics.status_class = f'{response.status_code // 100}xx'
+        metrics.response_size = _response_size(response)
+        registry.record(metrics)
+
+        if metrics.duration >= SLOW_REQUEST_SECONDS:
+            logger.warning(
+                'Slow request %s %s: %.3fs, %d queries (%.3fs in DB)',
+                request.method, metrics.route, metrics.duration, metrics.query_count, metrics.db_time,
+            )
+        return response
+
+
+def monitor_performance(view_method):
+    """Attribute a DRF view method's measurements to a named route.
+
+    Under ``PerformanceMonitorMiddleware`` this only labels the request with
+    ``<ViewSet>.<action>`` so the middleware records it once. Without the
+    middleware (e.g. in management commands or tests) it measures the call
+    itself.
+    """
+    route_name = view_method.__qualname__
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.route = route_name
+            return view_method(self, request, *args, **kwargs)
+
+        metrics = RequestMetrics(method=request.method, route=route_name)
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                metrics.instrument(stack)
+                response = view_method(self, request, *args, **kwargs)
+        finally:
+            _current.reset(token)
+
+        metrics.duration = time.perf_counter() - metrics.start
+        metrics.status_class = f'{getattr(response, "status_code", 200) // 100}xx'
+        registry.record(metrics)
+        return response
+
+    return wrapper
@@ -0,0 +1,227 @@
+"""
+Request rate limiting and security event logging for the CampsHub360 API.
+
+Limits use a sliding-window counter: each key keeps a counter for the current
+and the previous fixed window, and a request is admitted when
+``previous * (1 - elapsed / window) + current`` stays under the limit. On
+Redis the check-and-increment is a single Lua script (one atomic round-trip
+per request); any other cache backend (locmem in development) uses plain
+cache operations.
+
+Rates are configured by scope in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``
+(e.g. ``'login': '10/min'``). Views opt in with ``throttle_scope`` or, for
+viewsets, per action with ``throttle_scopes = {'bulk_create': 'bulk'}``.
+Rejected requests get a 429 with a ``Retry-After`` header.
+"""
+
+import functools
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger('campshub360.security')
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse ``'<num>/<period>'`` (DRF syntax, e.g. ``'10/min'``) into ``(num, seconds)``."""
+    if not rate:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counter backed by a Django cache alias."""
+
+    KEY_PREFIX = 'ratelimit'
+
+    # KEYS[1] current window, KEYS[2] previous window;
+    # ARGV: limit, previous-window weight, key ttl.
+    LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+end
+return {1, current, previous}
+"""
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'default')
+        self._script = None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _redis_client(self):
+        backend = getattr(self.cache, '_cache', None)
+        get_client = getattr(backend, 'get_client', None)
+        if get_client is None:
+            return None
+        return get_client(None, write=True)
+
+    def hit(self, key, limit, window, now=None):
+        """Count one request for ``key``.
+
+        Returns ``(allowed, retry_after_seconds)``; ``retry_after`` is ``None``
+        when the request is allowed.
+        """
+        now = time.time() if now is None else now
+        index = int(now // window)
+        elapsed = now - index * window
+        weight = 1 - elapsed / window
+        current_key = f'{self.KEY_PREFIX}:{key}:{index}'
+        previous_key = f'{self.KEY_PREFIX}:{key}:{index - 1}'
+
+        try:
+            client = self._redis_client()
+            if client is not None:
+                if self._script is None:
+                    self._script = client.register_script(self.LUA)
+                allowed, current, previous = self._script(
+                    keys=[current_key, previous_key], args=[limit, weight, window * 2], client=client
+                )
+            else:
+                allowed, current, previous = self._hit_cache(current_key, previous_key, limit, weight, window)
+        except Exception:
+            # Never turn a cache outage into an API outage.
+            logger.warning('Rate limiter unavailable for %s', key, exc_info=True)
+            return True, None
+
+        if allowed:
+            return True, None
+        return False, self._retry_after(int(current), int(previous), limit, window, elapsed)
+
+    def _hit_cache(self, current_key, previous_key, limit, weight, window):
+        values = self.cache.get_many([current_key, previous_key])
+        current = values.get(current_key, 0)
+        previous = values.get(previous_key, 0)
+        if previous * weight + current + 1 > limit:
+            return 0, current, previous
+        self.cache.add(current_key, 0, window * 2)
+        current = self.cache.incr(current_key)
+        return 1, current, previous
+
+    @staticmethod
+    def _retry_after(current, previous, limit, window, elapsed):
+        budget = limit - 1
+        if current <= budget and previous:
+            # Wait until the previous window's weight has decayed enough.
+            wait = window * (1 - (budget - current) / previous) - elapsed
+        else:
+            # The current window alone is over budget: wait into the next one.
+            wait = window - elapsed
+            if current:
+                wait += window * max(0.0, 1 - budget / current)
+        return max(1, math.ceil(wait))
+
+
+limiter = SlidingWindowLimiter()
+
+
+def _rate_for_scope(scope):
+    return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+
+def _identity(request, throttle=None):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    throttle = throttle or BaseThrottle()
+    return f'ip:{throttle.get_ident(request)}'
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
+    """DRF throttle applying the scope configured on the view or its action."""
+
+    def __init__(self):
+        self._wait = None
+
+    def get_scope(self, view):
+        action = getattr(view, 'action', None)
+        scopes = getattr(view, 'throttle_scopes', None) or {}
+        if action and action in scopes:
+            return scopes[action]
+        return getattr(view, 'throttle_scope', None)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        num, duration = parse_rate(_rate_for_scope(scope)) if scope else (None, None)
+        if num is None:
+            return True
+        allowed, self._wait = limiter.hit(f'{scope}:{_identity(request, self)}', num, duration)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+def rate_limit_by_user(view_method=None, *, scope=None, rate=None):
+    """Rate-limit a DRF view method per user (or client IP when anonymous).
+
+    Usable bare (``@rate_limit_by_user``) or with ``scope``/``rate``. Without
+    an explicit rate the scope's rate from ``DEFAULT_THROTTLE_RATES`` is used,
+    falling back to the ``user`` scope.
+    """
+    def decorator(fn):
+        method_scope = scope or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(self, request, *args, **kwargs):
+            num, duration = parse_rate(rate or _rate_for_scope(method_scope) or _rate_for_scope('user'))
+            if num is not None:
+                allowed, wait = limiter.hit(f'{method_scope}:{_identity(request)}', num, duration)
+                if not allowed:
+                    raise Throttled(wait=wait)
+            return fn(self, request, *args, **kwargs)
+
+        return wrapper
+
+    if view_method is not None:
+        return decorator(view_method)
+    return decorator
+
+
+SECURITY_STATUS_CODES = {401, 403, 429}
+
+
+def log_security_events(view_method):
+    """Log denied, throttled and failing calls to a DRF view method."""
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        context = {
+            'path': request.path,
+            'method': request.method,
+            'user_id': getattr(user, 'pk', None),
+            'ip': BaseThrottle().get_ident(request),
+            'view': view_method.__qualname__,
+        }
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception as exc:
+            logger.warning('Security event: %s raised %s', context['view'], type(exc).__name__,
+                           extra=dict(context, exception=type(exc).__name__))
+            raise
+        status_code = getattr(response, 'status_code', None)
+        if status_code in SECURITY_STATUS_CODES:
+            logger.warning('Security event: %s returned %s', context['view'], status_code,
+                           extra=dict(context, status_code=status_code))
+        return response
+
+    return wrapper
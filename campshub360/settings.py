@@ -72,6 +72,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'whitenoise.runserver_nostatic',
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
@@ -100,14 +101,18 @@ INSTALLED_APPS = [
     'open_requests',
     'assignments',
     'docs',
+    'jobs',
+    'uploads',
     'campshub360',
 ]
 
 MIDDLEWARE = [
+    'campshub360.performance_monitor.PerformanceMonitorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'campshub360.db_router.ReadReplicaMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -163,14 +168,27 @@ DATABASES = {
         'PORT': int(os.getenv('POSTGRES_REPLICA_PORT', os.getenv('POSTGRES_PORT', '5432'))),
         'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', '600')),
         'OPTIONS': {
-            'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', '10')),
+            'connect_timeout': int(os.getenv('POSTGRES_REPLICA_CONNECT_TIMEOUT', '3')),
             'sslmode': os.getenv('POSTGRES_SSL_MODE', 'disable'),
         },
+        'TEST': {
+            'MIRROR': 'default',
+        },
     }
 }
 
 
 # Database configuration
+# Reads from safe API requests and reporting views go to read_replica when it is
+# configured, healthy and not lagging (see campshub360.db_router).
+DATABASE_ROUTERS = ['campshub360.db_router.ReplicaRouter']
+READ_REPLICA_ENABLED = os.getenv(
+    'READ_REPLICA_ENABLED', 'True' if os.getenv('POSTGRES_REPLICA_HOST') else 'False'
+).lower() == 'true'
+READ_REPLICA_PATH_PREFIXES = ['/api/']
+READ_REPLICA_PIN_SECONDS = int(os.getenv('READ_REPLICA_PIN_SECONDS', '10'))
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv('READ_REPLICA_MAX_LAG_SECONDS', '5'))
+READ_REPLICA_HEALTH_CHECK_INTERVAL = int(os.getenv('READ_REPLICA_HEALTH_CHECK_INTERVAL', '10'))
 
 
 # Password validation
@@ -256,7 +274,18 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'EXCEPTION_HANDLER': 'campshub360.exceptions.custom_exception_handler',
+    # Sliding-window limits, applied only to views/actions that declare a scope
+    # (see campshub360.security)
+    'DEFAULT_THROTTLE_CLASSES': (
+        'campshub360.security.SlidingWindowRateThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('RATE_LIMIT_LOGIN', '10/min'),
+        'bulk': os.getenv('RATE_LIMIT_BULK', '30/min'),
+        'user': os.getenv('RATE_LIMIT_USER', '600/min'),
+    },
 }
+RATE_LIMIT_CACHE_ALIAS = 'default'
 
 # SimpleJWT settings (optional sane defaults)
 from datetime import timedelta
@@ -365,6 +394,61 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 
+# Chunked, deduplicated document uploads (see uploads.services). Chunk bodies are
+# streamed to storage, so UPLOAD_CHUNK_MAX_SIZE is not held in memory.
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_SIZE = int(os.getenv('UPLOAD_CHUNK_MAX_SIZE', str(8 * 1024 * 1024)))
+UPLOAD_EXPIRY_HOURS = int(os.getenv('UPLOAD_EXPIRY_HOURS', '24'))
+
+# Rows written per bulk_create/bulk_update batch by the student import engine
+STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv('STUDENT_IMPORT_CHUNK_SIZE', '1000'))
+STUDENT_DIVISIONS_CACHE_TTL = int(os.getenv('STUDENT_DIVISIONS_CACHE_TTL', '900'))
+# Student 360 overview (see students.overview): cache lifetime, and the size of the
+# shared pool its sections run on under ASGI (each thread holds a DB connection)
+STUDENT_OVERVIEW_CACHE_TTL = int(os.getenv('STUDENT_OVERVIEW_CACHE_TTL', '300'))
+STUDENT_OVERVIEW_WORKERS = int(os.getenv('STUDENT_OVERVIEW_WORKERS', '6'))
+
+# Days ahead the nightly attendance.generate_sessions job keeps populated
+ATTENDANCE_SESSION_WINDOW_DAYS = int(os.getenv('ATTENDANCE_SESSION_WINDOW_DAYS', '14'))
+# Attendance shortage snapshots (see attendance.shortages): students below this
+# percentage are listed; snapshots are kept this many days
+ATTENDANCE_SHORTAGE_THRESHOLD = int(os.getenv('ATTENDANCE_SHORTAGE_THRESHOLD', '75'))
+ATTENDANCE_SHORTAGE_RETENTION_DAYS = int(os.getenv('ATTENDANCE_SHORTAGE_RETENTION_DAYS', '30'))
+# Days an offline sync batch's idempotency key (and response) is kept for retries
+ATTENDANCE_SYNC_KEY_RETENTION_DAYS = int(os.getenv('ATTENDANCE_SYNC_KEY_RETENTION_DAYS', '7'))
+# Sync deltas hold back changes this recent, so a write that commits late is not skipped;
+# keep it above the longest attendance write transaction
+ATTENDANCE_SYNC_CHANGES_LAG_SECONDS = int(os.getenv('ATTENDANCE_SYNC_CHANGES_LAG_SECONDS', '10'))
+# Storage directory of the closed-term attendance exports (see attendance.archive)
+ATTENDANCE_ARCHIVE_DIR = os.getenv('ATTENDANCE_ARCHIVE_DIR', 'archives/attendance')
+
+# Minimum pg_trgm word similarity for typeahead matches (see campshub360.typeahead);
+# lower values tolerate more typos but make each lookup scan more index entries
+TYPEAHEAD_SIMILARITY_THRESHOLD = float(os.getenv('TYPEAHEAD_SIMILARITY_THRESHOLD', '0.3'))
+
+# Bulk login provisioning (see accounts.services). By default the shared default
+# password is hashed once per batch; set UNIQUE_SALTS to hash per user on a pool.
+ACCOUNT_PROVISIONING_BATCH_SIZE = int(os.getenv('ACCOUNT_PROVISIONING_BATCH_SIZE', '1000'))
+ACCOUNT_PROVISIONING_UNIQUE_SALTS = os.getenv('ACCOUNT_PROVISIONING_UNIQUE_SALTS', 'False').lower() == 'true'
+ACCOUNT_PROVISIONING_HASH_WORKERS = int(os.getenv('ACCOUNT_PROVISIONING_HASH_WORKERS', '0')) or None
+
+# Background jobs (see jobs.runner). 'database' needs only `manage.py run_jobs`;
+# 'celery' publishes to CELERY_BROKER_URL; 'immediate' runs inline (dev/tests).
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', '')
+JOBS_BACKEND = os.getenv('JOBS_BACKEND', 'celery' if CELERY_BROKER_URL else 'database')
+JOBS_PROGRESS_INTERVAL = float(os.getenv('JOBS_PROGRESS_INTERVAL', '1.0'))
+# Running jobs are stamped every JOBS_HEARTBEAT_INTERVAL seconds; keep it well below JOBS_STALE_AFTER
+JOBS_HEARTBEAT_INTERVAL = float(os.getenv('JOBS_HEARTBEAT_INTERVAL', '60'))
+JOBS_STALE_AFTER = int(os.getenv('JOBS_STALE_AFTER', '1800'))
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', '3'))
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Per-request performance monitoring (see campshub360.performance_monitor)
+PERFORMANCE_SLOW_REQUEST_MS = int(os.getenv('PERFORMANCE_SLOW_REQUEST_MS', '1000'))
+if os.getenv('PERFORMANCE_MONITOR_ENABLED', 'True').lower() != 'true':
+    MIDDLEWARE.remove('campshub360.performance_monitor.PerformanceMonitorMiddleware')
+
 # Database Query Optimization (PostgreSQL specific)
 DATABASES['default']['OPTIONS'].update({
     'sslmode': os.getenv('POSTGRES_SSL_MODE', 'require'),
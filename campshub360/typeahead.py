@@ -0,0 +1,189 @@
+"""
+Fuzzy typeahead over students, faculty and courses.
+
+Every matched column carries a ``gin_trgm_ops`` index (``pg_trgm``, see the
+``*_trgm_indexes`` migrations). A query is split into terms and each term must
+be word-similar (``term <% column``) to at least one column of the target, so
+lookups are bitmap index scans and small typos still match. Rows are ranked by
+the summed best word similarity of each term::
+
+    typeahead('students', 'anna smi', scope={'department': 3}, limit=10)
+
+``scope`` narrows the candidates with the equality filters a target declares
+(department, section, ...). ``ranked()`` and ``matching()`` expose the same
+matching to views that build their own querysets.
+
+The match threshold is ``TYPEAHEAD_SIMILARITY_THRESHOLD``; it is applied to
+every new PostgreSQL connection (see ``CoreConfig.ready``).
+"""
+
+from functools import reduce
+from operator import add, or_
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.functions import Greatest
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_TERMS = 4
+# Shorter terms have too few trigrams to be selective
+MIN_TERM_LENGTH = 2
+
+
+class TypeaheadTarget:
+    """A model that can be searched by typeahead"""
+
+    def __init__(self, model, fields, values, label, scopes=None):
+        self.model_label = model
+        self.fields = fields
+        self.values = values
+        self.label = label
+        self.scopes = scopes or {}
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+
+TARGETS = {
+    'students': TypeaheadTarget(
+        'students.Student',
+        fields=('first_name', 'last_name', 'roll_number', 'email'),
+        values=('id', 'roll_number', 'first_name', 'last_name', 'email', 'academic_year', 'semester', 'section'),
+        label=lambda row: f"{row['first_name']} {row['last_name']} ({row['roll_number']})",
+        scopes={
+            'department': 'department_id',
+            'academic_program': 'academic_program_id',
+            'academic_year': 'academic_year',
+            'year_of_study': 'year_of_study',
+            'semester': 'semester',
+            'section': 'section',
+            'status': 'status',
+        },
+    ),
+    'faculty': TypeaheadTarget(
+        'faculty.Faculty',
+        fields=('name', 'apaar_faculty_id'),
+        values=('id', 'name', 'apaar_faculty_id', 'employee_id', 'designation', 'department'),
+        label=lambda row: f"{row['name']} ({row['apaar_faculty_id']})" if row['apaar_faculty_id'] else row['name'],
+        scopes={
+            'department': 'department_ref_id',
+            'status': 'status',
+        },
+    ),
+    'courses': TypeaheadTarget(
+        'academics.Course',
+        fields=('code', 'title'),
+        values=('id', 'code', 'title', 'level', 'credits'),
+        label=lambda row: f"{row['code']} - {row['title']}",
+        scopes={
+            'department': 'department_id',
+            'level': 'level',
+            'status': 'status',
+        },
+    ),
+}
+
+
+def get_target(name):
+    try:
+        return TARGETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown typeahead target '{name}'. Use one of: {', '.join(sorted(TARGETS))}")
+
+
+def split_terms(text):
+    terms = [term for term in (text or '').lower().split() if len(term) >= MIN_TERM_LENGTH]
+    return terms[:MAX_TERMS]
+
+
+def _use_trigrams(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def matching(name, text, trigrams=True):
+    """``Q`` requiring every term of ``text`` to match some column of the target (None if no usable terms)"""
+    target = get_target(name)
+    terms = split_terms(text)
+    if not terms:
+        return None
+    lookup = 'trigram_word_similar' if trigrams else 'icontains'
+    return reduce(
+        lambda combined, condition: combined & condition,
+        (reduce(or_, (Q(**{f'{field}__{lookup}': term}) for field in target.fields)) for term in terms),
+    )
+
+
+def ranked(name, queryset, text):
+    """Filter ``queryset`` to matches for ``text``, best first, annotated with ``typeahead_score``"""
+    target = get_target(name)
+    trigrams = _use_trigrams(queryset)
+    condition = matching(name, text, trigrams)
+    if condition is None or not trigrams:
+        queryset = queryset.none() if condition is None else queryset.filter(condition)
+        return queryset.annotate(typeahead_score=Value(0.0))
+    queryset = queryset.filter(condition)
+
+    def best(term):
+        scores = [TrigramWordSimilarity(term, field) for field in target.fields]
+        return Greatest(*scores) if len(scores) > 1 else scores[0]
+
+    score = reduce(add, (best(term) for term in split_terms(text)))
+    return queryset.annotate(typeahead_score=score).order_by('-typeahead_score', 'pk')
+
+
+def typeahead(name, text, scope=None, limit=DEFAULT_LIMIT, queryset=None):
+    """Top ``limit`` matches for ``text`` as ``{'id', 'label', 'score', ...}`` dicts"""
+    target = get_target(name)
+    if queryset is None:
+        queryset = target.model._default_manager.all()
+    for key, value in (scope or {}).items():
+        if key not in target.scopes:
+            raise ValueError(f"'{key}' is not a scope of typeahead target '{name}'")
+        if value not in (None, ''):
+            queryset = queryset.filter(**{target.scopes[key]: value})
+
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    rows = list(ranked(name, queryset, text).values(*target.values, 'typeahead_score')[:limit])
+    for row in rows:
+        row['label'] = target.label(row)
+        row['score'] = round(row.pop('typeahead_score'), 3)
+    return rows
+
+
+def configure_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver that applies ``TYPEAHEAD_SIMILARITY_THRESHOLD``"""
+    if connection.vendor != 'postgresql':
+        return
+    threshold = getattr(settings, 'TYPEAHEAD_SIMILARITY_THRESHOLD', 0.3)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(threshold)])
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def typeahead_view(request, target):
+    """GET /api/v1/typeahead/<target>/?q=...&limit=10[&<scope>=...]"""
+    if target not in TARGETS:
+        return Response({'error': f"Unknown typeahead target '{target}'"}, status=404)
+    scope = {key: request.query_params.get(key) for key in TARGETS[target].scopes if key in request.query_params}
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    try:
+        results = typeahead(target, request.query_params.get('q', ''), scope=scope, limit=limit)
+    except (ValueError, ValidationError) as exc:
+        return Response({'error': str(exc)}, status=400)
+    return Response({'results': results})
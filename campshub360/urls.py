@@ -15,7 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
@@ -23,7 +23,8 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from .health_views import health_check, detailed_health_check, readiness_check, liveness_check
+from .health_views import health_check, detailed_health_check, readiness_check, liveness_check, metrics
+from .typeahead import typeahead_view
 
 urlpatterns = [
     # Health check endpoints
@@ -31,6 +32,7 @@ urlpatterns = [
     path('health/detailed/', detailed_health_check, name='detailed_health_check'),
     path('health/ready/', readiness_check, name='readiness_check'),
     path('health/alive/', liveness_check, name='liveness_check'),
+    re_path(r'^health/metrics/?$', metrics, name='metrics'),
     
     path('admin/', admin.site.urls),
     path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -51,6 +53,9 @@ urlpatterns = [
     path('api/v1/feedback/', include('feedback.urls', namespace='feedback')),
     path('api/v1/open-requests/', include('open_requests.urls', namespace='open_requests')),
     path('api/v1/assignments/', include('assignments.urls', namespace='assignments')),
+    path('api/v1/jobs/', include('jobs.urls', namespace='jobs')),
+    path('api/v1/uploads/', include('uploads.urls', namespace='uploads')),
+    path('api/v1/typeahead/<str:target>/', typeahead_view, name='typeahead'),
     path('docs/', include('docs.urls', namespace='docs')),
     path('facilities/', include('facilities.urls', namespace='facilities_dashboard')),
     path('dashboard/', include('dashboard.urls', namespace='dashboard')),
@@ -2,14 +2,21 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import logout
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db import connection, models
 from django.apps import apps
 from django.http import JsonResponse
+from django.urls import reverse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from accounts.models import User, Role, Permission, AuthIdentifier, UserSession, AuditLog, FailedLogin
 from students.models import Student, StudentEnrollmentHistory, StudentDocument, CustomField, StudentImport
+from students.search import search_students
+from students.services import StudentBulkMutation
+from students.stats import student_stats
+from campshub360 import typeahead
+from jobs.runner import enqueue
 from academics.models import Department, AcademicProgram
 from faculty.models import Faculty, FacultySubject, FacultySchedule, FacultyLeave, FacultyPerformance, FacultyDocument, CustomField as FacultyCustomField, CustomFieldValue
 from django.utils import timezone
@@ -19,9 +26,11 @@ from django.db.models import Q, Count
 import csv
 import os
 
+from campshub360.db_router import use_read_replica
 from .models import APICollection, APIEnvironment, APIRequest, APITest, APITestResult, APITestSuite, APITestSuiteResult, APIAutomation
 from academics.models import Course, Syllabus, Timetable, CourseEnrollment, AcademicCalendar, Department, AcademicProgram, CourseSection
 from attendance.models import AttendanceSession, AttendanceRecord
+from attendance.services import generate_sessions, mark_attendance
 from enrollment.models import EnrollmentRule, CourseAssignment, FacultyAssignment, StudentEnrollmentPlan, PlannedCourse, EnrollmentRequest, WaitlistEntry
 from grads.models import GradeScale, Term, CourseResult, TermGPA, GraduateRecord
 from rnd.models import Researcher as RndResearcher, Grant as RndGrant, Project as RndProject, Publication as RndPublication, Patent as RndPatent, Dataset as RndDataset, Collaboration as RndCollaboration
@@ -185,10 +194,11 @@ def feedback_item_create(request):
 def dashboard_home(request):
     """Main dashboard view with statistics"""
     try:
-        # Basic statistics that are most likely to work
+        # Student counts come from the incrementally maintained stats snapshot
+        student_counts = student_stats()
         context = {
             'total_users': User.objects.count(),
-            'total_students': Student.objects.count(),
+            'total_students': student_counts['total'],
             'total_faculty': Faculty.objects.count(),
             'total_roles': Role.objects.count(),
             'total_permissions': Permission.objects.count(),
@@ -199,7 +209,7 @@ def dashboard_home(request):
         # Try to add more statistics if possible
         try:
             context.update({
-                'active_students': Student.objects.filter(status='ACTIVE').count(),
+                'active_students': student_counts['status'].get('ACTIVE', 0),
                 'active_faculty': Faculty.objects.filter(status='ACTIVE', currently_associated=True).count(),
                 'total_custom_fields': CustomField.objects.filter(is_active=True).count(),
                 'total_faculty_custom_fields': FacultyCustomField.objects.filter(is_active=True).count(),
@@ -1221,14 +1231,9 @@ def students_list(request):
     students = Student.objects.all()
     
     if search:
-        students = students.filter(
-            Q(roll_number__icontains=search) |
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(email__icontains=search) |
-            Q(father_name__icontains=search) |
-            Q(mother_name__icontains=search)
-        )
+        matches = search_students(students, search)
+        # Nothing matched exactly: try trigram matching so a mistyped name still finds the student
+        students = matches if matches.exists() else typeahead.ranked('students', students, search)
     
     if status:
         students = students.filter(status=status)
@@ -1413,13 +1418,23 @@ def student_import_process(request):
             skip_errors=skip_errors,
             create_login=create_login,
             update_existing=update_existing,
-            status='PROCESSING'
+            status='PENDING'
         )
         
-        # Process the file
-        result = process_student_import(file, import_record, skip_errors, create_login, update_existing)
+        # Hand the file to a background job; the page polls /api/v1/jobs/<id>/
+        job = enqueue('students.import', {
+            'import_id': import_record.id,
+            'skip_errors': skip_errors,
+            'create_login': create_login,
+            'update_existing': update_existing,
+        }, user=request.user, input_file=file)
         
-        return JsonResponse(result)
+        return JsonResponse({
+            'success': True,
+            'job_id': str(job.id),
+            'import_id': str(import_record.id),
+            'status_url': reverse('jobs:job-detail', kwargs={'pk': job.id}),
+        }, status=202)
         
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
@@ -1518,197 +1533,6 @@ def download_template(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def process_student_import(file, import_record, skip_errors, create_login, update_existing):
-    """Process student import from file"""
-    try:
-        import pandas as pd
-        from datetime import datetime
-        
-        # Read file based on extension
-        file_extension = os.path.splitext(file.name)[1].lower()
-        
-        if file_extension == '.csv':
-            df = pd.read_csv(file)
-        else:  # Excel files
-            df = pd.read_excel(file)
-        
-        # Remove empty rows
-        df = df.dropna(how='all')
-        
-        # Initialize counters
-        success_count = 0
-        error_count = 0
-        warning_count = 0
-        errors = []
-        warnings = []
-        
-        # Update import record
-        import_record.total_rows = len(df)
-        import_record.save()
-        
-        # Process each row
-        for index, row in df.iterrows():
-            row_number = index + 2  # +2 because Excel is 1-indexed and we have header
-            
-            try:
-                # Validate required fields
-                required_fields = ['roll_number', 'first_name', 'last_name', 'date_of_birth', 'gender']
-                for field in required_fields:
-                    if pd.isna(row.get(field, '')) or str(row[field]).strip() == '':
-                        raise ValueError(f"Required field '{field}' is missing or empty")
-                
-                # Clean and validate data
-                roll_number = str(row['roll_number']).strip()
-                first_name = str(row['first_name']).strip()
-                last_name = str(row['last_name']).strip()
-                date_of_birth = str(row['date_of_birth']).strip()
-                gender = str(row['gender']).strip().upper()
-                
-                # Handle optional grade_level
-                grade_level = None
-                if not pd.isna(row.get('grade_level', '')) and str(row['grade_level']).strip() != '':
-                    grade_level = str(row['grade_level']).strip()
-                
-                # Validate gender
-                if gender not in ['M', 'F', 'O']:
-                    raise ValueError(f"Invalid gender '{gender}'. Must be M, F, or O")
-                
-                # Validate grade level (if provided)
-                if grade_level is not None and grade_level not in [str(i) for i in range(1, 13)]:
-                    raise ValueError(f"Invalid grade level '{grade_level}'. Must be 1-12")
-                
-                # Validate date format
-                try:
-                    datetime.strptime(date_of_birth, '%Y-%m-%d')
-                except ValueError:
-                    raise ValueError(f"Invalid date format '{date_of_birth}'. Use YYYY-MM-DD")
-                
-                # Check if student exists
-                existing_student = None
-                if update_existing:
-                    existing_student = Student.objects.filter(roll_number=roll_number).first()
-                
-                if existing_student:
-                    # Update existing student
-                    student = existing_student
-                    warnings.append({
-                        'row': row_number,
-                        'field': 'roll_number',
-                        'message': f"Student with roll number '{roll_number}' already exists. Updating."
-                    })
-                    warning_count += 1
-                else:
-                    # Create new student
-                    student = Student()
-                
-                # Set basic fields
-                student.roll_number = roll_number
-                student.first_name = first_name
-                student.last_name = last_name
-                student.date_of_birth = date_of_birth
-                student.gender = gender
-                if grade_level is not None:
-                    student.grade_level = grade_level
-                
-                # Set optional fields
-                if not pd.isna(row.get('middle_name', '')):
-                    student.middle_name = str(row['middle_name']).strip()
-                
-                if not pd.isna(row.get('email', '')):
-                    student.email = str(row['email']).strip()
-                
-                if not pd.isna(row.get('student_mobile', '')):
-                    student.student_mobile = str(row['student_mobile']).strip()
-                
-                if not pd.isna(row.get('section', '')):
-                    section = str(row['section']).strip().upper()
-                    if section in ['A', 'B', 'C', 'D', 'E']:
-                        student.section = section
-                
-                if not pd.isna(row.get('academic_year', '')):
-                    student.academic_year = str(row['academic_year']).strip()
-                
-                if not pd.isna(row.get('quota', '')):
-                    quota = str(row['quota']).strip().upper()
-                    if quota in [choice[0] for choice in Student.QUOTA_CHOICES]:
-                        student.quota = quota
-                
-                if not pd.isna(row.get('rank', '')):
-                    try:
-                        student.rank = int(row['rank'])
-                    except (ValueError, TypeError):
-                        pass
-                
-                if not pd.isna(row.get('status', '')):
-                    status = str(row['status']).strip().upper()
-                    if status in [choice[0] for choice in Student.STATUS_CHOICES]:
-                        student.status = status
-                
-                # Set parent information
-                if not pd.isna(row.get('father_name', '')):
-                    student.father_name = str(row['father_name']).strip()
-                
-                if not pd.isna(row.get('mother_name', '')):
-                    student.mother_name = str(row['mother_name']).strip()
-                
-                if not pd.isna(row.get('father_mobile', '')):
-                    student.father_mobile = str(row['father_mobile']).strip()
-                
-                if not pd.isna(row.get('mother_mobile', '')):
-                    student.mother_mobile = str(row['mother_mobile']).strip()
-                
-                # Set address information
-                address_parts = []
-                for field in ['address', 'city', 'state', 'country', 'postal_code']:
-                    if not pd.isna(row.get(field, '')):
-                        address_parts.append(str(row[field]).strip())
-                
-                if address_parts:
-                    student.full_address = ', '.join(address_parts)
-                
-                # Save student
-                student.save()
-                success_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                errors.append({
-                    'row': row_number,
-                    'field': 'general',
-                    'message': str(e)
-                })
-                
-                if not skip_errors:
-                    break
-        
-        # Update import record
-        import_record.success_count = success_count
-        import_record.error_count = error_count
-        import_record.warning_count = warning_count
-        import_record.errors = errors
-        import_record.warnings = warnings
-        import_record.status = 'COMPLETED'
-        import_record.save()
-        
-        return {
-            'success': True,
-            'success_count': success_count,
-            'error_count': error_count,
-            'warning_count': warning_count,
-            'errors': errors,
-            'warnings': warnings
-        }
-        
-    except Exception as e:
-        import_record.status = 'FAILED'
-        import_record.errors = [{'row': 0, 'field': 'general', 'message': str(e)}]
-        import_record.save()
-        
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
 # API Testing Dashboard Views
 @login_required
 @user_passes_test(is_admin)
@@ -2102,12 +1926,12 @@ def faculty_list(request):
     faculties = Faculty.objects.all()
     
     if search:
+        # Trigram matching on name/APAAR ID tolerates typos; the remaining identifiers are matched exactly
         faculties = faculties.filter(
-            Q(name__icontains=search) |
-            Q(employee_id__icontains=search) |
-            Q(apaar_faculty_id__icontains=search) |
-            Q(email__icontains=search) |
-            Q(phone_number__icontains=search)
+            Q(pk__in=typeahead.ranked('faculty', Faculty.objects.all(), search).values('pk')) |
+            Q(employee_id__iexact=search) |
+            Q(email__iexact=search) |
+            Q(phone_number=search)
         )
     
     if department:
@@ -3280,24 +3104,38 @@ def attendance_session_detail(request, session_id):
 @login_required
 @user_passes_test(is_admin)
 def attendance_mark(request, session_id):
-    """Handle marking attendance for a session (AJAX or form POST)."""
+    """Handle marking attendance for a session (AJAX or form POST).
+
+    Takes one student (``student_id``/``status``/``remarks``) or the whole
+    table (``status_<student id>``/``remarks_<student id>``) and writes it with
+    one upsert.
+    """
     session = get_object_or_404(AttendanceSession, pk=session_id)
     if request.method == 'POST':
+        if request.POST.get('student_id'):
+            student_id = request.POST['student_id']
+            statuses = {student_id: request.POST.get('status')}
+            remarks = {student_id: request.POST.get('remarks', '')}
+        else:
+            statuses = {key[len('status_'):]: value for key, value in request.POST.items() if key.startswith('status_')}
+            remarks = {key[len('remarks_'):]: value for key, value in request.POST.items() if key.startswith('remarks_')}
+        ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
         try:
-            student_id = request.POST.get('student_id')
-            status_value = request.POST.get('status')
-            remarks = request.POST.get('remarks', '')
-
-            if status_value not in dict(AttendanceRecord.STATUS_CHOICES):
-                return JsonResponse({'success': False, 'error': 'Invalid status'}, status=400)
-
-            record, _ = AttendanceRecord.objects.get_or_create(session=session, student_id=student_id)
-            record.status = status_value
-            record.remarks = remarks
-            record.save()
-            return JsonResponse({'success': True})
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+            diff = mark_attendance(session, statuses, remarks)
+        except ValidationError as e:
+            error = '; '.join(e.messages)
+            if ajax:
+                return JsonResponse({'success': False, 'error': error}, status=400)
+            messages.error(request, error)
+        else:
+            if ajax:
+                return JsonResponse({'success': True, **diff})
+            messages.success(
+                request,
+                f"Attendance saved: {len(diff['created'])} new, {len(diff['updated'])} changed, "
+                f"{diff['unchanged']} unchanged."
+            )
+        return redirect('dashboard:attendance_session_detail', session_id=session.pk)
 
     # GET fallthrough
     return attendance_session_detail(request, session_id)
@@ -3315,38 +3153,18 @@ def attendance_generate_sessions(request):
             end = request.POST.get('end')
             section_id = request.POST.get('section_id') or None
 
-            # Use the same logic as the management command
-            from datetime import date, timedelta
+            # Same generator as the management command
+            from datetime import date
             start_date = date.fromisoformat(start)
             end_date = date.fromisoformat(end)
             if end_date < start_date:
                 raise ValueError('End date must be after start date')
 
-            days_map = {'MON': 0, 'TUE': 1, 'WED': 2, 'THU': 3, 'FRI': 4, 'SAT': 5, 'SUN': 6}
-            timetables = Timetable.objects.filter(is_active=True)
-            if section_id:
-                timetables = timetables.filter(course_section_id=section_id)
-
-            by_weekday = {}
-            for t in timetables.select_related('course_section'):
-                by_weekday.setdefault(days_map[t.day_of_week], []).append(t)
-
-            created_count = 0
-            current = start_date
-            while current <= end_date:
-                weekday = current.weekday()
-                for t in by_weekday.get(weekday, []):
-                    _, created = AttendanceSession.objects.get_or_create(
-                        course_section=t.course_section,
-                        date=current,
-                        start_time=t.start_time,
-                        defaults={'end_time': t.end_time, 'room': t.room, 'timetable': t}
-                    )
-                    if created:
-                        created_count += 1
-                current += timedelta(days=1)
-
-            message = f'Created {created_count} attendance sessions.'
+            result = generate_sessions(start_date, end_date, section_id)
+            message = (
+                f"Created {result['created']} attendance sessions "
+                f"({result['existing']} already existed, {result['skipped_days']} non-teaching days skipped)."
+            )
         except Exception as exc:
             error = str(exc)
 
@@ -4457,6 +4275,7 @@ def fees_receipt_detail(request, receipt_id):
     return render(request, 'dashboard/fees/receipt_detail.html', context)
 
 
+@use_read_replica
 @login_required
 @user_passes_test(is_admin)
 def fees_reports(request):
@@ -5660,6 +5479,7 @@ def filter_students_ajax(request):
         academic_year = request.GET.get('academic_year')
         semester = request.GET.get('semester')
         course_section_id = request.GET.get('course_section_id')
+        query = request.GET.get('q', '').strip()
         
         try:
             # Start with all students
@@ -5687,8 +5507,17 @@ def filter_students_ajax(request):
                 ).values_list('student_id', flat=True)
                 students = students.filter(id__in=student_ids)
             
+            if semester:
+                students = students.filter(semester=semester)
+            
+            # Typed text narrows to the closest trigram matches, best first
+            if query:
+                students = typeahead.ranked('students', students, query)
+            
             # Limit results for performance
-            students = students[:100]
+            students = students.only(
+                'id', 'first_name', 'last_name', 'roll_number', 'academic_year', 'section', 'year_of_study'
+            )[:100]
             
             # Format response
             student_data = []
@@ -5699,7 +5528,7 @@ def filter_students_ajax(request):
                     'roll_number': student.roll_number,
                     'academic_year': student.academic_year or '',
                     'section': student.section or '',
-                    'grade_level': student.grade_level
+                    'year_of_study': student.year_of_study or '',
                 })
             
             return JsonResponse({
@@ -6026,34 +5855,18 @@ def bulk_assign_students(request):
         student_ids = data.get('student_ids', [])
         assignment_data = data.get('assignment', {})
         
-        updated_count = 0
-        errors = []
-        
-        for student_id in student_ids:
-            try:
-                student = Student.objects.get(id=student_id)
-                
-                if assignment_data.get('department_id'):
-                    student.department_id = assignment_data['department_id']
-                if assignment_data.get('academic_program_id'):
-                    student.academic_program_id = assignment_data['academic_program_id']
-                if assignment_data.get('academic_year'):
-                    student.academic_year = assignment_data['academic_year']
-                if assignment_data.get('year_of_study'):
-                    student.year_of_study = assignment_data['year_of_study']
-                if assignment_data.get('semester'):
-                    student.semester = assignment_data['semester']
-                if assignment_data.get('section'):
-                    student.section = assignment_data['section']
-                
-                student.updated_by = request.user
-                student.save()
-                updated_count += 1
-                
-            except Student.DoesNotExist:
-                errors.append(f'Student with ID {student_id} not found')
-            except Exception as e:
-                errors.append(f'Error updating student {student_id}: {str(e)}')
+        changes = {
+            field: assignment_data[field]
+            for field in ('department_id', 'academic_program_id', 'academic_year', 'year_of_study', 'semester', 'section')
+            if assignment_data.get(field)
+        }
+        results = StudentBulkMutation(key='id', user=request.user).assign(student_ids, changes)
+        updated_count = sum(1 for result in results if result['status'] in ('updated', 'unchanged'))
+        errors = [
+            f"Student with ID {result['id']} not found" if result['status'] == 'not_found'
+            else f"Error updating student {result['id']}: {result['errors']}"
+            for result in results if result['status'] in ('not_found', 'invalid')
+        ]
         
         return Response({
             'success': True,
@@ -48,7 +48,8 @@ class Command(BaseCommand):
                 'order': 2,
                 'steps': [
                     ('Create session', 'POST `/api/v1/attendance/attendance/sessions/` with JSON including `course_section`, optional `timetable`, `session_date`. Returns session id.'),
-                    ('Generate records', 'POST `/api/v1/attendance/attendance/sessions/{id}/generate_records/` to create `AttendanceRecord` for each enrolled student.'),
+                    ('Generate records', 'POST `/api/v1/attendance/attendance/sessions/{id}/generate_records/` to create `AttendanceRecord` for each enrolled student. Existing records are kept; the response reports `created_records` and `existing_records`.'),
+                    ('Generate for a date range', 'POST `/api/v1/attendance/attendance/sessions/bulk_generate_records/` with `{ "start": "2025-01-06", "end": "2025-05-30" }` and optionally `course_section` to fill every non-cancelled session in the range at once.'),
                     ('List sessions', 'GET `/api/v1/attendance/attendance/sessions/` with filters.'),
                 ],
                 'code': [
@@ -65,6 +66,7 @@ class Command(BaseCommand):
                     ('List records for a session', 'GET `/api/v1/attendance/attendance/records/?session=<session_id>`'),
                     ('Mark present', 'PATCH `/api/v1/attendance/attendance/records/<record_id>/` with `{ "status": "PRESENT" }`'),
                     ('Mark absent', 'PATCH `/api/v1/attendance/attendance/records/<record_id>/` with `{ "status": "ABSENT" }`'),
+                    ('Mark the whole class', 'POST `/api/v1/attendance/attendance/sessions/<session_id>/mark/` with `{ "marks": { "<student_id>": "PRESENT", ... } }` (optional `remarks` by student id). One request creates or updates every record and returns `created`, `updated` and `unchanged`.'),
                 ],
                 'code': [
                     ('bash', "curl -X PATCH http://127.0.0.1:8000/api/v1/attendance/attendance/records/UUID/ -H 'Authorization: Bearer ACCESS_TOKEN' -H 'Content-Type: application/json' -d '{\"status\":\"PRESENT\"}'"),
@@ -0,0 +1,61 @@
+from io import BytesIO
+
+from django.utils import timezone
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from jobs.runner import register
+
+from .models import HallTicket
+
+
+def draw_hall_ticket(p, hall_ticket):
+    """Draw one hall ticket on the current page of canvas ``p``"""
+    registration = hall_ticket.exam_registration
+    schedule = registration.exam_schedule
+    p.drawString(100, 750, "HALL TICKET")
+    p.drawString(100, 720, f"Ticket Number: {hall_ticket.ticket_number}")
+    p.drawString(100, 690, f"Student: {registration.student.get_full_name()}")
+    p.drawString(100, 660, f"Roll Number: {registration.student.roll_number}")
+    p.drawString(100, 630, f"Exam: {schedule.title}")
+    p.drawString(100, 600, f"Course: {schedule.course.code}")
+    p.drawString(100, 570, f"Date: {schedule.exam_date}")
+    p.drawString(100, 540, f"Time: {schedule.start_time} - {schedule.end_time}")
+
+    if hall_ticket.exam_room:
+        p.drawString(100, 510, f"Room: {hall_ticket.exam_room.name}")
+        p.drawString(100, 480, f"Building: {hall_ticket.exam_room.building}")
+
+    if hall_ticket.seat_number:
+        p.drawString(100, 450, f"Seat Number: {hall_ticket.seat_number}")
+
+
+@register('exams.hall_ticket_pdfs')
+def hall_ticket_pdfs(ctx, ticket_ids=None, exam_schedule=None, mark_printed=False):
+    """Render a batch of hall tickets into one PDF, one ticket per page"""
+    queryset = HallTicket.objects.select_related(
+        'exam_registration__student', 'exam_registration__exam_schedule__course', 'exam_room'
+    ).order_by('exam_registration__exam_schedule', 'exam_registration__student__roll_number')
+    if ticket_ids:
+        queryset = queryset.filter(pk__in=ticket_ids)
+    if exam_schedule:
+        queryset = queryset.filter(exam_registration__exam_schedule_id=exam_schedule)
+
+    total = queryset.count()
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    rendered = []
+    for index, hall_ticket in enumerate(queryset.iterator(chunk_size=500), 1):
+        draw_hall_ticket(p, hall_ticket)
+        p.showPage()
+        rendered.append(hall_ticket.pk)
+        if index % 50 == 0:
+            ctx.progress(index, total, f'Rendered {index} of {total} hall tickets')
+    p.save()
+
+    ctx.save_result_file(f'hall_tickets_{timezone.now():%Y%m%d_%H%M%S}.pdf', buffer.getvalue())
+    if mark_printed and rendered:
+        HallTicket.objects.filter(pk__in=rendered, status__in=['DRAFT', 'GENERATED']).update(
+            status='PRINTED', printed_date=timezone.now()
+        )
+    return {'tickets': len(rendered)}
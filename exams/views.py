@@ -1,6 +1,7 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
@@ -14,6 +15,9 @@ from reportlab.lib.units import inch
 from io import BytesIO
 import json
 
+from jobs.runner import enqueue
+
+from .jobs import draw_hall_ticket
 from .models import (
     ExamSession, ExamSchedule, ExamRoom, ExamRoomAllocation,
     ExamStaffAssignment, StudentDue, ExamRegistration, HallTicket,
@@ -399,22 +403,7 @@ class HallTicketViewSet(viewsets.ModelViewSet):
         buffer = BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         
-        # Add content to PDF
-        p.drawString(100, 750, f"HALL TICKET")
-        p.drawString(100, 720, f"Ticket Number: {hall_ticket.ticket_number}")
-        p.drawString(100, 690, f"Student: {hall_ticket.exam_registration.student.get_full_name()}")
-        p.drawString(100, 660, f"Roll Number: {hall_ticket.exam_registration.student.roll_number}")
-        p.drawString(100, 630, f"Exam: {hall_ticket.exam_registration.exam_schedule.title}")
-        p.drawString(100, 600, f"Course: {hall_ticket.exam_registration.exam_schedule.course.code}")
-        p.drawString(100, 570, f"Date: {hall_ticket.exam_registration.exam_schedule.exam_date}")
-        p.drawString(100, 540, f"Time: {hall_ticket.exam_registration.exam_schedule.start_time} - {hall_ticket.exam_registration.exam_schedule.end_time}")
-        
-        if hall_ticket.exam_room:
-            p.drawString(100, 510, f"Room: {hall_ticket.exam_room.name}")
-            p.drawString(100, 480, f"Building: {hall_ticket.exam_room.building}")
-        
-        if hall_ticket.seat_number:
-            p.drawString(100, 450, f"Seat Number: {hall_ticket.seat_number}")
+        draw_hall_ticket(p, hall_ticket)
         
         p.showPage()
         p.save()
@@ -423,6 +412,27 @@ class HallTicketViewSet(viewsets.ModelViewSet):
         response = HttpResponse(buffer, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="hall_ticket_{hall_ticket.ticket_number}.pdf"'
         return response
+    
+    @action(detail=False, methods=['post'])
+    def generate_pdfs(self, request):
+        """Queue a combined PDF for many hall tickets (by ids or exam schedule)"""
+        ticket_ids = request.data.get('ticket_ids') or []
+        exam_schedule = request.data.get('exam_schedule')
+        if not ticket_ids and not exam_schedule:
+            return Response(
+                {'error': 'ticket_ids or exam_schedule is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = enqueue('exams.hall_ticket_pdfs', {
+            'ticket_ids': ticket_ids,
+            'exam_schedule': exam_schedule,
+            'mark_printed': bool(request.data.get('mark_printed', False)),
+        }, user=request.user)
+        return Response({
+            'job_id': str(job.id),
+            'status_url': reverse('jobs:job-detail', kwargs={'pk': job.id}, request=request),
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class ExamAttendanceViewSet(viewsets.ModelViewSet):
@@ -619,6 +629,7 @@ class DashboardStatsView(APIView):
 class ExamSummaryReportView(APIView):
     """Generate exam summary report"""
     permission_classes = [IsAuthenticated]
+    use_read_replica = True
     
     def get(self, request):
         exam_session_id = request.query_params.get('exam_session_id')
@@ -751,6 +762,7 @@ class StudentPerformanceReportView(APIView):
 class BulkGenerateHallTicketsView(APIView):
     """Bulk generate hall tickets for approved registrations"""
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'bulk'
     
     def post(self, request):
         exam_schedule_id = request.data.get('exam_schedule_id')
@@ -789,6 +801,7 @@ class BulkGenerateHallTicketsView(APIView):
 class BulkAssignRoomsView(APIView):
     """Bulk assign rooms to exam schedules"""
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'bulk'
     
     def post(self, request):
         exam_schedule_id = request.data.get('exam_schedule_id')
@@ -839,6 +852,7 @@ class BulkAssignRoomsView(APIView):
 class BulkAssignStaffView(APIView):
     """Bulk assign staff to exam schedules"""
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'bulk'
     
     def post(self, request):
         exam_schedule_id = request.data.get('exam_schedule_id')
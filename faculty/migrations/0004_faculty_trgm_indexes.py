@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0003_faculty_department_ref'),
+    ]
+
+    # Trigram indexes for campshub360.typeahead
+    operations = [
+        # Other apps' trigram indexes use it too, so reversing leaves it installed
+        migrations.RunSQL('CREATE EXTENSION IF NOT EXISTS pg_trgm;', migrations.RunSQL.noop),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS faculty_name_trgm ON faculty_faculty USING gin (name gin_trgm_ops);\n"
+                "CREATE INDEX IF NOT EXISTS faculty_apaar_faculty_id_trgm ON faculty_faculty USING gin (apaar_faculty_id gin_trgm_ops);\n"
+            ),
+            reverse_sql=(
+                "DROP INDEX IF EXISTS faculty_name_trgm;\n"
+                "DROP INDEX IF EXISTS faculty_apaar_faculty_id_trgm;\n"
+            ),
+        ),
+    ]
@@ -246,7 +246,10 @@ class Faculty(TimeStampedUUIDModel):
     
     def save(self, *args, **kwargs):
         """Override save to automatically generate user account if not exists"""
-        if not self.user_id:
+        from accounts.services import defer_login
+        from .services import DEFAULT_FACULTY_PASSWORD, provision_faculty_logins
+        
+        if not self.user_id and not defer_login(self, provision_faculty_logins):
             # Generate username from APAAR Faculty ID
             username = f"faculty_{self.apaar_faculty_id}"
             
@@ -254,7 +257,7 @@ class Faculty(TimeStampedUUIDModel):
             user = User.objects.create_user(
                 username=username,
                 email=self.email,
-                password='CampusHub@360',  # Default password
+                password=DEFAULT_FACULTY_PASSWORD,
                 is_active=True,
                 is_staff=True,
             )
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from uploads.serializers import ImageVariantsField, StoredFileFieldsMixin
 from .models import (
     Faculty, FacultySubject, FacultySchedule, FacultyLeave, 
     FacultyPerformance, FacultyDocument, CustomField, CustomFieldValue
@@ -35,7 +36,7 @@ class CustomFieldValueSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class FacultyDocumentSerializer(serializers.ModelSerializer):
+class FacultyDocumentSerializer(StoredFileFieldsMixin, serializers.ModelSerializer):
     """Serializer for FacultyDocument model"""
     verified_by = UserSerializer(read_only=True)
     
@@ -43,6 +44,7 @@ class FacultyDocumentSerializer(serializers.ModelSerializer):
         model = FacultyDocument
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'verified_by', 'verified_at']
+    stored_file_fields = {'file': 'upload_id'}
 
 
 class FacultySubjectSerializer(serializers.ModelSerializer):
@@ -95,6 +97,7 @@ class FacultySerializer(serializers.ModelSerializer):
     custom_field_values = CustomFieldValueSerializer(many=True, read_only=True)
     full_name = serializers.ReadOnlyField()
     is_active_faculty = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Faculty
@@ -213,6 +216,7 @@ class FacultyListSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     full_name = serializers.ReadOnlyField()
     is_active_faculty = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Faculty
@@ -220,7 +224,7 @@ class FacultyListSerializer(serializers.ModelSerializer):
             'id', 'user', 'name', 'apaar_faculty_id', 'employee_id', 'full_name', 
             'present_designation', 'department', 'employment_type', 'status', 
             'email', 'phone_number', 'date_of_joining_institution', 'currently_associated',
-            'is_active_faculty', 'created_at'
+            'is_active_faculty', 'profile_picture_variants', 'created_at'
         ]
 
 
@@ -235,6 +239,7 @@ class FacultyDetailSerializer(serializers.ModelSerializer):
     custom_field_values = CustomFieldValueSerializer(many=True, read_only=True)
     full_name = serializers.ReadOnlyField()
     is_active_faculty = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Faculty
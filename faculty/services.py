@@ -0,0 +1,29 @@
+"""Bulk operations on faculty."""
+
+from accounts.services import UserProvisioner
+from .models import Faculty
+
+DEFAULT_FACULTY_PASSWORD = 'CampusHub@360'
+
+
+def provision_faculty_logins(faculty_members, batch_size=None):
+    """Create and link staff logins for faculty in bulk.
+
+    Same accounts as ``Faculty.save`` (username ``faculty_<APAAR id>``,
+    staff flag, default password) with one password hash per batch. Unsaved
+    instances just get ``user`` set, ready for ``Faculty.objects.bulk_create``;
+    saved ones are linked with one ``bulk_update``. Returns the provisioner;
+    ``skipped`` lists members whose login could not be created.
+    """
+    provisioner = UserProvisioner(DEFAULT_FACULTY_PASSWORD, is_staff=True, batch_size=batch_size)
+    for faculty in faculty_members:
+        if not faculty.user_id:
+            provisioner.add(faculty, f'faculty_{faculty.apaar_faculty_id}', faculty.email)
+
+    saved = []
+    for faculty, user in provisioner.provision():
+        faculty.user = user
+        if not faculty._state.adding:
+            saved.append(faculty)
+    Faculty.objects.bulk_update(saved, ['user'], batch_size=provisioner.batch_size)
+    return provisioner
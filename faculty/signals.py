@@ -2,10 +2,14 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from uploads.images import register_image_field
 from .models import Faculty, FacultyLeave, FacultyPerformance
 
 User = get_user_model()
 
+# Profile pictures get resized variants for list and profile pages
+register_image_field(Faculty, 'profile_picture')
+
 
 @receiver(post_save, sender=Faculty)
 def create_faculty_user_profile(sender, instance, created, **kwargs):
@@ -7,6 +7,7 @@ from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from datetime import datetime, timedelta
 
+from accounts.services import defer_login_provisioning
 from .models import (
     Faculty, FacultySubject, FacultySchedule, FacultyLeave, 
     FacultyPerformance, FacultyDocument, CustomField, CustomFieldValue
@@ -41,10 +42,13 @@ class FacultyViewSet(viewsets.ModelViewSet):
         'created_at', 'updated_at'
     ]
     ordering = ['name']
+    throttle_scopes = {
+        'bulk_create': 'bulk',
+    }
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_create']:
             return FacultyCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return FacultyUpdateSerializer
@@ -68,6 +72,36 @@ class FacultyViewSet(viewsets.ModelViewSet):
             'subjects', 'schedules', 'leaves', 'performances', 'documents', 'custom_field_values__custom_field'
         )
 
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Bulk create faculty members; their logins are provisioned in one batch"""
+        faculty_data = request.data.get('faculty', [])
+        if not faculty_data:
+            return Response(
+                {'error': 'No faculty data provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created_faculty = []
+        errors = []
+        
+        with defer_login_provisioning():
+            for i, item in enumerate(faculty_data):
+                serializer = self.get_serializer(data=item)
+                if serializer.is_valid():
+                    created_faculty.append(serializer.save())
+                else:
+                    errors.append({'row': i + 1, 'errors': serializer.errors})
+        
+        return Response({
+            'created_count': len(created_faculty),
+            'error_count': len(errors),
+            'errors': errors,
+            'created_faculty': FacultyListSerializer(
+                Faculty.objects.filter(pk__in=[faculty.pk for faculty in created_faculty]), many=True
+            ).data,
+        }, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
     def active_faculty(self, request):
         """Get all active faculty members"""
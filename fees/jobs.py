@@ -0,0 +1,70 @@
+from io import BytesIO
+
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from jobs.runner import register
+
+from .models import Payment, StudentFee
+
+REPORT_COLUMNS = [
+    'Roll Number', 'Student Name', 'Academic Year', 'Fee Items', 'Total Due', 'Total Paid',
+    'Late Fees', 'Balance', 'Overdue Items', 'Last Payment', 'Status',
+]
+
+
+@register('fees.student_fee_report')
+def student_fee_report(ctx, academic_year=None, status=None, department=None):
+    """Per-student fee summary as an Excel workbook, aggregated in the database"""
+    from openpyxl import Workbook
+
+    queryset = StudentFee.objects.all()
+    if academic_year:
+        queryset = queryset.filter(academic_year=academic_year)
+    if status:
+        queryset = queryset.filter(status=status)
+    if department:
+        queryset = queryset.filter(student__department_id=department)
+
+    today = timezone.now().date()
+    last_payment = Payment.objects.filter(
+        student_fee__student=OuterRef('student'), status='COMPLETED'
+    ).order_by('-payment_date').values('payment_date')[:1]
+    rows = queryset.values(
+        'student', 'student__roll_number', 'student__first_name', 'student__last_name', 'academic_year'
+    ).annotate(
+        items=Count('id'),
+        total_due=Sum('amount_due'),
+        total_paid=Sum('amount_paid'),
+        late_fees=Sum('late_fee_amount'),
+        overdue_items=Count('id', filter=Q(status='PENDING', due_date__lt=today)),
+        last_payment=Subquery(last_payment),
+    ).order_by('student__roll_number', 'academic_year')
+    total = rows.count()
+    ctx.progress(0, total, 'Aggregating fees', force=True)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Student Fees')
+    sheet.append(REPORT_COLUMNS)
+    for index, row in enumerate(rows.iterator(chunk_size=2000), 1):
+        balance = row['total_due'] - row['total_paid']
+        sheet.append([
+            row['student__roll_number'],
+            f"{row['student__first_name']} {row['student__last_name']}",
+            row['academic_year'],
+            row['items'],
+            float(row['total_due']),
+            float(row['total_paid']),
+            float(row['late_fees']),
+            float(balance),
+            row['overdue_items'],
+            row['last_payment'].replace(tzinfo=None) if row['last_payment'] else None,
+            'PAID' if balance <= 0 else 'PENDING',
+        ])
+        if index % 1000 == 0:
+            ctx.progress(index, total, f'Wrote {index} of {total} students')
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    ctx.save_result_file(f'student_fees_{today:%Y%m%d}.xlsx', buffer.getvalue())
+    return {'students': total, 'academic_year': academic_year, 'status': status}
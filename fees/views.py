@@ -1,12 +1,15 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum, Q, Count
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
+from jobs.runner import enqueue
+
 from .models import (
     FeeCategory, FeeStructure, FeeStructureDetail, StudentFee,
     Payment, FeeWaiver, FeeDiscount, FeeReceipt
@@ -208,6 +211,19 @@ class StudentFeeViewSet(viewsets.ModelViewSet):
         
         serializer = StudentFeeSummarySerializer(summaries, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def generate_report(self, request):
+        """Queue an Excel fee report; poll the returned job and download its file"""
+        job = enqueue('fees.student_fee_report', {
+            'academic_year': request.data.get('academic_year'),
+            'status': request.data.get('status'),
+            'department': request.data.get('department'),
+        }, user=request.user)
+        return Response({
+            'job_id': str(job.id),
+            'status_url': reverse('jobs:job-detail', kwargs={'pk': job.id}, request=request),
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class PaymentViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'percent', 'backend', 'attempts', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'name', 'backend')
+    search_fields = ('id', 'name', 'error')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'heartbeat_at')
+    raw_id_fields = ('created_by',)
@@ -0,0 +1,64 @@
+"""
+Worker for the database job queue.
+
+    python manage.py run_jobs                 # run until interrupted
+    python manage.py run_jobs --once          # drain the queue and exit
+    python manage.py run_jobs --name students.import --name fees.student_fee_report
+
+Several workers can run side by side; each claims jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so a job is only ever executed once.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.runner import claim_next, default_worker_name, execute, registered_jobs, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Execute background jobs from the database queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = unlimited)')
+        parser.add_argument('--name', action='append', dest='names', help='Only run jobs with this name (repeatable)')
+        parser.add_argument('--worker', type=str, help='Worker name recorded on claimed jobs')
+
+    def handle(self, *args, **options):
+        worker = options['worker'] or default_worker_name()
+        names = options['names']
+        self.stdout.write(f'Worker {worker} ready; handlers: {", ".join(registered_jobs()) or "none"}')
+
+        processed = 0
+        last_sweep = 0.0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - last_sweep > 60:
+                    requeued, failed, cancelled = requeue_stale()
+                    if requeued or failed or cancelled:
+                        self.stdout.write(self.style.WARNING(
+                            f'Requeued {requeued}, failed {failed} and cancelled {cancelled} stale jobs'
+                        ))
+                    last_sweep = time.monotonic()
+
+                job = claim_next(worker, names)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                started = time.monotonic()
+                execute(job)
+                processed += 1
+                style = self.style.SUCCESS if job.status == job.Status.COMPLETED else self.style.WARNING
+                self.stdout.write(style(f'{job.name} {job.pk} {job.status} in {time.monotonic() - started:.1f}s'))
+                if options['max_jobs'] and processed >= options['max_jobs']:
+                    break
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Processed {processed} jobs')
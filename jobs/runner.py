@@ -0,0 +1,318 @@
+"""
+Background job runner.
+
+Long-running work (imports, report generation, PDF batches) is recorded as a
+``Job`` row and executed outside the request/response cycle. Handlers are
+plain functions registered in an app's ``jobs.py``::
+
+    from jobs.runner import register
+
+    @register('fees.student_fee_report')
+    def student_fee_report(ctx, academic_year=None):
+        for done, row in enumerate(rows, 1):
+            ...
+            ctx.progress(done, total)
+        ctx.save_result_file('report.xlsx', content)
+        return {'rows': total}
+
+and queued from a view with ``enqueue('fees.student_fee_report', {...},
+user=request.user)``. The return value is stored as the job result.
+``ctx.progress()`` persists progress (throttled to ``JOBS_PROGRESS_INTERVAL``
+seconds) and raises ``JobCancelled`` once a cancel has been requested.
+
+While a handler runs, the worker stamps the job's heartbeat every
+``JOBS_HEARTBEAT_INTERVAL`` seconds from a thread of its own, so a handler
+that reports progress rarely (or never) is not mistaken for a dead worker.
+``requeue_stale()`` puts jobs without a recent heartbeat back on the queue.
+
+Execution backends (``JOBS_BACKEND``):
+
+``database``
+    Default. The jobs table is the queue; ``manage.py run_jobs`` workers
+    claim rows with ``SELECT ... FOR UPDATE SKIP LOCKED``. No broker needed.
+``celery``
+    The row is still written, and its id is published to Celery
+    (``jobs.run_job``). If Celery is missing or the broker rejects the
+    message, the job falls back to the database queue.
+``immediate``
+    Run in-process once the enqueuing transaction commits. For development
+    and tests only; it ties up the caller like the old synchronous code.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('database', 'celery', 'immediate')
+
+_handlers = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job has been cancelled"""
+
+
+def register(name):
+    """Register ``func(ctx, **payload)`` as the handler for job ``name``."""
+    def decorator(func):
+        if name in _handlers and _handlers[name] is not func:
+            raise ValueError(f"Job handler '{name}' is already registered")
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+def registered_jobs():
+    return sorted(_handlers)
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class JobContext:
+    """Handle passed to job handlers for progress reporting and output"""
+
+    def __init__(self, job):
+        self.job = job
+        self.interval = getattr(settings, 'JOBS_PROGRESS_INTERVAL', 1.0)
+        self._flushed_at = 0.0
+
+    @property
+    def payload(self):
+        return self.job.payload
+
+    @property
+    def input_file(self):
+        return self.job.input_file if self.job.input_file else None
+
+    def progress(self, current, total=None, message=None, force=False):
+        """Record progress and stop the handler if a cancel was requested."""
+        job = self.job
+        job.progress_current = int(current)
+        if total is not None:
+            job.progress_total = int(total)
+        if message is not None:
+            job.progress_message = str(message)[:255]
+
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.interval:
+            return
+        self._flushed_at = now
+        Job.objects.filter(pk=job.pk).update(
+            progress_current=job.progress_current,
+            progress_total=job.progress_total,
+            progress_message=job.progress_message,
+            heartbeat_at=timezone.now(),
+        )
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if Job.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            self.job.cancel_requested = True
+            raise JobCancelled('Job cancelled')
+
+    def save_result_file(self, filename, content):
+        """Attach ``content`` (bytes, str or File) to the job as its downloadable output."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        if not isinstance(content, File):
+            content = ContentFile(content)
+        self.job.result_file.save(filename, content, save=False)
+        Job.objects.filter(pk=self.job.pk).update(result_file=self.job.result_file.name)
+
+
+class Heartbeat(threading.Thread):
+    """Stamps ``heartbeat_at`` of a running job until stopped, whatever its handler is doing"""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.interval = getattr(settings, 'JOBS_HEARTBEAT_INTERVAL', 60)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                # Only while this worker still owns the run; a requeued job is someone else's now
+                Job.objects.filter(pk=self.job.pk, status=Job.Status.RUNNING, worker=self.job.worker).update(
+                    heartbeat_at=timezone.now(),
+                )
+        except Exception:
+            logger.exception('Heartbeat of job %s stopped', self.job.pk)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def get_backend(requested=None):
+    backend = requested or getattr(settings, 'JOBS_BACKEND', 'database')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JOBS_BACKEND '{backend}'. Use one of: {', '.join(BACKENDS)}")
+    if backend == 'celery':
+        try:
+            from .tasks import run_job_task
+        except ImportError:
+            run_job_task = None
+        if run_job_task is None:
+            logger.warning('JOBS_BACKEND is celery but Celery is not installed; using the database queue')
+            return 'database'
+    return backend
+
+
+def enqueue(name, payload=None, *, user=None, input_file=None, backend=None):
+    """Create a job and hand it to the configured backend once the transaction commits."""
+    if get_handler(name) is None:
+        raise ValueError(f"No job handler registered for '{name}'")
+
+    job = Job(
+        name=name,
+        payload=payload or {},
+        backend=get_backend(backend),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    if input_file is not None:
+        job.input_file.save(os.path.basename(input_file.name), input_file, save=False)
+    job.save()
+    transaction.on_commit(lambda: dispatch(job))
+    return job
+
+
+def dispatch(job):
+    if job.backend == 'immediate':
+        run_job(job.pk)
+    elif job.backend == 'celery':
+        from .tasks import run_job_task
+        try:
+            run_job_task.delay(str(job.pk))
+        except Exception:
+            logger.exception('Could not publish job %s to Celery; leaving it on the database queue', job.pk)
+            Job.objects.filter(pk=job.pk, status=Job.Status.PENDING).update(backend='database')
+
+
+def _claim(job_id, worker):
+    """Atomically move a pending job to RUNNING. Returns False if someone else got it."""
+    now = timezone.now()
+    return Job.objects.filter(pk=job_id, status=Job.Status.PENDING, cancel_requested=False).update(
+        status=Job.Status.RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F('attempts') + 1,
+        worker=worker[:100],
+    ) == 1
+
+
+def claim_next(worker=None, names=None):
+    """Claim the oldest pending database-queue job, skipping rows locked by other workers."""
+    worker = worker or default_worker_name()
+    with transaction.atomic():
+        queryset = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.Status.PENDING, backend='database', cancel_requested=False
+        )
+        if names:
+            queryset = queryset.filter(name__in=names)
+        job_id = queryset.order_by('created_at').values_list('pk', flat=True).first()
+        if job_id is None or not _claim(job_id, worker):
+            return None
+    return Job.objects.get(pk=job_id)
+
+
+def run_job(job_id, worker=None):
+    """Claim and execute one job. Returns the job, or None if it was not pending."""
+    if not _claim(job_id, worker or default_worker_name()):
+        return None
+    job = Job.objects.get(pk=job_id)
+    execute(job)
+    return job
+
+
+def execute(job):
+    """Run the handler for an already-claimed job and record the outcome."""
+    handler = get_handler(job.name)
+    ctx = JobContext(job)
+    status, result, error = Job.Status.COMPLETED, None, ''
+
+    if handler is None:
+        status, error = Job.Status.FAILED, f"No job handler registered for '{job.name}'"
+    else:
+        heartbeat = Heartbeat(job)
+        heartbeat.start()
+        try:
+            result = handler(ctx, **job.payload)
+        except JobCancelled as exc:
+            status, error = Job.Status.CANCELLED, str(exc)
+        except Exception as exc:
+            logger.exception('Job %s (%s) failed', job.pk, job.name)
+            status, error = Job.Status.FAILED, str(exc) or exc.__class__.__name__
+        finally:
+            heartbeat.stop()
+
+    if status == Job.Status.COMPLETED and Job.objects.filter(pk=job.pk, cancel_requested=True).exists():
+        status = Job.Status.CANCELLED
+
+    job.status = status
+    job.result = result
+    job.error = error
+    job.finished_at = timezone.now()
+    if status == Job.Status.COMPLETED and job.progress_total:
+        job.progress_current = job.progress_total
+    job.save(update_fields=[
+        'status', 'result', 'error', 'finished_at', 'progress_current', 'progress_total', 'progress_message',
+    ])
+    return job
+
+
+def cancel(job):
+    """Cancel a pending job outright, or ask a running one to stop at its next progress update."""
+    now = timezone.now()
+    if Job.objects.filter(pk=job.pk, status=Job.Status.PENDING).update(
+        status=Job.Status.CANCELLED, cancel_requested=True, finished_at=now
+    ):
+        job.refresh_from_db()
+        return True
+    if Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING).update(cancel_requested=True):
+        job.refresh_from_db()
+        return True
+    return False
+
+
+def requeue_stale(stale_after=None, max_attempts=None):
+    """
+    Return RUNNING jobs whose worker stopped sending heartbeats to the queue (or fail them).
+
+    Jobs with a pending cancel request are cancelled instead: the queue
+    never claims them again. Returns ``(requeued, failed, cancelled)``.
+    """
+    stale_after = stale_after or getattr(settings, 'JOBS_STALE_AFTER', 1800)
+    max_attempts = max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3)
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, heartbeat_at__lt=now - timedelta(seconds=stale_after))
+    cancelled = stale.filter(cancel_requested=True).update(
+        status=Job.Status.CANCELLED, error='Job cancelled', finished_at=now
+    )
+    stale = stale.filter(cancel_requested=False)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=Job.Status.FAILED, error='Worker stopped responding', finished_at=now
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(status=Job.Status.PENDING, backend='database')
+    return requeued, failed, cancelled
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    percent = serializers.FloatField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    duration = serializers.FloatField(read_only=True)
+    result_url = serializers.SerializerMethodField()
+    created_by = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'status', 'backend', 'percent', 'progress_current', 'progress_total',
+            'progress_message', 'cancel_requested', 'is_finished', 'result', 'result_url', 'error',
+            'attempts', 'created_by', 'created_at', 'started_at', 'finished_at', 'duration',
+        ]
+        read_only_fields = fields
+
+    def get_result_url(self, obj):
+        if not obj.result_file:
+            return None
+        request = self.context.get('request')
+        url = obj.result_file.url
+        return request.build_absolute_uri(url) if request else url
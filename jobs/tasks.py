@@ -0,0 +1,14 @@
+"""Celery entry point for the ``celery`` jobs backend (see jobs.runner)."""
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; the database backend needs no broker
+    shared_task = None
+
+run_job_task = None
+
+if shared_task is not None:
+    @shared_task(name='jobs.run_job', ignore_result=True, acks_late=True)
+    def run_job_task(job_id):
+        from .runner import default_worker_name, run_job
+        run_job(job_id, worker=f'celery:{default_worker_name()}')
@@ -0,0 +1,60 @@
+from django.http import FileResponse, Http404
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django_filters.rest_framework import DjangoFilterBackend
+
+from .models import Job
+from .runner import cancel
+from .serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status polling for background jobs.
+
+    Users see the jobs they started; staff see all jobs. Session auth is
+    accepted so dashboard pages can poll the same endpoint.
+    """
+
+    queryset = Job.objects.select_related('created_by')
+    serializer_class = JobSerializer
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['name', 'status']
+    ordering_fields = ['created_at', 'finished_at']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a pending job or ask a running one to stop"""
+        job = self.get_object()
+        if not cancel(job):
+            return Response(
+                {'error': f'Job is already {job.get_status_display().lower()}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the file produced by a completed job"""
+        job = self.get_object()
+        if not job.result_file:
+            raise Http404('This job has no output file')
+        return FileResponse(job.result_file.open('rb'), as_attachment=True,
+                            filename=job.result_file.name.rsplit('/', 1)[-1])
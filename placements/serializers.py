@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Company, JobPosting, Application, PlacementDrive, InterviewRound, Offer
 from students.serializers import StudentSerializer
 from students.models import Student
+from uploads.serializers import StoredFileFieldsMixin
 
 
 class CompanySerializer(serializers.ModelSerializer):
@@ -26,7 +27,7 @@ class JobPostingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'posted_by', 'created_at', 'updated_at']
 
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(StoredFileFieldsMixin, serializers.ModelSerializer):
     student = StudentSerializer(read_only=True)
     student_id = serializers.PrimaryKeyRelatedField(source='student', queryset=Student.objects.all(), write_only=True)
     job = JobPostingSerializer(read_only=True)
@@ -40,6 +41,7 @@ class ApplicationSerializer(serializers.ModelSerializer):
             'status', 'applied_at', 'updated_at', 'notes'
         ]
         read_only_fields = ['id', 'applied_at', 'updated_at']
+    stored_file_fields = {'resume': 'resume_upload_id'}
 
     
 class PlacementDriveSerializer(serializers.ModelSerializer):
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from jobs.runner import register
+
+from . import models, serializers
+
+MODEL_MAP = {
+    'researcher': models.Researcher,
+    'project': models.Project,
+    'publication': models.Publication,
+    'patent': models.Patent,
+    'dataset': models.Dataset,
+    'collaboration': models.Collaboration,
+}
+
+# Imports/exports larger than this are moved to a background job
+SYNC_LIMIT = 500
+
+MAX_REPORTED_ERRORS = 100
+
+
+def serializer_for(model_type):
+    return getattr(serializers, f'{model_type.capitalize()}Serializer')
+
+
+def import_records(model_type, data, progress=None):
+    """Validate and save ``data`` row by row, returning counts and the first errors"""
+    serializer_class = serializer_for(model_type)
+    imported_count, errors = 0, []
+    for index, item_data in enumerate(data):
+        serializer = serializer_class(data=item_data)
+        if serializer.is_valid():
+            serializer.save()
+            imported_count += 1
+        elif len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'index': index, 'errors': serializer.errors})
+        if progress is not None and (index + 1) % 50 == 0:
+            progress(index + 1, len(data), f'Imported {imported_count} {model_type}s')
+    return {'imported_count': imported_count, 'error_count': len(data) - imported_count, 'errors': errors}
+
+
+def render_export(rows, format_type):
+    if format_type == 'csv':
+        buffer = io.StringIO()
+        fieldnames = list(rows[0].keys()) if rows else []
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+                             for key, value in row.items()})
+        return buffer.getvalue(), 'csv'
+    return json.dumps(rows, cls=DjangoJSONEncoder, indent=2), 'json'
+
+
+@register('rnd.import_export')
+def import_export(ctx, operation, model_type, format_type='json', data=None):
+    """Background variant of ImportExportView for large R&D datasets"""
+    model_class = MODEL_MAP[model_type]
+    if operation == 'import':
+        return import_records(model_type, data or [], progress=ctx.progress)
+
+    queryset = model_class.objects.all()
+    total = queryset.count()
+    serializer_class = serializer_for(model_type)
+    rows = []
+    for index, obj in enumerate(queryset.iterator(chunk_size=500), 1):
+        rows.append(serializer_class(obj).data)
+        if index % 500 == 0:
+            ctx.progress(index, total, f'Serialized {index} {model_type}s')
+    content, extension = render_export(rows, format_type)
+    ctx.save_result_file(f'{model_type}_export.{extension}', content)
+    return {'exported_count': len(rows), 'format': format_type}
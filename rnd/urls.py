@@ -17,6 +17,7 @@ router.register(r'collaborations', views.CollaborationViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('import-export/', views.ImportExportView.as_view(), name='import-export'),
 ]
 
 
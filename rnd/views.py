@@ -1,6 +1,7 @@
 from rest_framework import viewsets, permissions, filters, status, views
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count, Sum, Avg, Max, Min
 from django.utils import timezone
@@ -9,7 +10,10 @@ from django.shortcuts import get_object_or_404
 from datetime import date, timedelta
 import json
 
+from jobs.runner import enqueue
+
 from . import models, serializers
+from . import jobs as rnd_jobs
 
 
 class DefaultPermissions(permissions.IsAuthenticated):
@@ -256,6 +260,7 @@ class CollaborationViewSet(viewsets.ModelViewSet):
 # Dashboard Statistics View
 class DashboardStatsView(views.APIView):
     permission_classes = [DefaultPermissions]
+    use_read_replica = True
     
     def get(self, request):
         """Get comprehensive dashboard statistics"""
@@ -324,6 +329,7 @@ class SearchFilterView(views.APIView):
 # Bulk Operations View
 class BulkOperationsView(views.APIView):
     permission_classes = [DefaultPermissions]
+    throttle_scope = 'bulk'
     
     def post(self, request):
         """Handle bulk operations"""
@@ -408,7 +414,12 @@ class ImportExportView(views.APIView):
     permission_classes = [DefaultPermissions]
     
     def post(self, request):
-        """Handle data import/export"""
+        """Handle data import/export.
+        
+        Large imports/exports (or any request with ``background: true``) run as a
+        background job; the response is 202 with a job id to poll at
+        /api/v1/jobs/<id>/ and, for exports, a download once it completes.
+        """
         operation = request.data.get('operation')
         model_type = request.data.get('model_type')
         format_type = request.data.get('format')
@@ -416,28 +427,23 @@ class ImportExportView(views.APIView):
         if not all([operation, model_type, format_type]):
             return Response({'error': 'Missing required parameters'}, status=status.HTTP_400_BAD_REQUEST)
         
-        model_map = {
-            'researcher': models.Researcher,
-            'project': models.Project,
-            'publication': models.Publication,
-            'patent': models.Patent,
-            'dataset': models.Dataset,
-            'collaboration': models.Collaboration
-        }
-        
-        if model_type not in model_map:
+        if model_type not in rnd_jobs.MODEL_MAP:
             return Response({'error': 'Invalid model type'}, status=status.HTTP_400_BAD_REQUEST)
         
-        model_class = model_map[model_type]
+        model_class = rnd_jobs.MODEL_MAP[model_type]
+        background = str(request.data.get('background', '')).lower() in ('1', 'true', 'yes')
         
         if operation == 'export':
             queryset = model_class.objects.all()
-            serializer_class = getattr(serializers, f'{model_type.capitalize()}Serializer')
+            if background or queryset.count() > rnd_jobs.SYNC_LIMIT:
+                return self.enqueue(request, operation, model_type, format_type)
+            serializer_class = rnd_jobs.serializer_for(model_type)
             serializer = serializer_class(queryset, many=True)
+            data = serializer.data
             
             return Response({
-                'message': f'Exported {queryset.count()} {model_type}s',
-                'data': serializer.data,
+                'message': f'Exported {len(data)} {model_type}s',
+                'data': data,
                 'format': format_type
             })
         
@@ -445,22 +451,30 @@ class ImportExportView(views.APIView):
             data = request.data.get('data', [])
             if not data:
                 return Response({'error': 'No data provided for import'}, status=status.HTTP_400_BAD_REQUEST)
+            if background or len(data) > rnd_jobs.SYNC_LIMIT:
+                return self.enqueue(request, operation, model_type, format_type, data)
             
-            serializer_class = getattr(serializers, f'{model_type.capitalize()}Serializer')
-            imported_count = 0
-            
-            for item_data in data:
-                serializer = serializer_class(data=item_data)
-                if serializer.is_valid():
-                    serializer.save()
-                    imported_count += 1
+            result = rnd_jobs.import_records(model_type, data)
             
             return Response({
-                'message': f'Imported {imported_count} {model_type}s',
-                'imported_count': imported_count
+                'message': f'Imported {result["imported_count"]} {model_type}s',
+                'imported_count': result['imported_count']
             })
         
         return Response({'error': 'Invalid operation'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    def enqueue(self, request, operation, model_type, format_type, data=None):
+        job = enqueue('rnd.import_export', {
+            'operation': operation,
+            'model_type': model_type,
+            'format_type': format_type,
+            'data': data,
+        }, user=request.user)
+        return Response({
+            'message': f'{operation.capitalize()} of {model_type}s queued',
+            'job_id': str(job.id),
+            'status_url': reverse('jobs:job-detail', kwargs={'pk': job.id}, request=request),
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 # Alert System View
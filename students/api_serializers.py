@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from accounts.models import UserSession
+from uploads.serializers import ImageVariantsField, StoredFileFieldsMixin
 
 from .models import (
     Student, StudentEnrollmentHistory, StudentDocument, 
@@ -15,6 +16,7 @@ class StudentSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     age = serializers.ReadOnlyField()
     has_login = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Student
@@ -22,7 +24,7 @@ class StudentSerializer(serializers.ModelSerializer):
             'id', 'roll_number', 'first_name', 'last_name', 'middle_name', 
             'full_name', 'date_of_birth', 'age', 'gender', 'year_of_study', 
             'semester', 'section', 'academic_year', 'email', 'student_mobile', 'quota', 
-            'rank', 'status', 'has_login', 'created_at', 'updated_at'
+            'rank', 'status', 'has_login', 'profile_picture_variants', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -79,8 +81,8 @@ class StudentEnrollmentHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class StudentDocumentSerializer(serializers.ModelSerializer):
-    """Serializer for student documents"""
+class StudentDocumentSerializer(StoredFileFieldsMixin, serializers.ModelSerializer):
+    """Serializer for student documents; the file may be sent as ``upload_id`` (see uploads)"""
     student_name = serializers.ReadOnlyField(source='student.full_name')
     student_roll_number = serializers.ReadOnlyField(source='student.roll_number')
     uploaded_by_name = serializers.ReadOnlyField(source='uploaded_by.get_full_name')
@@ -96,6 +98,7 @@ class StudentDocumentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'uploaded_by', 'created_at', 'updated_at']
+    stored_file_fields = {'document_file': 'upload_id'}
     
     def get_file_size(self, obj):
         if obj.document_file:
@@ -21,6 +21,10 @@ urlpatterns = [
     path('', include(router.urls)),
     
     # Additional API endpoints
+    path('<uuid:pk>/overview/', 
+         StudentViewSet.as_view({'get': 'overview'}), 
+         name='student-overview'),
+    
     path('students/<uuid:pk>/documents/', 
          StudentViewSet.as_view({'get': 'documents'}), 
          name='student-documents'),
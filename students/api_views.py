@@ -3,7 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
+from django.db.models import Count
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 
@@ -17,6 +19,12 @@ from .api_serializers import (
     StudentImportSerializer, StudentStatsSerializer
 )
 from .filters import StudentFilter
+from .custom_fields import CustomFieldFilter, export_csv
+from .search import search_students
+from .stats import student_stats
+from .overview import student_overview
+from .services import StudentBulkMutation
+from accounts.services import defer_login_provisioning
 
 
 class StudentViewSet(viewsets.ModelViewSet):
@@ -26,17 +34,20 @@ class StudentViewSet(viewsets.ModelViewSet):
     queryset = Student.objects.all().order_by('-created_at')
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by StudentFilter.search_filter (full-text, see students.search);
+    # ?cf_<name>= filters on custom fields (see students.custom_fields)
+    filter_backends = [DjangoFilterBackend, CustomFieldFilter, filters.OrderingFilter]
     filterset_class = StudentFilter
-    search_fields = [
-        'roll_number', 'first_name', 'last_name', 'middle_name', 'email',
-        'father_name', 'mother_name', 'student_mobile', 'father_mobile', 'mother_mobile'
-    ]
     ordering_fields = [
         'roll_number', 'first_name', 'last_name', 'date_of_birth', 
         'year_of_study', 'semester', 'section', 'status', 'created_at'
     ]
     ordering = ['-created_at']
+    throttle_scopes = {
+        'bulk_create': 'bulk',
+        'bulk_update': 'bulk',
+        'bulk_delete': 'bulk',
+    }
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -45,40 +56,20 @@ class StudentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get student statistics"""
-        total_students = Student.objects.count()
-        active_students = Student.objects.filter(status='ACTIVE').count()
-        students_with_login = Student.objects.filter(user__isnull=False).count()
-        
-        # Year of study distribution
-        grade_distribution = Student.objects.values('year_of_study').annotate(
-            count=Count('id')
-        ).order_by('year_of_study')
+        """Get student statistics (from the incrementally maintained snapshot)"""
+        snapshot = student_stats(recent_days=30)
         
-        # Status distribution
-        status_distribution = Student.objects.values('status').annotate(
-            count=Count('id')
-        ).order_by('status')
-        
-        # Recent enrollments (last 30 days)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_enrollments = Student.objects.filter(
-            created_at__gte=thirty_days_ago
-        ).count()
-        
-        # Gender distribution
-        gender_distribution = Student.objects.values('gender').annotate(
-            count=Count('id')
-        ).order_by('gender')
+        def distribution(dimension, label):
+            return [{label: value, 'count': count} for value, count in sorted(snapshot[dimension].items())]
         
         data = {
-            'total_students': total_students,
-            'active_students': active_students,
-            'students_with_login': students_with_login,
-            'recent_enrollments': recent_enrollments,
-            'grade_distribution': list(grade_distribution),
-            'status_distribution': list(status_distribution),
-            'gender_distribution': list(gender_distribution),
+            'total_students': snapshot['total'],
+            'active_students': snapshot['status'].get('ACTIVE', 0),
+            'students_with_login': snapshot['has_login'].get('true', 0),
+            'recent_enrollments': snapshot['recent_enrollments'],
+            'grade_distribution': distribution('year_of_study', 'year_of_study'),
+            'status_distribution': distribution('status', 'status'),
+            'gender_distribution': distribution('gender', 'gender'),
         }
         
         serializer = StudentStatsSerializer(data)
@@ -86,21 +77,12 @@ class StudentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Advanced search endpoint"""
+        """Ranked full-text search; every term is matched as a prefix"""
         query = request.query_params.get('q', '')
         if not query:
             return Response({'error': 'Query parameter "q" is required'}, status=400)
         
-        students = Student.objects.only('id','roll_number','first_name','last_name','email').filter(
-            Q(roll_number__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(middle_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(father_name__icontains=query) |
-            Q(mother_name__icontains=query) |
-            Q(student_mobile__icontains=query)
-        )[:20]  # Limit to 20 results
+        students = search_students(Student.objects.all(), query, ranked=True)[:20]  # Limit to 20 results
         
         serializer = self.get_serializer(students, many=True)
         return Response(serializer.data)
@@ -126,6 +108,16 @@ class StudentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'])
+    def overview(self, request, pk=None):
+        """Profile, attendance, fees, exams, results, assignments and placements in one response"""
+        # Under ASGI the independent sections run concurrently (see students.overview)
+        concurrent = isinstance(request._request, ASGIRequest)
+        data = student_overview(pk, concurrent=concurrent)
+        if data is None:
+            raise Http404('No Student matches the given query.')
+        return Response(data)
+
     @action(detail=True, methods=['get'])
     def documents(self, request, pk=None):
         """Get student documents"""
@@ -148,10 +140,18 @@ class StudentViewSet(viewsets.ModelViewSet):
     def custom_fields(self, request, pk=None):
         """Get student custom field values"""
         student = self.get_object()
-        custom_values = StudentCustomFieldValue.objects.select_related('custom_field').only('id','custom_field_id','value','student_id').filter(student=student)
+        custom_values = StudentCustomFieldValue.objects.select_related('student', 'custom_field').filter(student=student)
         serializer = StudentCustomFieldValueSerializer(custom_values, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered students as CSV, one column per active custom field"""
+        queryset = self.filter_queryset(self.get_queryset()).order_by('roll_number')
+        response = StreamingHttpResponse(export_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="students_{timezone.now():%Y%m%d}.csv"'
+        return response
+
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
         """Bulk create students"""
@@ -165,22 +165,24 @@ class StudentViewSet(viewsets.ModelViewSet):
         created_students = []
         errors = []
         
-        for i, student_data in enumerate(students_data):
-            try:
-                serializer = self.get_serializer(data=student_data)
-                if serializer.is_valid():
-                    student = serializer.save()
-                    created_students.append(student)
-                else:
+        # Logins for the new students are created in one batch at the end
+        with defer_login_provisioning():
+            for i, student_data in enumerate(students_data):
+                try:
+                    serializer = self.get_serializer(data=student_data)
+                    if serializer.is_valid():
+                        student = serializer.save()
+                        created_students.append(student)
+                    else:
+                        errors.append({
+                            'row': i + 1,
+                            'errors': serializer.errors
+                        })
+                except Exception as e:
                     errors.append({
                         'row': i + 1,
-                        'errors': serializer.errors
+                        'errors': {'general': str(e)}
                     })
-            except Exception as e:
-                errors.append({
-                    'row': i + 1,
-                    'errors': {'general': str(e)}
-                })
         
         response_data = {
             'created_count': len(created_students),
@@ -197,51 +199,29 @@ class StudentViewSet(viewsets.ModelViewSet):
     def bulk_update(self, request):
         """Bulk update students"""
         updates_data = request.data.get('updates', [])
-        if not updates_data:
+        if not updates_data or not isinstance(updates_data, list):
             return Response(
                 {'error': 'No updates data provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        updated_students = []
-        errors = []
-        
-        for update_data in updates_data:
-            roll_number = update_data.get('roll_number')
-            if not roll_number:
-                errors.append({'error': 'roll_number is required for updates'})
-                continue
-            
-            try:
-                student = Student.objects.get(roll_number=roll_number)
-                serializer = self.get_serializer(student, data=update_data, partial=True)
-                if serializer.is_valid():
-                    updated_student = serializer.save()
-                    updated_students.append(updated_student)
-                else:
-                    errors.append({
-                        'roll_number': roll_number,
-                        'errors': serializer.errors
-                    })
-            except Student.DoesNotExist:
-                errors.append({
-                    'roll_number': roll_number,
-                    'error': 'Student not found'
-                })
-            except Exception as e:
-                errors.append({
-                    'roll_number': roll_number,
-                    'error': str(e)
-                })
+        results = StudentBulkMutation(user=request.user).update(
+            updates_data, StudentSerializer, self.get_serializer_context()
+        )
+        errors = [result for result in results if result['status'] in ('invalid', 'not_found')]
+        updated = [result['roll_number'] for result in results if result['status'] == 'updated']
         
         response_data = {
-            'updated_count': len(updated_students),
+            'updated_count': len(updated),
             'error_count': len(errors),
-            'errors': errors
+            'errors': errors,
+            'results': results,
         }
         
-        if updated_students:
-            response_data['updated_students'] = StudentSerializer(updated_students, many=True).data
+        if updated:
+            response_data['updated_students'] = StudentSerializer(
+                Student.objects.filter(roll_number__in=updated).order_by('roll_number'), many=True
+            ).data
         
         return Response(response_data)
 
@@ -249,35 +229,20 @@ class StudentViewSet(viewsets.ModelViewSet):
     def bulk_delete(self, request):
         """Bulk delete students"""
         roll_numbers = request.data.get('roll_numbers', [])
-        if not roll_numbers:
+        if not roll_numbers or not isinstance(roll_numbers, list):
             return Response(
                 {'error': 'No roll numbers provided'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        deleted_count = 0
-        errors = []
-        
-        for roll_number in roll_numbers:
-            try:
-                student = Student.objects.get(roll_number=roll_number)
-                student.delete()
-                deleted_count += 1
-            except Student.DoesNotExist:
-                errors.append({
-                    'roll_number': roll_number,
-                    'error': 'Student not found'
-                })
-            except Exception as e:
-                errors.append({
-                    'roll_number': roll_number,
-                    'error': str(e)
-                })
+        results = StudentBulkMutation(user=request.user).delete(roll_numbers)
+        errors = [result for result in results if result['status'] != 'deleted']
         
         return Response({
-            'deleted_count': deleted_count,
+            'deleted_count': len(results) - len(errors),
             'error_count': len(errors),
-            'errors': errors
+            'errors': errors,
+            'results': results,
         })
 
 
@@ -371,7 +336,7 @@ class StudentCustomFieldValueViewSet(viewsets.ModelViewSet):
         if not student_id:
             return Response({'error': 'student_id parameter is required'}, status=400)
         
-        values = StudentCustomFieldValue.objects.select_related('custom_field').only('id','custom_field_id','value','student_id').filter(student_id=student_id)
+        values = StudentCustomFieldValue.objects.select_related('student', 'custom_field').filter(student_id=student_id)
         serializer = self.get_serializer(values, many=True)
         return Response(serializer.data)
 
@@ -382,7 +347,7 @@ class StudentCustomFieldValueViewSet(viewsets.ModelViewSet):
         if not field_id:
             return Response({'error': 'field_id parameter is required'}, status=400)
         
-        values = StudentCustomFieldValue.objects.select_related('student').only('id','student_id','value','custom_field_id').filter(custom_field_id=field_id)
+        values = StudentCustomFieldValue.objects.select_related('student', 'custom_field').filter(custom_field_id=field_id)
         serializer = self.get_serializer(values, many=True)
         return Response(serializer.data)
 
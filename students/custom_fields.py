@@ -0,0 +1,259 @@
+"""
+Pivoted custom field values.
+
+``StudentCustomFieldValue`` stores one text row per (student, field), so
+filtering or exporting by custom fields costs a join per field or a query
+per student. Each student also carries the same values as one typed JSONB
+document, ``Student.custom_fields``::
+
+    {"<custom field id>": "O+", "<id>": 72.5, "<id>": true, "<id>": ["chess", "music"]}
+
+Numbers, booleans and multi-selects are stored as JSON numbers, booleans and
+arrays, and dates as ISO strings, so they compare and sort correctly. Empty
+values are left out. The document is GIN-indexed (migration 0011).
+
+The value rows stay the source of truth. ``sync_custom_fields()`` rebuilds
+the documents of the students whose rows change (receivers in
+``students.signals``), and it backfills them all from ``manage.py
+sync_student_custom_fields``.
+
+``CustomFieldFilter`` filters students with ``?cf_<field name>=...`` (see
+``custom_field_condition`` for the lookups), and ``export_rows()`` streams
+students with one column per custom field from a single query.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError as APIValidationError
+
+from .models import CustomField, CustomFieldType, Student, StudentCustomFieldValue
+
+PARAM_PREFIX = 'cf_'
+LOOKUPS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte', 'contains', 'isnull')
+
+TRUE_VALUES = {'true', '1', 'yes', 'y', 'on'}
+FALSE_VALUES = {'false', '0', 'no', 'n', 'off'}
+
+
+def typed_value(field_type, value):
+    """Document value for a stored text ``value`` (None when empty). Unparseable values stay text."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if field_type == CustomFieldType.NUMBER:
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            return value
+        if not number.is_finite():
+            return value
+        return int(number) if number == number.to_integral_value() else float(number)
+    if field_type == CustomFieldType.BOOLEAN:
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        return value
+    if field_type == CustomFieldType.DATE:
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        return date.isoformat() if date else value
+    if field_type == CustomFieldType.MULTISELECT:
+        try:
+            options = json.loads(value)
+        except ValueError:
+            options = value.split(',')
+        if not isinstance(options, list):
+            options = [options]
+        return [str(option).strip() for option in options if str(option).strip()] or None
+    return value
+
+
+def build_documents(student_ids, using=None):
+    """``{student_id: document}`` for ``student_ids`` from their value rows (one query)"""
+    documents = {student_id: {} for student_id in student_ids}
+    rows = StudentCustomFieldValue.objects.using(using).filter(student_id__in=student_ids).values_list(
+        'student_id', 'custom_field_id', 'custom_field__field_type', 'value', 'file_value'
+    )
+    for student_id, field_id, field_type, value, file_value in rows:
+        if field_type == CustomFieldType.FILE:
+            value = file_value or value
+        value = typed_value(field_type, value)
+        if value is not None:
+            documents[student_id][str(field_id)] = value
+    return documents
+
+
+def sync_custom_fields(students=None, batch_size=None, using=None):
+    """Rebuild ``Student.custom_fields`` for ``students`` (ids or a queryset; all students if None).
+
+    Each batch locks its student rows first, so concurrent rebuilds of the
+    same student run one after the other and the last one sees every
+    committed value row. Returns the number of documents rewritten.
+    """
+    using = using or router.db_for_write(Student)
+    batch_size = batch_size or getattr(settings, 'STUDENT_IMPORT_CHUNK_SIZE', 1000)
+    if students is None:
+        students = Student.objects.using(using).all()
+    if hasattr(students, 'values_list'):
+        ids = list(students.order_by().values_list('pk', flat=True))
+    else:
+        ids = list(students)
+
+    changed = 0
+    for start in range(0, len(ids), batch_size):
+        with transaction.atomic(using=using):
+            current = dict(
+                Student.objects.using(using).select_for_update().filter(pk__in=ids[start:start + batch_size])
+                .order_by('pk').values_list('pk', 'custom_fields')
+            )
+            documents = build_documents(list(current), using)
+            stale = [
+                Student(pk=pk, custom_fields=document)
+                for pk, document in documents.items() if document != (current[pk] or {})
+            ]
+            Student.objects.using(using).bulk_update(stale, ['custom_fields'], batch_size=batch_size)
+        changed += len(stale)
+    return changed
+
+
+def _truthy(raw):
+    return str(raw).strip().lower() in TRUE_VALUES
+
+
+def custom_field_condition(field, lookup, raw, vendor='postgresql'):
+    """``Q`` on ``Student.custom_fields`` for ``?cf_<name>[__lookup]=raw``.
+
+    ``exact`` (default) and ``in`` match typed values; on a multi-select field
+    they match students who picked the option. ``gt``/``gte``/``lt``/``lte``
+    compare numbers and dates, ``contains`` is a case-insensitive substring
+    match on text and ``isnull`` matches students without a value. Equality
+    uses JSONB containment, which the GIN index serves.
+    """
+    if lookup not in LOOKUPS:
+        raise ValidationError(f"Unsupported lookup '{lookup}'. Use one of: {', '.join(LOOKUPS)}")
+    key = str(field.pk)
+    has_value = Q(custom_fields__has_key=key)
+    if lookup == 'isnull':
+        return ~has_value if _truthy(raw) else has_value
+    if lookup == 'contains':
+        return has_value & Q(**{f'custom_fields__{key}__icontains': raw})
+    if lookup in ('gt', 'gte', 'lt', 'lte'):
+        value = typed_value(field.field_type, raw)
+        if value is None:
+            raise ValidationError(f"A value is required for '{field.name}__{lookup}'")
+        return has_value & Q(**{f'custom_fields__{key}__{lookup}': value})
+
+    raws = str(raw).split(',') if lookup == 'in' else [raw]
+    conditions = []
+    for raw in raws:
+        value = typed_value(field.field_type, raw)
+        if value is None:
+            continue
+        if field.field_type == CustomFieldType.MULTISELECT:
+            value = value[0]
+            if vendor == 'postgresql':
+                conditions.append(Q(custom_fields__contains={key: [value]}))
+            else:
+                conditions.append(has_value & Q(**{f'custom_fields__{key}__icontains': f'"{value}"'}))
+        elif vendor == 'postgresql':
+            conditions.append(Q(custom_fields__contains={key: value}))
+        else:
+            conditions.append(Q(**{f'custom_fields__{key}': value}))
+    if not conditions:
+        raise ValidationError(f"A value is required for '{field.name}'")
+    return reduce(or_, conditions)
+
+
+def filter_by_custom_fields(queryset, params):
+    """Apply every ``cf_<name>[__lookup]`` entry of ``params`` (a QueryDict or dict) to ``queryset``"""
+    wanted = []
+    for param in params:
+        if not param.startswith(PARAM_PREFIX):
+            continue
+        name, _, lookup = param[len(PARAM_PREFIX):].partition('__')
+        wanted.append((param, name, lookup or 'exact'))
+    if not wanted:
+        return queryset
+
+    fields = CustomField.objects.in_bulk({name for _, name, _ in wanted}, field_name='name')
+    vendor = connections[queryset.db].vendor
+    for param, name, lookup in wanted:
+        field = fields.get(name)
+        if field is None:
+            raise ValidationError(f"Unknown custom field '{name}'")
+        queryset = queryset.filter(custom_field_condition(field, lookup, params.get(param), vendor))
+    return queryset
+
+
+class CustomFieldFilter(filters.BaseFilterBackend):
+    """``?cf_<field name>[__lookup]=value`` on ``Student`` querysets"""
+
+    def filter_queryset(self, request, queryset, view):
+        try:
+            return filter_by_custom_fields(queryset, request.query_params)
+        except ValidationError as e:
+            raise APIValidationError({'custom_fields': e.messages})
+
+
+EXPORT_COLUMNS = (
+    ('roll_number', 'Roll Number'),
+    ('first_name', 'First Name'),
+    ('last_name', 'Last Name'),
+    ('email', 'Email'),
+    ('student_mobile', 'Mobile'),
+    ('department__code', 'Department'),
+    ('academic_year', 'Academic Year'),
+    ('year_of_study', 'Year of Study'),
+    ('semester', 'Semester'),
+    ('section', 'Section'),
+    ('status', 'Status'),
+)
+
+
+def export_cell(value):
+    if isinstance(value, list):
+        return ', '.join(value)
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    return '' if value is None else value
+
+
+def export_rows(queryset, fields=None, chunk_size=2000):
+    """Header row, then one row per student with one column per custom field (a single streamed query)"""
+    if fields is None:
+        fields = list(CustomField.objects.filter(is_active=True).order_by('order', 'name'))
+    keys = [str(field.pk) for field in fields]
+    yield [label for _, label in EXPORT_COLUMNS] + [field.label for field in fields]
+    rows = queryset.values_list(*(column for column, _ in EXPORT_COLUMNS), 'custom_fields')
+    for *values, document in rows.iterator(chunk_size=chunk_size):
+        document = document or {}
+        yield [export_cell(value) for value in values] + [export_cell(document.get(key)) for key in keys]
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line, for streaming ``csv.writer`` output"""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(queryset, fields=None):
+    """``export_rows()`` as CSV lines, for a ``StreamingHttpResponse``"""
+    writer = csv.writer(_Echo())
+    for row in export_rows(queryset, fields):
+        yield writer.writerow(row)
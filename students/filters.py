@@ -1,6 +1,7 @@
 import django_filters
 from django.db.models import Q
 from .models import Student, StudentEnrollmentHistory, StudentDocument, CustomField
+from .search import search_students
 
 
 class StudentFilter(django_filters.FilterSet):
@@ -60,23 +61,8 @@ class StudentFilter(django_filters.FilterSet):
         }
     
     def search_filter(self, queryset, name, value):
-        """Search across multiple fields"""
-        if not value:
-            return queryset
-        
-        return queryset.filter(
-            Q(roll_number__icontains=value) |
-            Q(first_name__icontains=value) |
-            Q(last_name__icontains=value) |
-            Q(middle_name__icontains=value) |
-            Q(email__icontains=value) |
-            Q(father_name__icontains=value) |
-            Q(mother_name__icontains=value) |
-            Q(student_mobile__icontains=value) |
-            Q(village__icontains=value) |
-            Q(city__icontains=value) |
-            Q(state__icontains=value)
-        )
+        """Full-text search over the student search document"""
+        return search_students(queryset, value)
     
     def name_filter(self, queryset, name, value):
         """Filter by student name (first, last, or middle)"""
@@ -0,0 +1,31 @@
+from jobs.runner import JobCancelled, register
+
+from .models import StudentImport
+from .services import StudentImportEngine
+from .stats import reconcile_student_stats
+
+
+@register('students.import')
+def import_students(ctx, import_id, skip_errors=False, create_login=True, update_existing=False):
+    """Run a dashboard student import from the uploaded file attached to the job"""
+    import_record = StudentImport.objects.get(pk=import_id)
+    import_record.status = 'PROCESSING'
+    import_record.save(update_fields=['status', 'updated_at'])
+    engine = StudentImportEngine(
+        import_record, skip_errors, create_login, update_existing, progress=ctx.progress
+    )
+    with ctx.input_file.open('rb') as handle:
+        result = engine.run(handle)
+    if ctx.job.cancel_requested:
+        # Chunks written before the cancel stay committed; the record says how many.
+        raise JobCancelled(result.get('error', 'Job cancelled'))
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return result
+
+
+@register('students.reconcile_stats')
+def reconcile_stats(ctx):
+    """Recount the student statistics snapshot; returns the number of corrected counters"""
+    drift = reconcile_student_stats()
+    return {'corrected': len(drift)}
@@ -0,0 +1,30 @@
+"""
+Rebuild the pivoted custom field documents (``Student.custom_fields``) from
+the ``StudentCustomFieldValue`` rows.
+
+    python manage.py sync_student_custom_fields
+    python manage.py sync_student_custom_fields --roll-number 22CS001 --roll-number 22CS002
+
+The documents are kept current by signals; run this after loading value rows
+outside the ORM (raw SQL, ``COPY``, ``QuerySet.update``).
+"""
+
+from django.core.management.base import BaseCommand
+
+from students.custom_fields import sync_custom_fields
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Student.custom_fields from the custom field value rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roll-number', action='append', dest='roll_numbers', help='Only this student (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Students per transaction')
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options['roll_numbers']:
+            students = students.filter(roll_number__in=options['roll_numbers'])
+        changed = sync_custom_fields(students, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rewrote {changed} custom field documents'))
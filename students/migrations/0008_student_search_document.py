@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:52
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_remove_student_grade_level_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The trigger covers every write path (save, bulk_create, QuerySet.update, COPY);
+        # the weights and text search config must stay in step with students.search.
+        migrations.RunSQL(
+            sql=(
+                "CREATE OR REPLACE FUNCTION students_student_search_document() RETURNS trigger AS $$\n"
+                "BEGIN\n"
+                "    NEW.search_document :=\n"
+                "        setweight(to_tsvector('simple', coalesce(NEW.roll_number, '')), 'A') ||\n"
+                "        setweight(to_tsvector('simple', concat_ws(' ', NEW.first_name, NEW.middle_name, NEW.last_name)), 'B') ||\n"
+                "        setweight(to_tsvector('simple', concat_ws(' ', NEW.email, NEW.student_mobile)), 'C') ||\n"
+                "        setweight(to_tsvector('simple', concat_ws(' ', NEW.father_name, NEW.mother_name,\n"
+                "            NEW.father_mobile, NEW.mother_mobile, NEW.village, NEW.city)), 'D');\n"
+                "    RETURN NEW;\n"
+                "END;\n"
+                "$$ LANGUAGE plpgsql;\n"
+                "DROP TRIGGER IF EXISTS students_student_search_document_trg ON students_student;\n"
+                "CREATE TRIGGER students_student_search_document_trg\n"
+                "    BEFORE INSERT OR UPDATE OF roll_number, first_name, middle_name, last_name, email, student_mobile,\n"
+                "        father_name, mother_name, father_mobile, mother_mobile, village, city, search_document\n"
+                "    ON students_student\n"
+                "    FOR EACH ROW EXECUTE FUNCTION students_student_search_document();\n"
+                # Backfill through the trigger, then build the index over the populated column
+                "UPDATE students_student SET search_document = NULL;\n"
+                "CREATE INDEX IF NOT EXISTS student_search_document_gin ON students_student USING gin (search_document);\n"
+            ),
+            reverse_sql=(
+                "DROP INDEX IF EXISTS student_search_document_gin;\n"
+                "DROP TRIGGER IF EXISTS students_student_search_document_trg ON students_student;\n"
+                "DROP FUNCTION IF EXISTS students_student_search_document();\n"
+            ),
+        ),
+    ]
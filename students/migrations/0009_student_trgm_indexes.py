@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_student_search_document'),
+    ]
+
+    # Trigram indexes for campshub360.typeahead
+    operations = [
+        # Other apps' trigram indexes use it too, so reversing leaves it installed
+        migrations.RunSQL('CREATE EXTENSION IF NOT EXISTS pg_trgm;', migrations.RunSQL.noop),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS student_first_name_trgm ON students_student USING gin (first_name gin_trgm_ops);\n"
+                "CREATE INDEX IF NOT EXISTS student_last_name_trgm ON students_student USING gin (last_name gin_trgm_ops);\n"
+                "CREATE INDEX IF NOT EXISTS student_roll_number_trgm ON students_student USING gin (roll_number gin_trgm_ops);\n"
+                "CREATE INDEX IF NOT EXISTS student_email_trgm ON students_student USING gin (email gin_trgm_ops);\n"
+            ),
+            reverse_sql=(
+                "DROP INDEX IF EXISTS student_first_name_trgm;\n"
+                "DROP INDEX IF EXISTS student_last_name_trgm;\n"
+                "DROP INDEX IF EXISTS student_roll_number_trgm;\n"
+                "DROP INDEX IF EXISTS student_email_trgm;\n"
+            ),
+        ),
+    ]
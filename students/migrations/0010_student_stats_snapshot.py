@@ -0,0 +1,70 @@
+# Generated by Django 5.1.4 on 2026-10-17 05:06
+
+from django.db import migrations, models
+
+
+def build_snapshot(apps, schema_editor):
+    # Same counters as students.stats.count_students(), against the historical
+    # models so later changes to Student cannot break this migration.
+    from collections import Counter
+
+    from django.db.models import Case, CharField, Count, F, Value, When
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+
+    using = schema_editor.connection.alias
+    Student = apps.get_model('students', 'Student')
+    StudentStatsSnapshot = apps.get_model('students', 'StudentStatsSnapshot')
+    students = Student.objects.using(using).order_by()
+    groupings = {
+        'status': F('status'),
+        'year_of_study': F('year_of_study'),
+        'section': F('section'),
+        'academic_year': F('academic_year'),
+        'department': F('department_id'),
+        'quota': F('quota'),
+        'gender': F('gender'),
+        'has_login': Case(When(user__isnull=False, then=Value('true')), default=Value('false'),
+                          output_field=CharField()),
+        'enrolled_on': TruncDate('created_at'),
+    }
+    counts = Counter({('total', ''): students.count()})
+    for dimension, expression in groupings.items():
+        for value, n in students.annotate(bucket=expression).values_list('bucket').annotate(n=Count('pk')):
+            if dimension == 'enrolled_on':
+                counts[('enrolled_month', value.strftime('%Y-%m') if value else '')] += n
+                value = value.isoformat() if value else None
+            counts[(dimension, '' if value is None else str(value))] += n
+    now = timezone.now()
+    StudentStatsSnapshot.objects.using(using).bulk_create(
+        [StudentStatsSnapshot(dimension=dimension, value=value, count=n, updated_at=now)
+         for (dimension, value), n in counts.items() if n or dimension == 'total'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_student_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=30)),
+                ('value', models.CharField(blank=True, max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Stats Counter',
+                'verbose_name_plural': 'Student Stats Snapshot',
+                'ordering': ['dimension', 'value'],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'value'), name='student_stats_dimension_value')],
+            },
+        ),
+        migrations.RunPython(build_snapshot, migrations.RunPython.noop),
+    ]
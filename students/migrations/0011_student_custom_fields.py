@@ -0,0 +1,46 @@
+# Generated by Django 5.1.4 on 2026-10-17 05:10
+
+from django.db import migrations, models
+
+
+def backfill_custom_fields(apps, schema_editor):
+    # Same documents as students.custom_fields.build_documents(), against the
+    # historical models; typed_value() only parses the stored text.
+    from students.custom_fields import typed_value
+
+    using = schema_editor.connection.alias
+    Student = apps.get_model('students', 'Student')
+    StudentCustomFieldValue = apps.get_model('students', 'StudentCustomFieldValue')
+    documents = {}
+    rows = StudentCustomFieldValue.objects.using(using).values_list(
+        'student_id', 'custom_field_id', 'custom_field__field_type', 'value', 'file_value',
+    ).iterator(chunk_size=2000)
+    for student_id, field_id, field_type, value, file_value in rows:
+        value = typed_value(field_type, (file_value or value) if field_type == 'file' else value)
+        if value is not None:
+            documents.setdefault(student_id, {})[str(field_id)] = value
+    Student.objects.using(using).bulk_update(
+        [Student(pk=pk, custom_fields=document) for pk, document in documents.items()], ['custom_fields'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_student_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='custom_fields',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_custom_fields, migrations.RunPython.noop),
+        # jsonb_ops (not jsonb_path_ops) so key-existence (?) lookups use the index as well as @>
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS student_custom_fields_gin ON students_student USING gin (custom_fields);",
+            reverse_sql="DROP INDEX IF EXISTS student_custom_fields_gin;",
+        ),
+    ]
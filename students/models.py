@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import RegexValidator
@@ -260,6 +261,24 @@ class Student(TimeStampedUUIDModel):
         related_name='updated_students'
     )
     
+    # Full-text search document, written by a database trigger (see students.search)
+    search_document = SearchVectorField(null=True, editable=False)
+    
+    # Typed custom field values keyed by CustomField id, rebuilt from
+    # StudentCustomFieldValue rows (see students.custom_fields)
+    custom_fields = models.JSONField(default=dict, blank=True, editable=False)
+    
+    # Fields that place a student in the division tree (see students.services)
+    DIVISION_FIELDS = (
+        'status', 'department_id', 'academic_program_id', 'academic_year', 'year_of_study', 'semester', 'section',
+    )
+    
+    # Fields counted by StudentStatsSnapshot (see students.stats)
+    STATS_FIELDS = (
+        'status', 'year_of_study', 'section', 'academic_year', 'department_id', 'quota', 'gender', 'user_id',
+        'created_at',
+    )
+    
     class Meta:
         ordering = ['last_name', 'first_name']
         verbose_name = 'Student'
@@ -268,6 +287,24 @@ class Student(TimeStampedUUIDModel):
     def __str__(self):
         return f"{self.roll_number} - {self.first_name} {self.last_name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_division = instance.division_key()
+        instance._loaded_stats = instance.stats_key()
+        return instance
+    
+    def division_key(self):
+        """Current division placement; deferred fields are read as None rather than fetched"""
+        return tuple(self.__dict__.get(field) for field in self.DIVISION_FIELDS)
+    
+    def stats_key(self):
+        """Values counted by the statistics snapshot, or None if any of them is deferred"""
+        values = self.__dict__
+        if any(field not in values for field in self.STATS_FIELDS):
+            return None
+        return tuple(values[field] for field in self.STATS_FIELDS)
+    
     @property
     def full_name(self):
         """Return the student's full name"""
@@ -464,3 +501,25 @@ class StudentImport(TimeStampedUUIDModel):
         if self.total_rows == 0:
             return 0
         return round((self.success_count / self.total_rows) * 100, 2)
+
+
+class StudentStatsSnapshot(models.Model):
+    """One counter of the student statistics summary, e.g. ('status', 'ACTIVE') -> 1200.
+
+    Maintained incrementally and reconciled periodically by ``students.stats``.
+    """
+    dimension = models.CharField(max_length=30)
+    value = models.CharField(max_length=100, blank=True)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['dimension', 'value']
+        verbose_name = 'Student Stats Counter'
+        verbose_name_plural = 'Student Stats Snapshot'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value'], name='student_stats_dimension_value'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}={self.value or '-'}: {self.count}"
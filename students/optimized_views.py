@@ -3,8 +3,7 @@ High-Performance Optimized Views for Students Module
 Implements caching, query optimization, and performance monitoring
 """
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch, Q, Count, Avg
-from django.core.cache import cache
+from django.db.models import Prefetch, Avg
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -14,10 +13,16 @@ from rest_framework import filters
 
 from .models import Student, StudentDocument, StudentCustomFieldValue, StudentEnrollmentHistory
 from .serializers import StudentSerializer, StudentDetailSerializer
+from .custom_fields import CustomFieldFilter
+from .search import StudentSearchFilter, search_students
+from .stats import student_stats
 from campshub360.cache_utils import cached_query, cached_model, cache_manager
-from campshub360.performance_monitor import monitor_performance
+from campshub360.performance_monitor import monitor_performance, registry as performance_registry
 from campshub360.security import rate_limit_by_user, log_security_events
-import time
+
+# Cached student detail, documents and enrollment history embed these rows
+cached_model(StudentDocument, parents=('student',))
+cached_model(StudentEnrollmentHistory, parents=('student',))
 
 
 class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
@@ -25,9 +30,8 @@ class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
     High-performance Student ViewSet with advanced caching and optimization
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, CustomFieldFilter, filters.OrderingFilter]
     filterset_fields = ['academic_year', 'year_of_study', 'semester', 'section', 'status']
-    search_fields = ['first_name', 'last_name', 'roll_number', 'email']
     ordering_fields = ['created_at', 'roll_number', 'first_name', 'last_name']
     ordering = ['roll_number']
     
@@ -36,7 +40,6 @@ class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
             return StudentDetailSerializer
         return StudentSerializer
     
-    @cached_query(ttl=300)  # Cache for 5 minutes
     def get_queryset(self):
         """Optimized queryset with select_related and prefetch_related"""
         return Student.objects.select_related(
@@ -48,54 +51,32 @@ class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
         ).only(
             'id', 'roll_number', 'first_name', 'last_name', 'email',
             'academic_year', 'year_of_study', 'semester', 'section', 'status',
-            'created_at', 'user_id', 'created_by_id', 'updated_by_id'
+            'profile_picture', 'created_at', 'user_id', 'created_by_id', 'updated_by_id'
         )
     
     @monitor_performance
     @rate_limit_by_user
     @log_security_events
+    @cached_query(ttl=300, models=[Student])  # Invalidated on any student write
     def list(self, request, *args, **kwargs):
         """Optimized list view with caching"""
-        # Check cache first
-        cache_key = f"students_list:{hash(str(request.query_params))}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            request._cache_hit = True
-            return Response(cached_result)
-        
-        request._cache_hit = False
-        
-        # Get queryset and apply filters
         queryset = self.filter_queryset(self.get_queryset())
         
         # Pagination
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            result = self.get_paginated_response(serializer.data)
-            # Cache the result
-            cache.set(cache_key, result.data, 300)  # 5 minutes
-            return result
+            return self.get_paginated_response(serializer.data)
         
         serializer = self.get_serializer(queryset, many=True)
-        result = serializer.data
-        cache.set(cache_key, result, 300)
-        return Response(result)
+        return Response(serializer.data)
     
     @monitor_performance
     @rate_limit_by_user
+    @cached_query(ttl=600, models=[Student], per_object=True)
     def retrieve(self, request, *args, **kwargs):
         """Optimized retrieve view with caching"""
         student_id = kwargs.get('pk')
-        cache_key = f"student_detail:{student_id}"
-        
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            request._cache_hit = True
-            return Response(cached_result)
-        
-        request._cache_hit = False
         
         # Get student with optimized queries
         student = get_object_or_404(
@@ -110,106 +91,63 @@ class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
         )
         
         serializer = self.get_serializer(student)
-        result = serializer.data
-        
-        # Cache the result
-        cache.set(cache_key, result, 600)  # 10 minutes
-        return Response(result)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     @monitor_performance
-    @cached_query(ttl=600)  # Cache for 10 minutes
+    @cached_query(ttl=600, models=[Student])
     def statistics(self, request):
-        """Get student statistics with caching"""
-        cache_key = "student_statistics"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return Response(cached_result)
-        
-        # Calculate statistics
+        """Get student statistics from the incrementally maintained stats snapshot"""
+        snapshot = student_stats(recent_days=30)
         stats = {
-            'total_students': Student.objects.count(),
-            'active_students': Student.objects.filter(status='ACTIVE').count(),
-            'by_grade': dict(Student.objects.values('year_of_study').annotate(count=Count('id'))),
-            'by_academic_year': dict(Student.objects.values('academic_year').annotate(count=Count('id'))),
-            'by_section': dict(Student.objects.values('section').annotate(count=Count('id'))),
-            'recent_enrollments': Student.objects.filter(
-                created_at__gte=time.time() - 30*24*60*60  # Last 30 days
-            ).count()
+            'total_students': snapshot['total'],
+            'active_students': snapshot['status'].get('ACTIVE', 0),
+            'by_grade': snapshot['year_of_study'],
+            'by_academic_year': snapshot['academic_year'],
+            'by_section': snapshot['section'],
+            'recent_enrollments': snapshot['recent_enrollments'],
         }
         
-        cache.set(cache_key, stats, 600)
         return Response(stats)
     
     @action(detail=False, methods=['get'])
     @monitor_performance
     def search(self, request):
-        """Advanced search with full-text search capabilities"""
+        """Ranked full-text search over the indexed student search document"""
         query = request.query_params.get('q', '')
         if not query:
             return Response({'error': 'Query parameter required'}, status=400)
         
-        # Use database full-text search if available
-        if len(query) > 2:
-            # PostgreSQL full-text search
-            students = Student.objects.extra(
-                where=["to_tsvector('english', first_name || ' ' || last_name || ' ' || roll_number || ' ' || COALESCE(email, '')) @@ plainto_tsquery('english', %s)"],
-                params=[query]
-            ).select_related('user')[:50]  # Limit results
-        else:
-            # Fallback to regular search
-            students = Student.objects.filter(
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(roll_number__icontains=query) |
-                Q(email__icontains=query)
-            ).select_related('user')[:50]
+        students = search_students(Student.objects.select_related('user'), query, ranked=True)[:50]  # Limit results
         
         serializer = self.get_serializer(students, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     @monitor_performance
+    @cached_query(ttl=300, models=[Student], per_object=True)
     def documents(self, request, pk=None):
         """Get student documents with caching"""
-        cache_key = f"student_documents:{pk}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return Response(cached_result)
-        
         student = self.get_object()
         documents = student.documents.select_related('uploaded_by').all()
         
         # Serialize documents
         from .serializers import StudentDocumentSerializer
         serializer = StudentDocumentSerializer(documents, many=True)
-        result = serializer.data
-        
-        cache.set(cache_key, result, 300)  # 5 minutes
-        return Response(result)
+        return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     @monitor_performance
+    @cached_query(ttl=600, models=[Student], per_object=True)
     def enrollment_history(self, request, pk=None):
         """Get student enrollment history with caching"""
-        cache_key = f"student_enrollment_history:{pk}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return Response(cached_result)
-        
         student = self.get_object()
         history = student.enrollment_history.all().order_by('-created_at')
         
         # Serialize history
         from .serializers import StudentEnrollmentHistorySerializer
         serializer = StudentEnrollmentHistorySerializer(history, many=True)
-        result = serializer.data
-        
-        cache.set(cache_key, result, 600)  # 10 minutes
-        return Response(result)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
     @monitor_performance
@@ -222,38 +160,6 @@ class HighPerformanceStudentViewSet(viewsets.ModelViewSet):
             'message': 'Bulk import endpoint - implementation needed',
             'status': 'pending'
         }, status=status.HTTP_501_NOT_IMPLEMENTED)
-    
-    def perform_create(self, serializer):
-        """Override create to invalidate cache"""
-        instance = serializer.save()
-        # Invalidate related caches
-        cache.delete_many([
-            'student_statistics',
-            f"students_list:*",  # This would need more sophisticated cache invalidation
-        ])
-        return instance
-    
-    def perform_update(self, serializer):
-        """Override update to invalidate cache"""
-        instance = serializer.save()
-        # Invalidate specific student cache
-        cache.delete(f"student_detail:{instance.id}")
-        cache.delete(f"student_documents:{instance.id}")
-        cache.delete(f"student_enrollment_history:{instance.id}")
-        cache.delete('student_statistics')
-        return instance
-    
-    def perform_destroy(self, instance):
-        """Override destroy to invalidate cache"""
-        student_id = instance.id
-        instance.delete()
-        # Invalidate caches
-        cache.delete_many([
-            f"student_detail:{student_id}",
-            f"student_documents:{student_id}",
-            f"student_enrollment_history:{student_id}",
-            'student_statistics',
-        ])
 
 
 class HighPerformanceStudentAnalyticsViewSet(viewsets.ViewSet):
@@ -261,91 +167,97 @@ class HighPerformanceStudentAnalyticsViewSet(viewsets.ViewSet):
     High-performance analytics for student data
     """
     permission_classes = [IsAuthenticated]
+    use_read_replica = True
     
     @action(detail=False, methods=['get'])
     @monitor_performance
-    @cached_query(ttl=1800)  # Cache for 30 minutes
+    @cached_query(ttl=1800, models=[Student])
     def dashboard_metrics(self, request):
-        """Get dashboard metrics with caching"""
-        cache_key = "student_dashboard_metrics"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return Response(cached_result)
-        
-        # Calculate comprehensive metrics
+        """Get dashboard metrics from the incrementally maintained stats snapshot"""
+        snapshot = student_stats(recent_days=7)
         metrics = {
-            'total_students': Student.objects.count(),
-            'active_students': Student.objects.filter(status='ACTIVE').count(),
-            'inactive_students': Student.objects.filter(status='INACTIVE').count(),
-            'grade_distribution': dict(Student.objects.values('year_of_study').annotate(count=Count('id'))),
-            'section_distribution': dict(Student.objects.values('section').annotate(count=Count('id'))),
-            'academic_year_distribution': dict(Student.objects.values('academic_year').annotate(count=Count('id'))),
-            'recent_enrollments': Student.objects.filter(
-                created_at__gte=time.time() - 7*24*60*60  # Last 7 days
-            ).count(),
-            'monthly_enrollments': self._get_monthly_enrollments(),
+            'total_students': snapshot['total'],
+            'active_students': snapshot['status'].get('ACTIVE', 0),
+            'inactive_students': snapshot['status'].get('INACTIVE', 0),
+            'grade_distribution': snapshot['year_of_study'],
+            'section_distribution': snapshot['section'],
+            'academic_year_distribution': snapshot['academic_year'],
+            'department_distribution': snapshot['department'],
+            'quota_distribution': snapshot['quota'],
+            'recent_enrollments': snapshot['recent_enrollments'],
+            'monthly_enrollments': dict(sorted(snapshot['enrolled_month'].items())),
         }
         
-        cache.set(cache_key, metrics, 1800)
         return Response(metrics)
     
-    def _get_monthly_enrollments(self):
-        """Get monthly enrollment statistics"""
-        from django.db.models.functions import TruncMonth
-        
-        monthly_data = Student.objects.annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            count=Count('id')
-        ).order_by('month')
-        
-        return {str(item['month']): item['count'] for item in monthly_data}
-    
     @action(detail=False, methods=['get'])
     @monitor_performance
-    @cached_query(ttl=3600)  # Cache for 1 hour
+    @cached_query(ttl=60)  # Live metrics; keep the cache short
     def performance_insights(self, request):
         """Get performance insights and recommendations"""
-        cache_key = "student_performance_insights"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return Response(cached_result)
-        
-        # Calculate performance insights
+        routes = performance_registry.summarize()
         insights = {
-            'query_performance': self._analyze_query_performance(),
-            'cache_efficiency': self._analyze_cache_efficiency(),
-            'optimization_recommendations': self._get_optimization_recommendations(),
+            'query_performance': self._analyze_query_performance(routes),
+            'cache_efficiency': self._analyze_cache_efficiency(routes),
+            'optimization_recommendations': self._get_optimization_recommendations(routes),
         }
         
-        cache.set(cache_key, insights, 3600)
         return Response(insights)
     
-    def _analyze_query_performance(self):
-        """Analyze database query performance"""
-        # This would analyze slow queries and provide insights
+    SLOW_ROUTE_SECONDS = 0.5
+    QUERY_HEAVY_ROUTE = 20
+    
+    def _analyze_query_performance(self, routes):
+        """Analyze database query performance from the per-route histograms"""
+        total_requests = sum(r['requests'] for r in routes.values())
+        total_db_time = sum(r['avg_db_time'] * r['requests'] for r in routes.values())
+        total_queries = sum(r['avg_queries'] * r['requests'] for r in routes.values())
+        slow_routes = sorted(
+            (route for route, r in routes.items() if r['p95_duration'] >= self.SLOW_ROUTE_SECONDS),
+            key=lambda route: routes[route]['p95_duration'],
+            reverse=True,
+        )
         return {
-            'avg_query_time': 0.15,  # Placeholder
-            'slow_queries': 0,
-            'optimization_opportunities': []
+            'requests_observed': total_requests,
+            'avg_query_time': round(total_db_time / total_queries, 6) if total_queries else 0,
+            'avg_queries_per_request': round(total_queries / total_requests, 2) if total_requests else 0,
+            'slow_queries': len(slow_routes),
+            'slow_routes': [
+                {'route': route, 'p95_duration': routes[route]['p95_duration'],
+                 'avg_queries': round(routes[route]['avg_queries'], 2)}
+                for route in slow_routes[:10]
+            ],
+            'optimization_opportunities': [
+                route for route, r in routes.items() if r['avg_queries'] >= self.QUERY_HEAVY_ROUTE
+            ],
         }
     
-    def _analyze_cache_efficiency(self):
+    def _analyze_cache_efficiency(self, routes):
         """Analyze cache hit rates and efficiency"""
-        # This would analyze cache performance
+        hits = sum(r['cache_hits'] for r in routes.values())
+        misses = sum(r['cache_misses'] for r in routes.values())
+        lookups = hits + misses
+        hit_rate = round(hits / lookups * 100, 2) if lookups else 0
+        recommendations = []
+        if lookups and hit_rate < 50:
+            recommendations.append('Cache hit rate is below 50%; check invalidation frequency on hot models')
         return {
-            'hit_rate': 85.5,  # Placeholder
-            'miss_rate': 14.5,
-            'recommendations': ['Increase cache TTL for frequently accessed data']
+            'lookups': lookups,
+            'hit_rate': hit_rate,
+            'miss_rate': round(100 - hit_rate, 2) if lookups else 0,
+            'recommendations': recommendations,
         }
     
-    def _get_optimization_recommendations(self):
+    def _get_optimization_recommendations(self, routes):
         """Get optimization recommendations"""
-        return [
-            'Consider adding database indexes for frequently queried fields',
-            'Implement query result caching for complex aggregations',
-            'Use database views for complex joins',
-            'Consider implementing read replicas for analytics queries'
-        ]
+        recommendations = []
+        for route, r in sorted(routes.items()):
+            if r['avg_queries'] >= self.QUERY_HEAVY_ROUTE:
+                recommendations.append(
+                    f"{route}: {r['avg_queries']:.0f} queries per request on average; look for N+1 patterns"
+                )
+            elif r['requests'] and r['avg_db_time'] >= 0.5 * r['avg_duration'] and r['p95_duration'] >= self.SLOW_ROUTE_SECONDS:
+                recommendations.append(
+                    f"{route}: most time is spent in the database; consider indexes or result caching"
+                )
+        return recommendations
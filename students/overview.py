@@ -0,0 +1,347 @@
+"""
+Student 360 overview.
+
+A profile page used to call seven endpoints (student detail, attendance,
+fees, exam performance, grads results, assignments, placement applications),
+each with its own queries. ``student_overview()`` builds the same summary
+in one response from a fixed number of queries, whatever the student's
+history:
+
+==============  =============================================================
+profile         1 (student, department, program, CGPA)
+attendance      1 (summary rows per course section)
+fees            2 (aggregate, last completed payment)
+exams           1 (every result with its schedule)
+grads           2 (course result aggregate, term GPAs)
+assignments     1 (assignments targeted at the student, submission subqueries)
+placements      1 (applications with job and company)
+==============  =============================================================
+
+The sections after ``profile`` are independent. Served under ASGI, they run
+concurrently on a small shared thread pool (``STUDENT_OVERVIEW_WORKERS``
+threads, each keeping its own database connection), so the response takes
+about as long as its slowest section.
+
+Overviews are cached per student (``STUDENT_OVERVIEW_CACHE_TTL``) and
+invalidated by the student's own tag and by writes to any row that feeds a
+section (see ``OVERVIEW_SOURCES`` and ``connect_invalidation()``). Bulk
+paths that skip model signals call ``invalidate_overviews()``.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+from campshub360.cache_utils import cache_manager
+
+from .models import Student
+
+CACHE_NAMESPACE = 'student_overview'
+RECENT_ITEMS = 5
+
+# model -> path from one of its rows to the student(s) whose overview it feeds
+OVERVIEW_SOURCES = {
+    'attendance.AttendanceRecord': 'student_id',
+    'attendance.AttendanceSession': 'records__student_id',
+    'fees.StudentFee': 'student_id',
+    'fees.Payment': 'student_fee__student_id',
+    'exams.ExamRegistration': 'student_id',
+    'exams.ExamResult': 'exam_registration__student_id',
+    'grads.CourseResult': 'student_id',
+    'grads.TermGPA': 'student_id',
+    'grads.GraduateRecord': 'student_id',
+    'assignments.AssignmentSubmission': 'student_id',
+    'placements.Application': 'student_id',
+}
+
+
+def overview_tag(student_id):
+    return f"{cache_manager.instance_tag(Student, student_id)}:overview"
+
+
+def invalidate_overviews(student_ids):
+    """Drop the cached overviews of ``student_ids`` once the current transaction commits"""
+    tags = [overview_tag(student_id) for student_id in set(student_ids)]
+    if tags:
+        transaction.on_commit(lambda: cache_manager.invalidate_tags(*tags))
+
+
+def _ratio(part, whole):
+    return round(part * 100 / whole, 2) if whole else None
+
+
+def profile_section(student_id):
+    row = Student.objects.filter(pk=student_id).values(
+        'id', 'roll_number', 'first_name', 'middle_name', 'last_name', 'email', 'student_mobile',
+        'status', 'academic_year', 'year_of_study', 'semester', 'section', 'enrollment_date',
+        'expected_graduation_date', 'profile_picture', 'user_id', 'department_id', 'academic_program_id',
+        department_name=F('department__name'), department_code=F('department__code'),
+        program_name=F('academic_program__name'), cgpa=F('graduate_record__cgpa'),
+        credits_earned=F('graduate_record__total_credits_earned'),
+    ).first()
+    if row is None:
+        return None
+    row['full_name'] = ' '.join(filter(None, (row['first_name'], row['middle_name'], row['last_name'])))
+    row['has_login'] = row.pop('user_id') is not None
+    row['profile_picture'] = default_storage.url(row['profile_picture']) if row['profile_picture'] else None
+    return row
+
+
+def attendance_section(student_id):
+    """Counts per course section from the attendance summary, archived terms included; late counts as attended"""
+    from attendance.models import AttendanceSession, AttendanceSummary
+
+    # The section's last session held so far; archived terms have no records to look it up by
+    last_session = AttendanceSession.objects.filter(
+        course_section_id=OuterRef('course_section_id'), is_cancelled=False, date__lte=timezone.localdate(),
+    ).order_by('-date').values('date')[:1]
+    rows = AttendanceSummary.objects.filter(student_id=student_id, total__gt=0).values(
+        'course_section_id', 'total', 'present', 'late', 'absent', 'excused',
+        course_code=F('course_section__course__code'), last_session=Subquery(last_session),
+    )
+    courses = []
+    totals = dict.fromkeys(('total', 'present', 'late', 'absent', 'excused'), 0)
+    last_session = None
+    for row in rows:
+        for key in totals:
+            totals[key] += row[key]
+        if row['last_session'] and (last_session is None or row['last_session'] > last_session):
+            last_session = row['last_session']
+        courses.append({
+            'course_section_id': row['course_section_id'],
+            'course_code': row['course_code'],
+            'sessions': row['total'],
+            'attended': row['present'] + row['late'],
+            'percentage': _ratio(row['present'] + row['late'], row['total']),
+        })
+    courses.sort(key=lambda course: course['course_code'] or '')
+    return {
+        **totals,
+        'attended': totals['present'] + totals['late'],
+        'percentage': _ratio(totals['present'] + totals['late'], totals['total']),
+        'last_session': last_session,
+        'by_course': courses,
+    }
+
+
+def fees_section(student_id):
+    from fees.models import Payment, StudentFee
+
+    today = timezone.localdate()
+    open_fees = ~Q(status__in=['PAID', 'WAIVED', 'CANCELLED'])
+    totals = StudentFee.objects.filter(student_id=student_id).aggregate(
+        fees=Count('id'),
+        amount_due=Sum('amount_due', filter=~Q(status='CANCELLED')),
+        amount_paid=Sum('amount_paid', filter=~Q(status='CANCELLED')),
+        late_fees=Sum('late_fee_amount', filter=~Q(status='CANCELLED')),
+        open_fees=Count('id', filter=open_fees),
+        overdue_fees=Count('id', filter=open_fees & Q(due_date__lt=today)),
+        next_due_date=Min('due_date', filter=open_fees & Q(due_date__gte=today)),
+    )
+    for key in ('amount_due', 'amount_paid', 'late_fees'):
+        totals[key] = totals[key] or Decimal('0.00')
+    totals['balance'] = totals['amount_due'] + totals['late_fees'] - totals['amount_paid']
+    totals['last_payment'] = Payment.objects.filter(
+        student_fee__student_id=student_id, status='COMPLETED'
+    ).order_by('-payment_date').values('payment_date', 'amount', 'payment_method', 'receipt_number').first()
+    return totals
+
+
+def exams_section(student_id):
+    """Same totals as the exams performance report, plus the latest results"""
+    from exams.models import ExamResult
+
+    results = list(ExamResult.objects.filter(exam_registration__student_id=student_id).order_by(
+        '-exam_registration__exam_schedule__exam_date'
+    ).values(
+        'marks_obtained', 'percentage', 'grade', 'is_pass',
+        exam_title=F('exam_registration__exam_schedule__title'),
+        course_code=F('exam_registration__exam_schedule__course__code'),
+        exam_date=F('exam_registration__exam_schedule__exam_date'),
+        total_marks=F('exam_registration__exam_schedule__total_marks'),
+        exam_session=F('exam_registration__exam_schedule__exam_session__name'),
+    ))
+    graded = [result for result in results if result['marks_obtained'] is not None]
+    total_marks = sum(result['total_marks'] for result in graded)
+    obtained_marks = sum(result['marks_obtained'] for result in graded)
+    return {
+        'total_exams': len(results),
+        'passed_exams': sum(1 for result in graded if result['is_pass']),
+        'total_marks': total_marks,
+        'obtained_marks': obtained_marks,
+        'overall_percentage': _ratio(obtained_marks, total_marks),
+        'recent_results': results[:RECENT_ITEMS],
+    }
+
+
+def grads_section(student_id):
+    from grads.models import CourseResult, TermGPA
+
+    results = CourseResult.objects.filter(student_id=student_id).aggregate(
+        courses=Count('id'),
+        courses_passed=Count('id', filter=Q(passed=True)),
+        backlogs=Count('id', filter=Q(passed=False)),
+        credits_passed=Sum('course_section__course__credits', filter=Q(passed=True)),
+    )
+    results['credits_passed'] = results['credits_passed'] or 0
+    results['term_gpas'] = list(TermGPA.objects.filter(student_id=student_id).order_by(
+        'term__start_date'
+    ).values(
+        'gpa', 'total_credits', term_name=F('term__name'), academic_year=F('term__academic_year'),
+        semester=F('term__semester'),
+    ))
+    return results
+
+
+def assignments_section(student_id, department_id=None, program_id=None):
+    """Published assignments targeted at the student, directly or through their department/program"""
+    from assignments.models import Assignment, AssignmentSubmission
+
+    targeted = Q(assigned_to_students=student_id)
+    if department_id:
+        targeted |= Q(assigned_to_departments=department_id)
+    if program_id:
+        targeted |= Q(assigned_to_programs=program_id)
+    submission = AssignmentSubmission.objects.filter(assignment=OuterRef('pk'), student_id=student_id)
+    assignment_ids = Assignment.objects.filter(targeted).values('pk')
+    assignments = list(Assignment.objects.filter(status='PUBLISHED', pk__in=assignment_ids).order_by(
+        'due_date'
+    ).values(
+        'id', 'title', 'due_date', 'max_marks',
+        submission_status=Subquery(submission.values('status')[:1]),
+        submitted_at=Subquery(submission.values('submission_date')[:1]),
+        marks_obtained=Subquery(submission.values('grade__marks_obtained')[:1]),
+    ))
+    now = timezone.now()
+    pending = [assignment for assignment in assignments if assignment['submission_status'] is None]
+    return {
+        'total': len(assignments),
+        'submitted': len(assignments) - len(pending),
+        'pending': sum(1 for assignment in pending if assignment['due_date'] >= now),
+        'overdue': sum(1 for assignment in pending if assignment['due_date'] < now),
+        'upcoming': [assignment for assignment in pending if assignment['due_date'] >= now][:RECENT_ITEMS],
+    }
+
+
+def placements_section(student_id):
+    from placements.models import Application
+
+    applications = list(Application.objects.filter(student_id=student_id).order_by('-applied_at').values(
+        'id', 'status', 'applied_at', job_title=F('job__title'), company=F('job__company__name'),
+    ))
+    by_status = {}
+    for application in applications:
+        by_status[application['status']] = by_status.get(application['status'], 0) + 1
+    return {
+        'total': len(applications),
+        'by_status': by_status,
+        'recent_applications': applications[:RECENT_ITEMS],
+    }
+
+
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'STUDENT_OVERVIEW_WORKERS', 6), thread_name_prefix='student-overview'
+        )
+    return _pool
+
+
+def _run_section(section, *args):
+    # Pool threads outlive requests; recycle their connections the way a request would
+    close_old_connections()
+    return section(*args)
+
+
+def build_overview(student_id, concurrent=False):
+    """The overview of ``student_id`` (None if there is no such student).
+
+    With ``concurrent=True`` the sections after ``profile`` run on the shared
+    pool; they read committed data only, so don't use it inside a transaction
+    that has written rows the overview should reflect.
+    """
+    profile = profile_section(student_id)
+    if profile is None:
+        return None
+    sections = {
+        'attendance': (attendance_section, student_id),
+        'fees': (fees_section, student_id),
+        'exams': (exams_section, student_id),
+        'grads': (grads_section, student_id),
+        'assignments': (assignments_section, student_id, profile['department_id'], profile['academic_program_id']),
+        'placements': (placements_section, student_id),
+    }
+    if concurrent:
+        futures = {name: _executor().submit(_run_section, *call) for name, call in sections.items()}
+        data = {name: future.result() for name, future in futures.items()}
+    else:
+        data = {name: section(*args) for name, (section, *args) in sections.items()}
+    return {'profile': profile, **data, 'generated_at': timezone.now()}
+
+
+def student_overview(student_id, concurrent=False):
+    """``build_overview()`` through the cache"""
+    key = cache_manager.make_key(CACHE_NAMESPACE, str(student_id))
+    tags = [
+        cache_manager.instance_tag(Student, student_id),
+        overview_tag(student_id),
+        cache_manager.model_tag(apps.get_model('assignments', 'Assignment')),
+    ]
+    ttl = getattr(settings, 'STUDENT_OVERVIEW_CACHE_TTL', 300)
+    return cache_manager.get_or_set(key, lambda: build_overview(student_id, concurrent), tags, ttl)
+
+
+def _source_student_ids(model, instance, path):
+    field_name, _, rest = path.partition('__')
+    field = model._meta.get_field(field_name)
+    if not rest:
+        return [getattr(instance, field_name)]
+    if field.concrete:
+        return list(field.related_model._default_manager.filter(
+            pk=getattr(instance, field.attname)
+        ).values_list(rest, flat=True))
+    # reverse relation: rows pointing at ``instance``
+    return list(field.related_model._default_manager.filter(
+        **{field.field.name: instance.pk}
+    ).values_list(rest, flat=True).distinct())
+
+
+def connect_invalidation():
+    """Connect the receivers that drop overviews when their source rows change"""
+    for label, path in OVERVIEW_SOURCES.items():
+        model = apps.get_model(label)
+
+        def invalidate(sender, instance, path=path, **kwargs):
+            if kwargs.get('created') and path.startswith('records__'):
+                return  # a new session has no records yet
+            invalidate_overviews(
+                student_id for student_id in _source_student_ids(sender, instance, path) if student_id is not None
+            )
+
+        post_save.connect(invalidate, sender=model, weak=False, dispatch_uid=f'student_overview:{label}:save')
+        post_delete.connect(invalidate, sender=model, weak=False, dispatch_uid=f'student_overview:{label}:delete')
+
+    # Assignments reach students through several relations; any change drops every overview
+    Assignment = apps.get_model('assignments', 'Assignment')
+    cache_manager.register_model(Assignment)
+
+    def retarget(sender, action, **kwargs):
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            cache_manager.invalidate_model(Assignment)
+
+    for relation in ('assigned_to_students', 'assigned_to_departments', 'assigned_to_programs'):
+        m2m_changed.connect(
+            retarget, sender=getattr(Assignment, relation).through, weak=False,
+            dispatch_uid=f'student_overview:assignment:{relation}',
+        )
@@ -0,0 +1,84 @@
+"""
+Full-text search over students.
+
+``Student.search_document`` is a ``tsvector`` maintained by a database trigger
+(migration 0008), so ``save()``, ``bulk_create``, ``QuerySet.update`` and
+``COPY`` all keep it current, and it is served by a GIN index. Lexemes are
+weighted: roll number A, names B, email and mobile C, parents and place D.
+
+Every query term is matched as a prefix, so ``22cs0`` finds roll numbers
+starting with it and ``ann smi`` finds "Anna Smith". The ``simple`` text
+search configuration is used because names and identifiers must not be
+stemmed.
+
+``search_students()`` is the one entry point for student search;
+``StudentSearchFilter`` exposes it as ``?search=`` on DRF viewsets.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = 'simple'
+
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r'[^\W_][\w@./\-]*')
+
+# Columns scanned with icontains on databases without tsvector support
+FALLBACK_FIELDS = (
+    'roll_number', 'first_name', 'last_name', 'middle_name', 'email',
+    'student_mobile', 'father_name', 'mother_name',
+)
+
+
+def prefix_query(text):
+    """Raw tsquery matching every term of ``text`` as a prefix ('' when nothing is searchable)"""
+    terms = _TERM_RE.findall(text.lower())[:MAX_TERMS]
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_students(queryset, text, ranked=False):
+    """Narrow ``queryset`` to students matching ``text``.
+
+    With ``ranked=True`` the rows are annotated with ``search_rank`` and
+    ordered best match first. Otherwise the queryset keeps its ordering, which
+    cursor-paginated list endpoints rely on.
+    """
+    text = (text or '').strip()
+    if not text:
+        return queryset
+    if connections[queryset.db].vendor != 'postgresql':
+        return _fallback_search(queryset, text, ranked)
+
+    raw = prefix_query(text)
+    if not raw:
+        return queryset.none()
+    query = SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+    queryset = queryset.filter(search_document=query)
+    if ranked:
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F('search_document'), query)
+        ).order_by('-search_rank', 'roll_number')
+    return queryset
+
+
+def _fallback_search(queryset, text, ranked):
+    condition = Q()
+    for field in FALLBACK_FIELDS:
+        condition |= Q(**{f'{field}__icontains': text})
+    queryset = queryset.filter(condition)
+    return queryset.order_by('roll_number') if ranked else queryset
+
+
+class StudentSearchFilter(filters.BaseFilterBackend):
+    """``?search=`` through ``search_students`` instead of per-column ``icontains``"""
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        return search_students(queryset, request.query_params.get(self.search_param, ''))
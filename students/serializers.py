@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Student, StudentEnrollmentHistory, StudentDocument, CustomField, StudentCustomFieldValue
+from uploads.serializers import ImageVariantsField, StoredFileFieldsMixin
 
 # Import API serializers
 from .api_serializers import (
@@ -19,6 +20,7 @@ class StudentSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     age = serializers.ReadOnlyField()
     full_address = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Student
@@ -36,7 +38,7 @@ class StudentSerializer(serializers.ModelSerializer):
             'guardian_relationship', 'emergency_contact_name', 
             'emergency_contact_phone', 'emergency_contact_relationship',
             'medical_conditions', 'medications', 'notes', 'profile_picture',
-            'created_at', 'updated_at'
+            'profile_picture_variants', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
@@ -91,13 +93,14 @@ class StudentListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing students"""
     full_name = serializers.ReadOnlyField()
     age = serializers.ReadOnlyField()
+    profile_picture_variants = ImageVariantsField(source='profile_picture')
     
     class Meta:
         model = Student
         fields = [
             'id', 'roll_number', 'full_name', 'age', 'gender', 'email',
             'year_of_study', 'semester', 'section', 'department', 'academic_program', 
-            'status', 'enrollment_date', 'created_at'
+            'status', 'enrollment_date', 'profile_picture_variants', 'created_at'
         ]
 
 
@@ -115,7 +118,7 @@ class StudentEnrollmentHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class StudentDocumentSerializer(serializers.ModelSerializer):
+class StudentDocumentSerializer(StoredFileFieldsMixin, serializers.ModelSerializer):
     """Serializer for Student Documents"""
     student_name = serializers.CharField(source='student.full_name', read_only=True)
     uploaded_by_name = serializers.CharField(source='uploaded_by.email', read_only=True)
@@ -128,6 +131,7 @@ class StudentDocumentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'uploaded_by', 'created_at', 'updated_at']
+    stored_file_fields = {'document_file': 'upload_id'}
 
 
 class StudentDetailSerializer(StudentSerializer):
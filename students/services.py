@@ -0,0 +1,641 @@
+"""
+Bulk operations on students.
+
+``StudentImportEngine`` loads admission sheets (CSV/Excel) into ``Student``
+rows. Validation runs as pandas column operations over the whole sheet,
+existing students are fetched with a single ``roll_number__in`` query and
+rows are written with ``bulk_create``/``bulk_update`` in chunks, so a 10k-row
+sheet costs a handful of queries per chunk instead of several per row.
+
+``build_division_tree`` builds the department/program/year/semester/section
+tree behind the divisions endpoint from one ``GROUP BY`` query plus, when
+students are included, one streamed student query.
+
+``StudentBulkMutation`` backs the bulk update/assign/delete endpoints: one
+``__in`` query for the targets, validation in memory, then a single
+``bulk_update``/``UPDATE``/``DELETE`` in one transaction.
+"""
+
+import os
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ProtectedError, Q, RestrictedError
+from django.utils import timezone
+from rest_framework.validators import UniqueValidator
+
+from accounts.models import IdentifierType
+from accounts.services import UserProvisioner
+from accounts.signals import defer_audit_logs
+from campshub360.cache_utils import cache_manager
+from .models import Student
+from .stats import defer_stats, record_changed, record_created, record_update
+
+DEFAULT_STUDENT_PASSWORD = 'Campus@360'
+
+# Bumped whenever a student enters, leaves or moves within the division tree
+DIVISIONS_CACHE_TAG = 'students:divisions'
+
+DIVISION_LEVELS = ('academic_year', 'year_of_study', 'semester', 'section')
+
+
+def invalidate_divisions():
+    """Invalidate cached division trees once the current transaction commits."""
+    transaction.on_commit(lambda: cache_manager.invalidate_tags(DIVISIONS_CACHE_TAG))
+
+
+def build_division_tree(queryset, include_students=True):
+    """Group ``queryset`` by department > program > academic year > year of study > semester > section.
+
+    Counts come from a single aggregate; every level's ``total_students``
+    includes students whose deeper levels are blank, and blank levels get no
+    node of their own. Students (``StudentListSerializer`` rows) are fetched
+    in one streamed query and appended to their section in name order.
+    """
+    from .serializers import StudentListSerializer
+
+    groups = queryset.filter(department__is_active=True).values(
+        'department_id', 'department__name', 'department__code',
+        'academic_program_id', 'academic_program__name', 'academic_program__code', 'academic_program__level',
+        *DIVISION_LEVELS,
+    ).annotate(count=Count('id')).order_by('department__code', 'academic_program__code', *DIVISION_LEVELS)
+
+    divisions, sections = {}, {}
+    for group in groups:
+        department = divisions.setdefault(group['department__code'], {
+            'department_id': group['department_id'],
+            'department_name': group['department__name'],
+            'department_code': group['department__code'],
+            'programs': {},
+        })
+        if not group['academic_program_id']:
+            continue
+        node = department['programs'].setdefault(group['academic_program__code'], {
+            'program_id': group['academic_program_id'],
+            'program_name': group['academic_program__name'],
+            'program_code': group['academic_program__code'],
+            'program_level': group['academic_program__level'],
+            'years': {},
+        })
+
+        # Walk down the levels, creating nodes and adding this group's count
+        # to every level it reaches; stop at the first blank value.
+        children = node['years']
+        for level, child_key in zip(DIVISION_LEVELS, ('year_of_study', 'semesters', 'sections', None)):
+            value = group[level]
+            if not value:
+                break
+            if child_key is None:
+                section = children.setdefault(value, {'students': [], 'count': 0})
+                section['count'] += group['count']
+                sections[(group['department_id'], group['academic_program_id'],
+                          *(group[name] for name in DIVISION_LEVELS))] = section
+                break
+            child = children.setdefault(value, {child_key: {}, 'total_students': 0})
+            child['total_students'] += group['count']
+            children = child[child_key]
+
+    if include_students and sections:
+        students = queryset.filter(department__is_active=True, section__gt='').only(
+            'id', 'roll_number', 'first_name', 'middle_name', 'last_name', 'date_of_birth', 'gender', 'email',
+            'department', 'academic_program', *DIVISION_LEVELS, 'status', 'enrollment_date', 'profile_picture', 'created_at',
+        ).order_by('last_name', 'first_name')
+        serializer = StudentListSerializer()
+        for student in students.iterator(chunk_size=2000):
+            key = (student.department_id, student.academic_program_id,
+                   *(getattr(student, name) for name in DIVISION_LEVELS))
+            section = sections.get(key)
+            if section is not None:
+                section['students'].append(serializer.to_representation(student))
+
+    return divisions
+
+
+def provision_student_logins(students, batch_size=None):
+    """Create and link logins for students in bulk.
+
+    Same accounts as ``students.signals.create_user_for_student`` (username =
+    roll number, email fallback ``<roll>@students.local``, EMAIL and USERNAME
+    identifiers) with one hash of the default password and one
+    ``bulk_update`` to link them. Returns the provisioner; ``skipped`` lists
+    students whose login could not be created.
+    """
+    provisioner = UserProvisioner(DEFAULT_STUDENT_PASSWORD, batch_size=batch_size)
+    for student in students:
+        if student.user_id:
+            continue
+        identifiers = []
+        if student.email:
+            identifiers.append((student.email, IdentifierType.EMAIL, True, False))
+        identifiers.append((student.roll_number, IdentifierType.USERNAME, not student.email, True))
+        provisioner.add(
+            student, student.roll_number, student.email or f'{student.roll_number}@students.local', identifiers
+        )
+
+    linked = []
+    for student, user in provisioner.provision():
+        student.user = user
+        linked.append(student)
+    Student.objects.bulk_update(linked, ['user'], batch_size=provisioner.batch_size)
+    record_changed(linked)
+    cache_manager.invalidate_model(Student, [student.pk for student in linked])
+    return provisioner
+
+
+class StudentImportEngine:
+    """Validate and persist a student import file for a ``StudentImport`` record."""
+
+    REQUIRED_COLUMNS = ['roll_number', 'first_name', 'last_name', 'date_of_birth', 'gender']
+
+    # Sheet column -> Student field, copied as text when present.
+    TEXT_COLUMNS = {
+        'middle_name': 'middle_name',
+        'email': 'email',
+        'student_mobile': 'student_mobile',
+        'academic_year': 'academic_year',
+        'father_name': 'father_name',
+        'mother_name': 'mother_name',
+        'father_mobile': 'father_mobile',
+        'mother_mobile': 'mother_mobile',
+        'address': 'address_line1',
+        'city': 'city',
+        'state': 'state',
+        'country': 'country',
+        'postal_code': 'postal_code',
+    }
+
+    # Choice columns; values outside the choices are dropped with a warning.
+    CHOICE_COLUMNS = {
+        'section': [choice for choice, _ in Student.SECTION_CHOICES],
+        'quota': [choice for choice, _ in Student.QUOTA_CHOICES],
+        'status': [choice for choice, _ in Student.STATUS_CHOICES],
+    }
+
+    GENDERS = [choice for choice, _ in Student.GENDER_CHOICES]
+    GRADE_LEVELS = [str(i) for i in range(1, 13)]
+
+    def __init__(self, import_record, skip_errors=False, create_login=True, update_existing=False, chunk_size=None,
+                 progress=None):
+        self.import_record = import_record
+        self.skip_errors = skip_errors
+        self.create_login = create_login
+        self.update_existing = update_existing
+        self.chunk_size = chunk_size or getattr(settings, 'STUDENT_IMPORT_CHUNK_SIZE', 1000)
+        # Optional ``progress(done, total, message)`` callback, called after each chunk
+        self.progress = progress
+        self.errors = []
+        self.warnings = []
+        self.success_count = 0
+        self.failed_rows = set()
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+    def run(self, file):
+        """Import ``file`` and return the summary the dashboard expects."""
+        record = self.import_record
+        try:
+            df = self.read(file)
+            record.total_rows = len(df)
+            record.save(update_fields=['total_rows', 'updated_at'])
+
+            existing = self.validate(df)
+            self.report_progress(0, len(df), 'Validated')
+            valid = df[~df.index.isin(self.failed_rows)]
+            if not self.skip_errors and self.failed_rows:
+                # Without skip_errors the import stops at the first bad row.
+                first_failed = min(self.failed_rows)
+                valid = valid[valid.index < first_failed]
+                self.errors = [e for e in self.errors if e['row'] == first_failed + 2]
+                self.warnings = [w for w in self.warnings if w['row'] < first_failed + 2]
+                self.failed_rows = {first_failed}
+
+            for start in range(0, len(valid), self.chunk_size):
+                chunk = valid.iloc[start:start + self.chunk_size]
+                if not self.write_chunk(chunk, existing) and not self.skip_errors:
+                    break
+                self.save_progress()
+                self.report_progress(start + len(chunk), len(valid), 'Importing')
+
+            record.status = 'COMPLETED'
+            self.save_progress()
+        except Exception as e:
+            record.status = 'FAILED'
+            record.errors = [{'row': 0, 'field': 'general', 'message': str(e)}]
+            record.save()
+            return {'success': False, 'error': str(e)}
+
+        return {
+            'success': True,
+            'success_count': self.success_count,
+            'error_count': len(self.failed_rows),
+            'warning_count': len(self.warnings),
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+
+    def report_progress(self, done, total, message):
+        if self.progress is not None:
+            self.progress(done, total, message)
+
+    def save_progress(self):
+        record = self.import_record
+        record.success_count = self.success_count
+        record.error_count = len(self.failed_rows)
+        record.warning_count = len(self.warnings)
+        record.errors = self.errors
+        record.warnings = self.warnings
+        record.save()
+
+    # ------------------------------------------------------------------
+    # Reading and validation
+    # ------------------------------------------------------------------
+    def read(self, file):
+        """Read the sheet as strings with normalized headers and no empty rows."""
+        import pandas as pd
+
+        if os.path.splitext(file.name)[1].lower() == '.csv':
+            df = pd.read_csv(file, dtype=str, keep_default_na=False)
+        else:
+            df = pd.read_excel(file, dtype=str, keep_default_na=False)
+
+        df.columns = [str(column).strip().lower() for column in df.columns]
+        df = df.fillna('').apply(lambda column: column.astype(str).str.strip())
+        for column in self.REQUIRED_COLUMNS:
+            if column not in df.columns:
+                df[column] = ''
+        df['gender'] = df['gender'].str.upper()
+        for column in self.CHOICE_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].str.upper()
+        # Row numbers in messages are spreadsheet rows (1-indexed plus header).
+        return df[(df != '').any(axis=1)].copy()
+
+    def _report(self, target, mask, field, message, values):
+        for index in mask[mask].index:
+            value = values.at[index] if values is not None else ''
+            target.append({'row': index + 2, 'field': field, 'message': message.format(value=value)})
+
+    def error(self, df, mask, field, message, values=None):
+        self._report(self.errors, mask, field, message, df[field] if values is None and field in df else values)
+        self.failed_rows.update(mask[mask].index)
+
+    def warn(self, df, mask, field, message, values=None):
+        self._report(self.warnings, mask, field, message, df[field] if values is None and field in df else values)
+
+    def validate(self, df):
+        """Flag bad rows in place and return existing students keyed by roll number."""
+        import pandas as pd
+
+        for field in self.REQUIRED_COLUMNS:
+            self.error(df, df[field] == '', field, f"Required field '{field}' is missing or empty")
+
+        self.error(df, (df['gender'] != '') & ~df['gender'].isin(self.GENDERS), 'gender',
+                   "Invalid gender '{value}'. Must be M, F, or O")
+
+        if 'grade_level' in df.columns:
+            grade = df['grade_level']
+            self.error(df, (grade != '') & ~grade.isin(self.GRADE_LEVELS), 'grade_level',
+                       "Invalid grade level '{value}'. Must be 1-12")
+
+        # Excel dates arrive as 'YYYY-MM-DD 00:00:00' when read as text.
+        dob = df['date_of_birth'].str.replace(r'\s00:00:00$', '', regex=True)
+        parsed = pd.to_datetime(dob, format='%Y-%m-%d', errors='coerce')
+        self.error(df, (dob != '') & parsed.isna(), 'date_of_birth',
+                   "Invalid date format '{value}'. Use YYYY-MM-DD")
+        df['date_of_birth'] = parsed.dt.date
+
+        roll = df['roll_number']
+        self.error(df, (roll != '') & roll.duplicated(keep='first'), 'roll_number',
+                   "Duplicate roll number '{value}' in file")
+
+        if 'email' not in df.columns:
+            df['email'] = ''
+        emails = df['email']
+        self.error(df, (emails != '') & emails.duplicated(keep='first'), 'email', "Duplicate email '{value}' in file")
+
+        for column, choices in self.CHOICE_COLUMNS.items():
+            if column in df.columns:
+                invalid = (df[column] != '') & ~df[column].isin(choices)
+                self.warn(df, invalid, column, f"Invalid {column} '{{value}}' ignored")
+                df.loc[invalid, column] = ''
+
+        if 'rank' in df.columns:
+            rank = pd.to_numeric(df['rank'], errors='coerce')
+            invalid = (df['rank'] != '') & (rank.isna() | (rank % 1 != 0))
+            self.warn(df, invalid, 'rank', "Invalid rank '{value}' ignored")
+            df['rank'] = rank.where(~invalid)
+
+        existing = {
+            student.roll_number: student
+            for student in Student.objects.filter(roll_number__in=list(roll[roll != '']))
+        }
+        is_existing = roll.isin(list(existing))
+        if self.update_existing:
+            self.warn(df, is_existing, 'roll_number', "Student with roll number '{value}' already exists. Updating.")
+        else:
+            self.error(df, is_existing, 'roll_number', "Student with roll number '{value}' already exists")
+
+        taken = dict(
+            Student.objects.filter(email__in=list(emails[emails != ''])).values_list('email', 'roll_number')
+        )
+        owner = emails.map(taken).fillna('')
+        self.error(df, (owner != '') & (owner != roll), 'email', "Email '{value}' belongs to another student")
+
+        self.errors.sort(key=lambda entry: entry['row'])
+        self.warnings.sort(key=lambda entry: entry['row'])
+        return existing
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def build(self, row, student):
+        student.roll_number = row['roll_number']
+        student.first_name = row['first_name']
+        student.last_name = row['last_name']
+        student.date_of_birth = row['date_of_birth']
+        student.gender = row['gender']
+        for column, field in self.TEXT_COLUMNS.items():
+            if row.get(column):
+                setattr(student, field, row[column])
+        for column in self.CHOICE_COLUMNS:
+            if row.get(column):
+                setattr(student, column, row[column])
+        rank = row.get('rank')
+        if rank is not None and rank == rank:  # not NaN
+            student.rank = int(rank)
+        return student
+
+    def update_fields(self, columns):
+        fields = ['first_name', 'last_name', 'date_of_birth', 'gender', 'updated_at', 'updated_by']
+        fields += [field for column, field in self.TEXT_COLUMNS.items() if column in columns]
+        fields += [column for column in self.CHOICE_COLUMNS if column in columns]
+        if 'rank' in columns:
+            fields.append('rank')
+        return fields
+
+    def write_chunk(self, chunk, existing):
+        """Persist one chunk atomically; returns False if it had to be rolled back."""
+        user = self.import_record.created_by
+        # bulk_update does not apply auto_now
+        now = timezone.now()
+        to_create, to_update = [], []
+        for row in chunk.to_dict('records'):
+            current = existing.get(row['roll_number'])
+            if current is not None:
+                current.updated_by = user
+                current.updated_at = now
+                to_update.append(self.build(row, current))
+            else:
+                to_create.append(self.build(row, Student(created_by=user, updated_by=user)))
+
+        try:
+            with transaction.atomic(), defer_stats():
+                Student.objects.bulk_create(to_create, batch_size=self.chunk_size)
+                record_created(to_create)
+                if to_update:
+                    Student.objects.bulk_update(to_update, self.update_fields(chunk.columns), batch_size=self.chunk_size)
+                    record_changed(to_update)
+                if self.create_login and to_create:
+                    self.provision_logins(to_create, dict(zip(chunk['roll_number'], chunk.index + 2)))
+        except IntegrityError as e:
+            for index in chunk.index:
+                self.errors.append({'row': index + 2, 'field': 'general', 'message': str(e)})
+            self.failed_rows.update(chunk.index)
+            return False
+
+        self.success_count += len(chunk)
+        cache_manager.invalidate_model(Student, [student.pk for student in to_create + to_update])
+        invalidate_divisions()
+        return True
+
+    def provision_logins(self, students, row_numbers):
+        """Create login users for new students (``bulk_create`` skips the post_save signal)."""
+        provisioner = provision_student_logins(students, batch_size=self.chunk_size)
+        for student, username, reason in provisioner.skipped:
+            self.warnings.append({
+                'row': row_numbers.get(username, 0), 'field': 'roll_number',
+                'message': f"Login not created for '{username}': {reason}",
+            })
+
+
+class StudentBulkMutation:
+    """Update, assign or delete many students with a fixed number of queries.
+
+    Targets are looked up by ``key`` (``roll_number`` or ``id``) with one
+    ``__in`` query and validated in memory; the writes then run inside one
+    transaction. Each method returns one result per requested item, in
+    request order, e.g. ``{'roll_number': 'R001', 'status': 'updated'}`` or
+    ``{'roll_number': 'R002', 'status': 'not_found', 'errors': {...}}``.
+    Statuses are ``updated``, ``unchanged``, ``deleted``, ``not_found`` and
+    ``invalid``.
+    """
+
+    UNIQUE_FIELDS = ('roll_number', 'email')
+
+    # Fields ``assign()`` may set, keyed by attname
+    ASSIGNABLE_FIELDS = (
+        'department_id', 'academic_program_id', 'academic_year', 'year_of_study', 'semester', 'section', 'status',
+    )
+
+    def __init__(self, key='roll_number', user=None, batch_size=None):
+        self.key = key
+        self.user = user if user is not None and user.is_authenticated else None
+        self.batch_size = batch_size or getattr(settings, 'STUDENT_IMPORT_CHUNK_SIZE', 1000)
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def update(self, items, serializer_class, context=None):
+        """Apply partial ``serializer_class`` updates; each item carries its own ``key``."""
+        results, targets = self.resolve([item.get(self.key) for item in items])
+        changes = {}
+        for index, student in targets.items():
+            serializer = serializer_class(student, data=items[index], partial=True, context=context or {})
+            # Uniqueness is checked for the whole batch in check_unique()
+            for field in serializer.fields.values():
+                field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+            if not serializer.is_valid():
+                results[index] = self.result(student, 'invalid', serializer.errors)
+                continue
+            updates = {
+                name: value for name, value in serializer.validated_data.items() if getattr(student, name) != value
+            }
+            if updates:
+                changes[index] = updates
+            else:
+                results[index] = self.result(student, 'unchanged')
+
+        self.check_unique(targets, changes, results)
+        if not changes:
+            return results
+
+        fields = sorted({name for updates in changes.values() for name in updates})
+        now = timezone.now()
+        students = []
+        for index, updates in changes.items():
+            student = targets[index]
+            for name, value in updates.items():
+                setattr(student, name, value)
+            student.updated_at = now
+            if self.user is not None:
+                student.updated_by = self.user
+            students.append(student)
+
+        try:
+            with transaction.atomic():
+                Student.objects.bulk_update(
+                    students, fields + ['updated_at', 'updated_by'], batch_size=self.batch_size
+                )
+                record_changed(students)
+        except IntegrityError as e:
+            for index in changes:
+                results[index] = self.result(targets[index], 'invalid', {'non_field_errors': [str(e)]})
+            return results
+
+        for index in changes:
+            results[index] = self.result(targets[index], 'updated')
+        self.invalidate([student.pk for student in students], fields)
+        return results
+
+    def assign(self, keys, changes):
+        """Set the same ``changes`` (attname -> value) on every student in ``keys`` with one UPDATE.
+
+        Raises ``ValidationError`` if ``changes`` is invalid; nothing is written then.
+        """
+        values = self.clean_changes(changes)
+        results, targets = self.resolve(keys, only=('id', self.key))
+        pks = [student.pk for student in targets.values()]
+        if pks and values:
+            values['updated_at'] = timezone.now()
+            if self.user is not None:
+                values['updated_by'] = self.user
+            with transaction.atomic():
+                record_update(Student.objects.filter(pk__in=pks), values)
+                Student.objects.filter(pk__in=pks).update(**values)
+            self.invalidate(pks, values)
+        for index, student in targets.items():
+            results[index] = self.result(student, 'updated' if values else 'unchanged')
+        return results
+
+    def delete(self, keys):
+        """Delete the students in ``keys`` with one filtered ``delete()`` (related rows cascade per table)."""
+        results, targets = self.resolve(keys, only=('id', self.key))
+        if not targets:
+            return results
+        try:
+            with transaction.atomic(), defer_audit_logs(), defer_stats():
+                Student.objects.filter(pk__in=[student.pk for student in targets.values()]).delete()
+        except (ProtectedError, RestrictedError) as e:
+            for index, student in targets.items():
+                results[index] = self.result(student, 'invalid', {'non_field_errors': [e.args[0]]})
+            return results
+        # post_delete signals have already invalidated caches and division trees
+        for index, student in targets.items():
+            results[index] = self.result(student, 'deleted')
+        return results
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def result(self, student_or_key, status, errors=None):
+        key = getattr(student_or_key, self.key, student_or_key)
+        result = {self.key: str(key) if key is not None else None, 'status': status}
+        if errors:
+            result['errors'] = errors
+        return result
+
+    def resolve(self, raw_keys, only=None):
+        """Results pre-filled for bad/missing keys, and ``{index: student}`` for the rest, from one query."""
+        field = Student._meta.get_field(self.key)
+        results = [None] * len(raw_keys)
+        wanted = {}
+        for index, raw in enumerate(raw_keys):
+            if raw in (None, ''):
+                results[index] = self.result(raw, 'invalid', {self.key: [f'{self.key} is required']})
+                continue
+            try:
+                key = str(field.to_python(raw))
+            except ValidationError as e:
+                results[index] = self.result(raw, 'invalid', {self.key: e.messages})
+                continue
+            if key in wanted.values():
+                results[index] = self.result(raw, 'invalid', {self.key: ['Duplicate in request']})
+                continue
+            wanted[index] = key
+
+        existing = {}
+        if wanted:
+            queryset = Student.objects.filter(**{f'{self.key}__in': set(wanted.values())})
+            if only:
+                queryset = queryset.only(*only)
+            existing = {str(getattr(student, self.key)): student for student in queryset}
+
+        targets = {}
+        for index, key in wanted.items():
+            if key in existing:
+                targets[index] = existing[key]
+            else:
+                results[index] = self.result(raw_keys[index], 'not_found', {self.key: ['Student not found']})
+        return results, targets
+
+    def check_unique(self, targets, changes, results):
+        """Reject updates that reuse a roll number/email held by another student or item (one query)."""
+        claims = {}
+        for index, updates in list(changes.items()):
+            for name in self.UNIQUE_FIELDS:
+                value = updates.get(name)
+                if value in (None, ''):
+                    continue
+                if (name, value) in claims:
+                    results[index] = self.result(targets[index], 'invalid', {name: ['Duplicate in request']})
+                    del changes[index]
+                    break
+                claims[(name, value)] = index
+        if not claims:
+            return
+
+        condition = reduce(or_, (
+            Q(**{f'{name}__in': [value for claimed, value in claims if claimed == name]})
+            for name in {name for name, _ in claims}
+        ))
+        for pk, *values in Student.objects.filter(condition).values_list('pk', *self.UNIQUE_FIELDS):
+            for name, value in zip(self.UNIQUE_FIELDS, values):
+                index = claims.get((name, value))
+                if index in changes and targets[index].pk != pk:
+                    results[index] = self.result(
+                        targets[index], 'invalid', {name: [f'Student with this {name} already exists.']}
+                    )
+                    del changes[index]
+
+    def clean_changes(self, changes):
+        """Validate assignment values once with the model fields; related rows must exist and be active."""
+        values, errors = {}, {}
+        for name, value in changes.items():
+            if name not in self.ASSIGNABLE_FIELDS:
+                errors[name] = ['This field cannot be bulk assigned.']
+                continue
+            field = Student._meta.get_field(name)
+            try:
+                if field.is_relation:
+                    value = field.target_field.to_python(value)
+                    if not field.related_model.objects.filter(pk=value, is_active=True).exists():
+                        raise ValidationError(f'Invalid {field.verbose_name}')
+                else:
+                    value = field.clean(value, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+                continue
+            values[field.attname] = value
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def invalidate(self, pks, fields):
+        """Bulk writes send no signals, so drop cached student pages (and division trees if placement moved)."""
+        cache_manager.invalidate_model(Student, pks)
+        if set(fields) & set(Student.DIVISION_FIELDS) or {'department', 'academic_program'} & set(fields):
+            invalidate_divisions()
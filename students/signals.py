@@ -1,15 +1,133 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models import QuerySet
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
-from .models import Student
+from .models import CustomField, Student, StudentDocument, StudentCustomFieldValue, StudentEnrollmentHistory
 from accounts.models import AuthIdentifier, IdentifierType, UserSession
+from accounts.services import defer_login
+from academics.models import AcademicProgram, Department
+from .services import DEFAULT_STUDENT_PASSWORD, invalidate_divisions, provision_student_logins
+from .custom_fields import sync_custom_fields
+from .stats import StatsDelta
+from .overview import connect_invalidation as connect_overview_invalidation
+from campshub360.cache_utils import cached_model
+from uploads.images import register_image_field
 
 
 User = get_user_model()
 
 
+# Cached student list/detail responses are invalidated by writes to these
+# models; child rows also invalidate the owning student's entries.
+cached_model(Student)
+cached_model(StudentDocument, parents=('student',))
+cached_model(StudentCustomFieldValue, parents=('student',))
+cached_model(StudentEnrollmentHistory, parents=('student',))
+# Division trees are labelled with department/program names
+cached_model(Department)
+cached_model(AcademicProgram)
+# Cached student overviews are invalidated by writes to the rows each section reads
+connect_overview_invalidation()
+# Profile pictures get resized variants for list and profile pages
+register_image_field(Student, 'profile_picture')
+
+
+@receiver(post_save, sender=Student)
+def invalidate_divisions_on_move(sender, instance: Student, created: bool, **kwargs):
+    """Drop cached division trees when a student joins or moves between divisions."""
+    current = instance.division_key()
+    if created or getattr(instance, '_loaded_division', None) != current:
+        invalidate_divisions()
+    instance._loaded_division = current
+
+
+@receiver(post_delete, sender=Student)
+def invalidate_divisions_on_delete(sender, instance: Student, **kwargs):
+    invalidate_divisions()
+
+
+@receiver(pre_save, sender=Student)
+def load_stats_key(sender, instance: Student, using, **kwargs):
+    """Read the stored counted values if the instance was loaded with some of them deferred."""
+    if instance._state.adding or getattr(instance, '_loaded_stats', None) is not None:
+        return
+    instance._loaded_stats = Student.objects.using(using).filter(pk=instance.pk).values_list(
+        *Student.STATS_FIELDS
+    ).first()
+
+
+# Registered before create_user_for_student, whose nested save must see the
+# key recorded here.
+@receiver(post_save, sender=Student)
+def update_stats_on_save(sender, instance: Student, created: bool, update_fields, using, **kwargs):
+    """Move the student between statistics counters (see students.stats)."""
+    old = getattr(instance, '_loaded_stats', None)
+    if created:
+        new = instance.stats_key()
+    elif old is None:
+        return
+    else:
+        saved = None if update_fields is None else {Student._meta.get_field(name).attname for name in update_fields}
+        new = tuple(
+            instance.__dict__[field] if field in instance.__dict__ and (saved is None or field in saved) else value
+            for field, value in zip(Student.STATS_FIELDS, old)
+        )
+    delta = StatsDelta()
+    if created:
+        delta.add(new)
+    else:
+        delta.move(old, new)
+    delta.apply(using)
+    instance._loaded_stats = new
+
+
+@receiver(post_delete, sender=Student)
+def update_stats_on_delete(sender, instance: Student, using, **kwargs):
+    key = instance.stats_key() or getattr(instance, '_loaded_stats', None)
+    if key is not None:
+        delta = StatsDelta()
+        delta.remove(key)
+        delta.apply(using)
+
+
+@receiver(post_save, sender=StudentCustomFieldValue)
+def sync_custom_fields_on_save(sender, instance: StudentCustomFieldValue, using, **kwargs):
+    """Rebuild the student's pivoted custom field document (see students.custom_fields)."""
+    sync_custom_fields([instance.student_id], using=using)
+
+
+@receiver(post_delete, sender=StudentCustomFieldValue)
+def sync_custom_fields_on_delete(sender, instance: StudentCustomFieldValue, using, origin=None, **kwargs):
+    # Deleting a student drops its document; deleting a field resyncs its students in one pass
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in (Student, CustomField):
+        return
+    sync_custom_fields([instance.student_id], using=using)
+
+
+@receiver(pre_save, sender=CustomField)
+def load_custom_field_type(sender, instance: CustomField, using, **kwargs):
+    instance._stored_field_type = None if instance._state.adding else CustomField.objects.using(using).filter(
+        pk=instance.pk
+    ).values_list('field_type', flat=True).first()
+
+
+@receiver(post_save, sender=CustomField)
+def retype_custom_field_values(sender, instance: CustomField, created: bool, using, **kwargs):
+    """Values are typed by field type, so a type change rewrites the documents holding the field."""
+    if not created and instance._stored_field_type not in (None, instance.field_type):
+        sync_custom_fields(
+            Student.objects.using(using).filter(custom_field_values__custom_field=instance), using=using
+        )
+
+
+@receiver(post_delete, sender=CustomField)
+def drop_deleted_custom_field(sender, instance: CustomField, using, **kwargs):
+    sync_custom_fields(Student.objects.using(using).filter(custom_fields__has_key=str(instance.pk)), using=using)
+
+
 @receiver(post_save, sender=Student)
 def create_user_for_student(sender, instance: Student, created: bool, **kwargs):
     """Automatically create a User for new students if not linked.
@@ -17,6 +135,9 @@ def create_user_for_student(sender, instance: Student, created: bool, **kwargs):
     - Username/email login using roll_number or email
     - Default password: Campus@360
     - Primary identifier created for email (if present) and roll number
+
+    Inside ``accounts.services.defer_login_provisioning()`` the login is
+    created in bulk by ``provision_student_logins`` when the block exits.
     """
     if not created:
         return
@@ -24,6 +145,9 @@ def create_user_for_student(sender, instance: Student, created: bool, **kwargs):
     if instance.user:
         return
 
+    if defer_login(instance, provision_student_logins):
+        return
+
     # Determine email fallback
     provisional_email = instance.email or f"{instance.roll_number}@students.local"
 
@@ -33,7 +157,7 @@ def create_user_for_student(sender, instance: Student, created: bool, **kwargs):
     user = User.objects.create_user(
         email=provisional_email,
         username=username,
-        password='Campus@360',
+        password=DEFAULT_STUDENT_PASSWORD,
         is_active=True,
     )
 
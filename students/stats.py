@@ -0,0 +1,258 @@
+"""
+Student statistics summary.
+
+``StudentStatsSnapshot`` keeps one counter per (dimension, value): the total,
+and students by status, year of study, section, academic year, department,
+quota, gender, login and enrollment day/month. The statistics endpoints read
+those few dozen rows with ``student_stats()`` instead of grouping the whole
+student table on every hit.
+
+Counters are maintained incrementally in the writer's transaction:
+
+- ``save()``/``delete()`` through the receivers in ``students.signals``;
+- bulk paths (``bulk_create``, ``bulk_update``, ``QuerySet.update``) build and
+  apply their own ``StatsDelta``;
+- inside ``defer_stats()`` all deltas of the block (e.g. every row of a
+  cascading bulk delete) are merged into one write.
+
+A delta is written with a single ``INSERT ... ON CONFLICT DO UPDATE``.
+``reconcile_student_stats()`` rebuilds the counters from the student table
+and reports any drift; run it periodically with ``manage.py
+reconcile_student_stats`` or the ``students.reconcile_stats`` job.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Student, StudentStatsSnapshot
+
+TOTAL = 'total'
+
+# dimension -> Student field (attname) it is counted by
+FIELD_DIMENSIONS = {
+    'status': 'status',
+    'year_of_study': 'year_of_study',
+    'section': 'section',
+    'academic_year': 'academic_year',
+    'department': 'department_id',
+    'quota': 'quota',
+    'gender': 'gender',
+}
+DIMENSIONS = (TOTAL, *FIELD_DIMENSIONS, 'has_login', 'enrolled_on', 'enrolled_month')
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def buckets(key):
+    """The (dimension, value) counters a student with ``Student.stats_key()`` ``key`` belongs to"""
+    values = dict(zip(Student.STATS_FIELDS, key))
+    enrolled = timezone.localdate(values['created_at']) if values['created_at'] else None
+    return (
+        (TOTAL, ''),
+        *((dimension, _text(values[field])) for dimension, field in FIELD_DIMENSIONS.items()),
+        ('has_login', 'true' if values['user_id'] is not None else 'false'),
+        ('enrolled_on', enrolled.isoformat() if enrolled else ''),
+        ('enrolled_month', enrolled.strftime('%Y-%m') if enrolled else ''),
+    )
+
+
+_deferred = ContextVar('deferred_student_stats', default=None)
+
+
+class StatsDelta:
+    """Counter changes to apply to the snapshot in one statement"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, key, n=1):
+        for bucket in buckets(key):
+            self.counts[bucket] += n
+
+    def remove(self, key, n=1):
+        self.add(key, -n)
+
+    def move(self, old_key, new_key):
+        if old_key != new_key:
+            self.remove(old_key)
+            self.add(new_key)
+
+    def shift(self, dimension, old_value, new_value, n):
+        """Move ``n`` students from one value of ``dimension`` to another"""
+        self.counts[(dimension, _text(old_value))] -= n
+        self.counts[(dimension, _text(new_value))] += n
+
+    def apply(self, using=None):
+        """Write the changes now, or merge them into the enclosing ``defer_stats()`` block."""
+        pending = _deferred.get()
+        if pending is not None:
+            pending.counts.update(self.counts)
+            self.counts = Counter()
+            return
+        # Sorted so concurrent writers lock the counter rows in the same order
+        rows = sorted((dimension, value, n) for (dimension, value), n in self.counts.items() if n)
+        self.counts = Counter()
+        if not rows:
+            return
+
+        connection = connections[using or router.db_for_write(StudentStatsSnapshot)]
+        quote = connection.ops.quote_name
+        table = quote(StudentStatsSnapshot._meta.db_table)
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (dimension, value, count, updated_at) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s)"] * len(rows))} '
+                f'ON CONFLICT (dimension, value) DO UPDATE '
+                f'SET count = {table}.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at',
+                [param for dimension, value, n in rows for param in (dimension, value, n, now)],
+            )
+
+
+@contextmanager
+def defer_stats(using=None):
+    """Merge the stats deltas of the block into one write on exit; nothing is written if it raises."""
+    if _deferred.get() is not None:
+        yield _deferred.get()
+        return
+    pending = StatsDelta()
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    pending.apply(using)
+
+
+def record_created(students, using=None):
+    """Count students written with ``bulk_create``"""
+    delta = StatsDelta()
+    for student in students:
+        key = student.stats_key()
+        delta.add(key)
+        student._loaded_stats = key
+    delta.apply(using)
+
+
+def record_changed(students, using=None):
+    """Apply the changes of students written with ``bulk_update`` since they were loaded or recorded"""
+    delta = StatsDelta()
+    for student in students:
+        old, key = getattr(student, '_loaded_stats', None), student.stats_key()
+        if old is not None and key is not None:
+            delta.move(old, key)
+            student._loaded_stats = key
+    delta.apply(using)
+
+
+def record_update(queryset, values):
+    """Account for ``queryset.update(**values)``; call before running the update, in its transaction.
+
+    Costs one ``GROUP BY`` over the rows being moved, grouped by the changed
+    dimensions only.
+    """
+    changed = {dimension: field for dimension, field in FIELD_DIMENSIONS.items() if field in values}
+    if not changed:
+        return
+    delta = StatsDelta()
+    groups = queryset.order_by().values(*changed.values()).annotate(n=Count('pk'))
+    for group in groups:
+        for dimension, field in changed.items():
+            if _text(group[field]) != _text(values[field]):
+                delta.shift(dimension, group[field], values[field], group['n'])
+    delta.apply(queryset.db)
+
+
+def count_students(using=None):
+    """Exact counters from the student table (one ``GROUP BY`` per dimension)"""
+    queryset = Student.objects.using(using or DEFAULT_DB_ALIAS).order_by()
+    groupings = {dimension: F(field) for dimension, field in FIELD_DIMENSIONS.items()}
+    groupings['has_login'] = Case(
+        When(user__isnull=False, then=Value('true')), default=Value('false'), output_field=CharField()
+    )
+    groupings['enrolled_on'] = TruncDate('created_at')
+
+    counts = Counter({(TOTAL, ''): queryset.count()})
+    for dimension, expression in groupings.items():
+        for value, n in queryset.annotate(bucket=expression).values_list('bucket').annotate(n=Count('pk')):
+            if dimension == 'enrolled_on':
+                counts[('enrolled_month', value.strftime('%Y-%m') if value else '')] += n
+                value = value.isoformat() if value else None
+            counts[(dimension, _text(value))] += n
+    return counts
+
+
+def reconcile_student_stats(using=None):
+    """Rebuild the snapshot from the student table.
+
+    Returns ``{(dimension, value): (stored, actual)}`` for the counters that
+    had drifted. On PostgreSQL the snapshot table is locked against writes for
+    the duration, so no concurrent increment is lost.
+    """
+    using = using or router.db_for_write(StudentStatsSnapshot)
+    connection = connections[using]
+    snapshot = StudentStatsSnapshot.objects.using(using)
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                table = connection.ops.quote_name(StudentStatsSnapshot._meta.db_table)
+                cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+        actual = count_students(using)
+        stored = {(dimension, value): count for dimension, value, count in snapshot.values_list(
+            'dimension', 'value', 'count'
+        )}
+        drift = {
+            bucket: (stored.get(bucket, 0), actual.get(bucket, 0))
+            for bucket in set(stored) | set(actual)
+            if stored.get(bucket, 0) != actual.get(bucket, 0)
+        }
+
+        # Empty counters are dropped, except the total, which always has a row
+        stale = [bucket for bucket in stored if not actual.get(bucket) and bucket != (TOTAL, '')]
+        if stale:
+            snapshot.filter(reduce(or_, (Q(dimension=dimension, value=value) for dimension, value in stale))).delete()
+        changed = [bucket for bucket in drift if actual.get(bucket) or bucket == (TOTAL, '')]
+        if (TOTAL, '') not in stored and (TOTAL, '') not in changed:
+            changed.append((TOTAL, ''))
+        now = timezone.now()
+        snapshot.bulk_create(
+            [StudentStatsSnapshot(dimension=dimension, value=value, count=actual[(dimension, value)], updated_at=now)
+             for dimension, value in changed],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['dimension', 'value'],
+            update_fields=['count', 'updated_at'],
+        )
+    return drift
+
+
+def student_stats(recent_days=30):
+    """Snapshot counters as ``{'total', 'recent_enrollments', <dimension>: {value: count}}``.
+
+    ``recent_enrollments`` counts students created in the last ``recent_days``
+    days, today included. Reads only: the snapshot is built by migration 0010
+    and rebuilt by ``reconcile_student_stats()``; until then every counter is 0.
+    """
+    since = (timezone.localdate() - timedelta(days=recent_days - 1)).isoformat()
+    rows = StudentStatsSnapshot.objects.filter(
+        ~Q(dimension='enrolled_on') | Q(dimension='enrolled_on', value__gte=since)
+    ).values_list('dimension', 'value', 'count')
+
+    stats = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, value, count in rows:
+        if count and dimension in stats:
+            stats[dimension][value] = count
+    stats['total'] = stats.pop(TOTAL).get('', 0)
+    stats['recent_enrollments'] = sum(stats.pop('enrolled_on').values())
+    return stats
@@ -1,12 +1,18 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
 from rest_framework import status, viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 
+from campshub360.cache_utils import cache_manager
 from .models import Student, StudentEnrollmentHistory, StudentDocument, CustomField, StudentCustomFieldValue
+from .search import search_students
+from .stats import record_update, student_stats
+from .services import DIVISIONS_CACHE_TAG, StudentBulkMutation, build_division_tree, invalidate_divisions
 from .serializers import (
     StudentSerializer, StudentCreateSerializer, StudentUpdateSerializer,
     StudentListSerializer, StudentDetailSerializer, StudentEnrollmentHistorySerializer,
@@ -25,6 +31,10 @@ class StudentViewSet(viewsets.ModelViewSet):
     queryset = Student.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    throttle_scopes = {
+        'assign_students': 'bulk',
+        'bulk_assign_by_criteria': 'bulk',
+    }
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -45,14 +55,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         # Search functionality
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(roll_number__icontains=search) |
-                Q(email__icontains=search) |
-                Q(father_name__icontains=search) |
-                Q(mother_name__icontains=search)
-            )
+            queryset = search_students(queryset, search)
         
         # Filter by status
         status_filter = self.request.query_params.get('status', None)
@@ -147,29 +150,20 @@ class StudentViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get student statistics"""
-        total_students = Student.objects.count()
-        active_students = Student.objects.filter(status='ACTIVE').count()
-        inactive_students = Student.objects.filter(status='INACTIVE').count()
-        graduated_students = Student.objects.filter(status='GRADUATED').count()
-        
-        # Students by grade level
-        grade_stats = {}
-        for grade, _ in Student.GRADE_CHOICES:
-            grade_stats[f'grade_{grade}'] = Student.objects.filter(grade_level=grade).count()
-        
-        # Students by gender
-        gender_stats = {}
-        for gender, _ in Student.GENDER_CHOICES:
-            gender_stats[gender] = Student.objects.filter(gender=gender).count()
+        """Get student statistics (from the incrementally maintained snapshot)"""
+        snapshot = student_stats()
         
         stats = {
-            'total_students': total_students,
-            'active_students': active_students,
-            'inactive_students': inactive_students,
-            'graduated_students': graduated_students,
-            'grade_distribution': grade_stats,
-            'gender_distribution': gender_stats
+            'total_students': snapshot['total'],
+            'active_students': snapshot['status'].get('ACTIVE', 0),
+            'inactive_students': snapshot['status'].get('INACTIVE', 0),
+            'graduated_students': snapshot['status'].get('GRADUATED', 0),
+            'grade_distribution': {
+                f'year_{year}': snapshot['year_of_study'].get(year, 0) for year, _ in Student.YEAR_OF_STUDY_CHOICES
+            },
+            'gender_distribution': {
+                gender: snapshot['gender'].get(gender, 0) for gender, _ in Student.GENDER_CHOICES
+            },
         }
         
         return Response(stats)
@@ -248,8 +242,12 @@ class StudentViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def divisions(self, request):
-        """Get students grouped by department, program, year, semester, and section"""
-        from django.db.models import Count
+        """Get students grouped by department, program, year, semester, and section
+        
+        Built from one aggregate query (plus one streamed student query unless
+        ``include_students=false``) and cached until a student's division
+        placement changes.
+        """
         from academics.models import Department, AcademicProgram
         
         # Get query parameters
@@ -259,6 +257,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         year_of_study = request.query_params.get('year_of_study', None)
         semester = request.query_params.get('semester', None)
         section = request.query_params.get('section', None)
+        include_students = request.query_params.get('include_students', 'true').lower() not in ('false', '0', 'no')
         
         # Base queryset
         queryset = Student.objects.filter(status='ACTIVE')
@@ -277,79 +276,23 @@ class StudentViewSet(viewsets.ModelViewSet):
         if section:
             queryset = queryset.filter(section=section)
         
-        # Group students by department, program, year, semester, and section
-        divisions = {}
-        
-        # Get all departments
-        departments = Department.objects.filter(is_active=True)
-        
-        for dept in departments:
-            dept_students = queryset.filter(department=dept)
-            if dept_students.exists():
-                divisions[dept.code] = {
-                    'department_id': dept.id,
-                    'department_name': dept.name,
-                    'department_code': dept.code,
-                    'programs': {}
-                }
-                
-                # Group by academic programs
-                programs = dept_students.values_list('academic_program', flat=True).distinct()
-                for program_id in programs:
-                    if program_id:
-                        try:
-                            program = AcademicProgram.objects.get(id=program_id)
-                            program_students = dept_students.filter(academic_program=program)
-                            
-                            divisions[dept.code]['programs'][program.code] = {
-                                'program_id': program.id,
-                                'program_name': program.name,
-                                'program_code': program.code,
-                                'program_level': program.level,
-                                'years': {}
-                            }
-                            
-                            # Group by academic year
-                            years = program_students.values_list('academic_year', flat=True).distinct()
-                            for year in years:
-                                if year:
-                                    year_students = program_students.filter(academic_year=year)
-                                    divisions[dept.code]['programs'][program.code]['years'][year] = {
-                                        'year_of_study': {},
-                                        'total_students': year_students.count()
-                                    }
-                                    
-                                    # Group by year of study
-                                    study_years = year_students.values_list('year_of_study', flat=True).distinct()
-                                    for study_year in study_years:
-                                        if study_year:
-                                            study_year_students = year_students.filter(year_of_study=study_year)
-                                            divisions[dept.code]['programs'][program.code]['years'][year]['year_of_study'][study_year] = {
-                                                'semesters': {},
-                                                'total_students': study_year_students.count()
-                                            }
-                                            
-                                            # Group by semester
-                                            semesters = study_year_students.values_list('semester', flat=True).distinct()
-                                            for sem in semesters:
-                                                if sem:
-                                                    semester_students = study_year_students.filter(semester=sem)
-                                                    divisions[dept.code]['programs'][program.code]['years'][year]['year_of_study'][study_year]['semesters'][sem] = {
-                                                        'sections': {},
-                                                        'total_students': semester_students.count()
-                                                    }
-                                                    
-                                                    # Group by section
-                                                    sections = semester_students.values_list('section', flat=True).distinct()
-                                                    for sec in sections:
-                                                        if sec:
-                                                            section_students = semester_students.filter(section=sec)
-                                                            divisions[dept.code]['programs'][program.code]['years'][year]['year_of_study'][study_year]['semesters'][sem]['sections'][sec] = {
-                                                                'students': StudentListSerializer(section_students, many=True).data,
-                                                                'count': section_students.count()
-                                                            }
-                        except AcademicProgram.DoesNotExist:
-                            continue
+        # Counts only change when students move between divisions; the student
+        # rows themselves go stale on any student write.
+        tags = [
+            DIVISIONS_CACHE_TAG,
+            cache_manager.model_tag(Department),
+            cache_manager.model_tag(AcademicProgram),
+        ]
+        if include_students:
+            tags.append(cache_manager.model_tag(Student))
+        key = cache_manager.make_key(
+            'students:divisions', department_id, academic_program_id, academic_year,
+            year_of_study, semester, section, include_students
+        )
+        divisions = cache_manager.get_or_set(
+            key, lambda: build_division_tree(queryset, include_students), tags,
+            ttl=getattr(settings, 'STUDENT_DIVISIONS_CACHE_TTL', 900)
+        )
         
         return Response(divisions)
     
@@ -357,79 +300,44 @@ class StudentViewSet(viewsets.ModelViewSet):
     def assign_students(self, request):
         """Assign multiple students to department, program, year, semester, and section"""
         student_ids = request.data.get('student_ids', [])
-        department_id = request.data.get('department_id')
-        academic_program_id = request.data.get('academic_program_id')
-        academic_year = request.data.get('academic_year')
-        year_of_study = request.data.get('year_of_study')
-        semester = request.data.get('semester')
-        section = request.data.get('section')
-        
-        if not student_ids:
+        
+        if not student_ids or not isinstance(student_ids, list):
             return Response(
                 {'error': 'student_ids is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate department if provided
-        if department_id:
-            try:
-                from academics.models import Department
-                Department.objects.get(id=department_id, is_active=True)
-            except Department.DoesNotExist:
-                return Response(
-                    {'error': 'Invalid department'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Validate academic program if provided
-        if academic_program_id:
-            try:
-                from academics.models import AcademicProgram
-                AcademicProgram.objects.get(id=academic_program_id, is_active=True)
-            except AcademicProgram.DoesNotExist:
-                return Response(
-                    {'error': 'Invalid academic program'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Update students
-        updated_students = []
-        errors = []
+        # Only the fields provided are assigned; department/program must be active
+        changes = {
+            field: request.data[field]
+            for field in ('department_id', 'academic_program_id', 'academic_year', 'year_of_study', 'semester', 'section')
+            if request.data.get(field)
+        }
+        try:
+            results = StudentBulkMutation(key='id', user=request.user).assign(student_ids, changes)
+        except DjangoValidationError as e:
+            field, messages = next(iter(e.message_dict.items()))
+            return Response(
+                {'error': messages[0], 'field': field, 'errors': e.message_dict}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for student_id in student_ids:
-            try:
-                student = Student.objects.get(id=student_id)
-                
-                # Update fields if provided
-                if department_id:
-                    student.department_id = department_id
-                if academic_program_id:
-                    student.academic_program_id = academic_program_id
-                if academic_year:
-                    student.academic_year = academic_year
-                if year_of_study:
-                    student.year_of_study = year_of_study
-                if semester:
-                    student.semester = semester
-                if section:
-                    student.section = section
-                
-                student.updated_by = request.user
-                student.save()
-                updated_students.append(student)
-                
-            except Student.DoesNotExist:
-                errors.append(f'Student with id {student_id} not found')
-            except Exception as e:
-                errors.append(f'Error updating student {student_id}: {str(e)}')
+        updated_ids = [result['id'] for result in results if result['status'] in ('updated', 'unchanged')]
+        errors = [
+            f"Student with id {result['id']} not found" if result['status'] == 'not_found'
+            else f"Error updating student {result['id']}: {result['errors']}"
+            for result in results if result['status'] in ('not_found', 'invalid')
+        ]
         
         # Serialize updated students
+        updated_students = Student.objects.filter(id__in=updated_ids)
         serializer = StudentListSerializer(updated_students, many=True)
         
         response_data = {
             'updated_students': serializer.data,
-            'updated_count': len(updated_students),
-            'errors': errors
+            'updated_count': len(updated_ids),
+            'errors': errors,
+            'results': results,
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
@@ -506,8 +414,12 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         update_fields['updated_by'] = request.user
         
-        # Perform bulk update
-        updated_count = queryset.update(**update_fields)
+        # Perform bulk update (QuerySet.update sends no signals, so invalidate here)
+        with transaction.atomic():
+            record_update(queryset, update_fields)
+            updated_count = queryset.update(**update_fields)
+        cache_manager.invalidate_model(Student)
+        invalidate_divisions()
         
         # Get updated students for response
         updated_students = queryset.all()[:50]  # Limit response size
@@ -701,12 +613,7 @@ def student_list_view(request):
     # Handle search
     search_query = request.GET.get('search', '')
     if search_query:
-        students = students.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(student_id__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
+        students = search_students(students, search_query)
     
     context = {
         'students': students,
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import StoredFile, Upload
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('file', 'content_type', 'size', 'created_at')
+    list_filter = ('content_type',)
+    search_fields = ('sha256', 'file')
+    readonly_fields = ('sha256', 'size', 'content_type', 'file', 'created_at')
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'status', 'percent', 'size', 'created_by', 'created_at', 'expires_at')
+    list_filter = ('status',)
+    search_fields = ('id', 'filename', 'sha256')
+    readonly_fields = ('offset', 'parts', 'created_at', 'updated_at')
+    raw_id_fields = ('created_by', 'stored_file')
@@ -0,0 +1,183 @@
+"""
+Resized variants of profile pictures.
+
+List pages render dozens of avatars, so serving the original photo (often
+several MB) for each is wasteful. Each picture gets three sizes in WebP and
+JPEG:
+
+=========  ========================  =======
+thumbnail  64x64, cropped to square   avatars in tables
+small      fits in 160x160            cards
+medium     fits in 480x480            profile pages
+=========  ========================  =======
+
+Pictures registered with ``register_image_field()`` are stored through the
+uploads pipeline, so their storage name carries the content's SHA-256. The
+variants live at ``uploads/variants/<aa>/<sha256>/<variant>.<ext>``, which
+means ``variant_urls()`` builds URLs from the name alone: no query and no
+storage check. Variants are generated after upload by the
+``uploads.image_variants`` job. If that has not run yet, the first request
+to ``image_variant`` generates them. A URL's content never changes, so it
+is served with a one-year ``immutable`` cache lifetime that nginx and
+browsers can keep.
+
+Pictures saved before this existed keep their old names, and
+``variant_urls()`` returns None for them. ``manage.py
+generate_image_variants`` moves them into the pipeline.
+"""
+
+import io
+import logging
+import re
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import pre_save
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .models import StoredFile
+from .services import FILES_DIR, store_stream
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'uploads/variants'
+# name -> (width, height, crop to fill)
+VARIANTS = {
+    'thumbnail': (64, 64, True),
+    'small': (160, 160, False),
+    'medium': (480, 480, False),
+}
+# extension -> (Pillow format, content type, save options)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+# (model, field name) pairs passed to register_image_field()
+image_fields = []
+
+_CONTENT_NAME = re.compile(rf'^{FILES_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})\.\w+$')
+
+
+def content_sha256(name):
+    """SHA-256 encoded in a stored file's name, or None for names outside the pipeline"""
+    match = _CONTENT_NAME.match(name or '')
+    return match.group('sha256') if match else None
+
+
+def variant_name(sha256, variant, ext):
+    return f'{VARIANTS_DIR}/{sha256[:2]}/{sha256}/{variant}.{ext}'
+
+
+def variant_urls(field_file, request=None):
+    """``{variant: {'webp': url, 'jpg': url}}`` for an image field value, or None"""
+    sha256 = content_sha256(field_file.name if field_file else None)
+    if sha256 is None:
+        return None
+    urls = {}
+    for variant in VARIANTS:
+        urls[variant] = {}
+        for ext in FORMATS:
+            url = reverse('uploads:image-variant', args=[sha256, variant, ext])
+            urls[variant][ext] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def _render(image, size, crop):
+    if crop:
+        return ImageOps.fit(image, size)
+    resized = image.copy()
+    resized.thumbnail(size)
+    return resized
+
+
+def generate_variants(stored_file):
+    """Write every missing variant of ``stored_file`` (one decode); returns the names written"""
+    storage = StoredFile._meta.get_field('file').storage
+    missing = [
+        (variant, ext) for variant in VARIANTS for ext in FORMATS
+        if not storage.exists(variant_name(stored_file.sha256, variant, ext))
+    ]
+    if not missing:
+        return []
+
+    largest = max(max(width, height) for width, height, _ in VARIANTS.values())
+    with stored_file.file.open('rb') as handle:
+        image = Image.open(handle)
+        # JPEG sources decode straight at a reduced scale, which saves most of the memory
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+    written = []
+    for variant in {variant for variant, _ in missing}:
+        width, height, crop = VARIANTS[variant]
+        resized = _render(image, (width, height), crop)
+        for ext in (ext for name, ext in missing if name == variant):
+            pillow_format, _, options = FORMATS[ext]
+            buffer = io.BytesIO()
+            resized.save(buffer, pillow_format, **options)
+            name = variant_name(stored_file.sha256, variant, ext)
+            saved = storage.save(name, ContentFile(buffer.getvalue()))
+            if saved != name:
+                # Generated concurrently by another request; keep theirs
+                storage.delete(saved)
+            written.append(name)
+    return written
+
+
+def store_image(instance, field_name):
+    """Move the picture in ``instance.<field_name>`` into the pipeline; returns its ``StoredFile`` or None"""
+    field_file = getattr(instance, field_name)
+    if not field_file or content_sha256(field_file.name):
+        return None
+    if not field_file._committed:
+        stored = store_stream(field_file.file.chunks, field_file.name)
+    else:
+        storage = field_file.storage
+
+        def chunks():
+            with storage.open(field_file.name, 'rb') as handle:
+                yield from iter(lambda: handle.read(64 * 1024), b'')
+
+        stored = store_stream(chunks, field_file.name)
+    if stored.content_type not in IMAGE_TYPES:
+        return None
+    setattr(instance, field_name, stored.file.name)
+    return stored
+
+
+def queue_variants(stored_file):
+    from jobs.runner import enqueue
+
+    transaction.on_commit(lambda: enqueue('uploads.image_variants', {'sha256': stored_file.sha256}))
+
+
+def register_image_field(model, field_name):
+    """Store new pictures in ``model.<field_name>`` content-addressed and queue their variants"""
+    image_fields.append((model, field_name))
+
+    def store_on_save(sender, instance, raw=False, **kwargs):
+        field_file = getattr(instance, field_name)
+        if raw or not field_file or field_file._committed:
+            return
+        try:
+            stored = store_image(instance, field_name)
+        except Exception:
+            # The picture is still saved the old way; it just gets no variants
+            logger.warning('Could not store %s.%s through the upload pipeline', model.__name__, field_name,
+                           exc_info=True)
+            return
+        if stored is not None:
+            queue_variants(stored)
+
+    pre_save.connect(store_on_save, sender=model, weak=False,
+                     dispatch_uid=f'uploads:images:{model._meta.label_lower}.{field_name}')
@@ -0,0 +1,18 @@
+from jobs.runner import register
+
+from .services import purge_uploads
+
+
+@register('uploads.purge')
+def purge(ctx):
+    """Delete expired uploads and orphaned chunk files"""
+    return {'deleted': purge_uploads()}
+
+
+@register('uploads.image_variants')
+def image_variants(ctx, sha256):
+    """Generate the resized variants of an uploaded picture"""
+    from .images import generate_variants
+    from .models import StoredFile
+
+    return {'written': len(generate_variants(StoredFile.objects.get(sha256=sha256)))}
@@ -0,0 +1,44 @@
+"""
+Generate resized variants for every registered profile picture.
+
+    python manage.py generate_image_variants
+
+New pictures are handled on save (see uploads.images). This command covers
+pictures saved before that: each one is copied into the upload pipeline
+(the row is pointed at the content-addressed copy; the old file is left in
+place) and its variants are written. Pictures that already have variants are
+skipped, so it is safe to re-run.
+"""
+
+from django.core.management.base import BaseCommand
+
+from uploads.images import content_sha256, generate_variants, image_fields, store_image
+from uploads.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = 'Move legacy profile pictures into the upload pipeline and generate their variants.'
+
+    def handle(self, *args, **options):
+        for model, field_name in image_fields:
+            moved = generated = failed = 0
+            rows = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in rows.only('pk', field_name).iterator(chunk_size=500):
+                try:
+                    sha256 = content_sha256(getattr(instance, field_name).name)
+                    if sha256 is None:
+                        stored = store_image(instance, field_name)
+                        if stored is None:
+                            continue
+                        model._default_manager.filter(pk=instance.pk).update(**{field_name: stored.file.name})
+                        moved += 1
+                    else:
+                        stored = StoredFile.objects.get(sha256=sha256)
+                    if generate_variants(stored):
+                        generated += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{model.__name__} {instance.pk}: {e}')
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.label}.{field_name}: {moved} moved, {generated} given variants, {failed} failed'
+            ))
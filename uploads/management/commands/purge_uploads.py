@@ -0,0 +1,21 @@
+"""
+Delete expired uploads and the chunk files they left behind.
+
+    python manage.py purge_uploads
+
+Unfinished uploads expire ``UPLOAD_EXPIRY_HOURS`` after they were started.
+Run this periodically (e.g. hourly from cron, or queue the ``uploads.purge``
+job). Stored files are never deleted; documents may point at them.
+"""
+
+from django.core.management.base import BaseCommand
+
+from uploads.services import purge_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete expired uploads and orphaned upload chunks.'
+
+    def handle(self, *args, **options):
+        deleted = purge_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired uploads'))
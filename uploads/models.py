@@ -0,0 +1,71 @@
+import uuid
+from django.db import models
+from django.conf import settings
+
+
+class StoredFile(models.Model):
+    """Content-addressed file; every document field holding the same bytes points at its one copy"""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField(help_text="File size in bytes")
+    content_type = models.CharField(max_length=100, help_text="Sniffed from the file's leading bytes")
+    file = models.FileField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.file.name
+
+
+class Upload(models.Model):
+    """A chunked, resumable upload; assembled into a `StoredFile` once every byte has arrived"""
+
+    class Status(models.TextChoices):
+        UPLOADING = 'UPLOADING', 'Uploading'
+        ASSEMBLING = 'ASSEMBLING', 'Assembling'
+        COMPLETE = 'COMPLETE', 'Complete'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Declared total size in bytes")
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Optional client checksum, verified on assembly")
+
+    # Bytes received so far, and the stored parts as [offset, size, storage name]
+    offset = models.BigIntegerField(default=0)
+    parts = models.JSONField(default=list, blank=True)
+
+    stored_file = models.ForeignKey(
+        StoredFile,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='uploads'
+    )
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='uploads'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='uploads_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def percent(self):
+        if not self.size:
+            return 100
+        return min(100, round(self.offset * 100 / self.size, 1))
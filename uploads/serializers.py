@@ -0,0 +1,95 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import serializers
+
+from .images import variant_urls
+from .models import Upload
+from .services import store_uploaded_file
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    percent = serializers.FloatField(read_only=True)
+    file_url = serializers.SerializerMethodField()
+    content_type = serializers.CharField(source='stored_file.content_type', read_only=True, default=None)
+
+    class Meta:
+        model = Upload
+        fields = [
+            'id', 'status', 'filename', 'size', 'sha256', 'offset', 'percent', 'content_type',
+            'file_url', 'error', 'created_at', 'updated_at', 'expires_at',
+        ]
+        read_only_fields = ['id', 'status', 'offset', 'error', 'created_at', 'updated_at', 'expires_at']
+        extra_kwargs = {'sha256': {'required': False}}
+
+    def get_file_url(self, obj):
+        if not obj.stored_file_id:
+            return None
+        request = self.context.get('request')
+        url = obj.stored_file.file.url
+        return request.build_absolute_uri(url) if request else url
+
+
+class StoredFileFieldsMixin:
+    """
+    ``ModelSerializer`` mixin for document file fields.
+
+    Each field in ``stored_file_fields`` (``{file field: upload field}``)
+    accepts a multipart file as before or the id of the caller's completed
+    ``Upload``. Either way the field ends up pointing at the deduplicated
+    ``StoredFile``. The model field's validators (e.g. allowed extensions)
+    run against the stored name.
+    """
+
+    stored_file_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        uploads = Upload.objects.filter(status=Upload.Status.COMPLETE).select_related('stored_file')
+        if request is not None and request.user.is_authenticated:
+            uploads = uploads.filter(created_by=request.user)
+        else:
+            uploads = uploads.none()
+        for file_field, upload_field in self.stored_file_fields.items():
+            if file_field in fields:
+                fields[file_field].required = False
+            fields[upload_field] = serializers.PrimaryKeyRelatedField(
+                queryset=uploads, write_only=True, required=False,
+                help_text=f'Completed upload to use for {file_field}',
+            )
+        return fields
+
+    def stored_file_attrs(self, file_field, stored_file, filename):
+        """Extra attributes to set when ``file_field`` is filled from ``stored_file``"""
+        return {}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        model_fields = self.Meta.model._meta
+        for file_field, upload_field in self.stored_file_fields.items():
+            upload = attrs.pop(upload_field, None)
+            value = attrs.get(file_field)
+            try:
+                if upload is not None:
+                    stored, filename = upload.stored_file, upload.filename
+                elif isinstance(value, UploadedFile):
+                    stored, filename = store_uploaded_file(value), value.name
+                else:
+                    if self.instance is None and not self.partial and not model_fields.get_field(file_field).blank:
+                        raise serializers.ValidationError({file_field: f'Send a file or {upload_field}.'})
+                    continue
+                for validator in model_fields.get_field(file_field).validators:
+                    validator(File(None, name=stored.file.name))
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({file_field: e.messages})
+            attrs[file_field] = stored.file.name
+            attrs.update(self.stored_file_attrs(file_field, stored, filename))
+        return attrs
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Resized variant URLs of an image field (see uploads.images); None until the picture is in the pipeline"""
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
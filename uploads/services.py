@@ -0,0 +1,397 @@
+"""
+Shared upload pipeline for document fields.
+
+Files are stored once per content. ``StoredFile`` rows are keyed by SHA-256
+and live at ``uploads/files/<aa>/<bb>/<sha256>.<ext>``; a document field
+(``StudentDocument.document_file``, ``FacultyDocument.file``,
+``AssignmentFile.file_path``, ``Application.resume``) just holds that
+storage name, so the same PDF uploaded by 300 students is written once.
+Nothing in the project deletes document files, which is what makes sharing
+a name safe.
+
+Large files arrive as a resumable ``Upload`` (offsets work like the tus
+protocol):
+
+1. ``start_upload()``: the filename and total size are declared;
+2. ``write_part()``: one request per chunk, sent at the current ``offset``.
+   The body is streamed to storage as a part file and the offset advances.
+   A client that lost its connection asks for the offset and resumes from it;
+3. ``complete_upload()``: the parts are read once to sniff the type and
+   hash the content. Unless a ``StoredFile`` with that hash already
+   exists, they are read again and streamed into the storage backend.
+
+Small files posted as multipart go through ``store_uploaded_file()`` and
+are deduplicated the same way. Files are never read whole into memory. The
+MIME type comes from the leading bytes (``sniff_content_type``), not from
+the client's header.
+"""
+
+import codecs
+import hashlib
+import io
+import logging
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import StoredFile, Upload
+
+logger = logging.getLogger(__name__)
+
+FILES_DIR = 'uploads/files'
+PARTS_DIR = 'uploads/parts'
+SNIFF_BYTES = 8192
+READ_SIZE = 64 * 1024
+ASSEMBLY_TIMEOUT = timedelta(minutes=15)
+
+OCTET_STREAM = 'application/octet-stream'
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'PK\x05\x06', 'application/zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+)
+# Container formats share a signature; the declared extension picks the member type
+CONTAINER_TYPES = {
+    'application/zip': {
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    },
+    'application/msword': {
+        'xls': 'application/vnd.ms-excel',
+        'ppt': 'application/vnd.ms-powerpoint',
+    },
+    'text/plain': {
+        'csv': 'text/csv',
+    },
+}
+EXTENSIONS = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'application/zip': 'zip',
+    'application/vnd.rar': 'rar',
+    'application/msword': 'doc',
+    'application/vnd.ms-excel': 'xls',
+    'application/vnd.ms-powerpoint': 'ppt',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'pptx',
+    'text/plain': 'txt',
+    'text/csv': 'csv',
+}
+
+
+class UploadConflict(Exception):
+    """A chunk was sent at the wrong offset, or the upload is no longer accepting chunks"""
+
+    def __init__(self, message, upload):
+        super().__init__(message)
+        self.upload = upload
+
+
+def _extension(filename):
+    return posixpath.splitext(filename or '')[1].lstrip('.').lower()
+
+
+def _is_text(head):
+    if b'\x00' in head:
+        return False
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_content_type(head, filename=''):
+    """MIME type of a file from its first bytes; ``filename`` only tells container formats apart"""
+    content_type = OCTET_STREAM
+    for signature, candidate in SIGNATURES:
+        if head.startswith(signature):
+            content_type = candidate
+            break
+    else:
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            content_type = 'image/webp'
+        elif head and _is_text(head):
+            content_type = 'text/plain'
+    return CONTAINER_TYPES.get(content_type, {}).get(_extension(filename), content_type)
+
+
+def allowed_content_types():
+    return getattr(settings, 'UPLOAD_ALLOWED_CONTENT_TYPES', None) or tuple(EXTENSIONS)
+
+
+def max_upload_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 50 * 1024 * 1024)
+
+
+def check_size(size):
+    if size > max_upload_size():
+        raise ValidationError(f'File is larger than the {max_upload_size() // (1024 * 1024)}MB limit')
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b''
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _as_file(raw, size, name):
+    stream = File(io.BufferedReader(raw, READ_SIZE), name=name)
+    stream.size = size
+    return stream
+
+
+def content_name(sha256, content_type):
+    return f'{FILES_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{EXTENSIONS.get(content_type, "bin")}'
+
+
+def store_stream(open_chunks, filename, expected_sha256=''):
+    """The ``StoredFile`` for the bytes yielded by ``open_chunks()``.
+
+    ``open_chunks`` is called once to sniff and hash the content and, when
+    no stored file has that hash yet, a second time to stream it into
+    storage. Raises ``ValidationError`` for a disallowed type, an oversized
+    file or a checksum mismatch.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    for chunk in open_chunks():
+        if len(head) < SNIFF_BYTES:
+            head += chunk[:SNIFF_BYTES - len(head)]
+        digest.update(chunk)
+        size += len(chunk)
+        check_size(size)
+    sha256 = digest.hexdigest()
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        raise ValidationError('Checksum mismatch: the received file is not the one declared')
+    content_type = sniff_content_type(head, filename)
+    if content_type not in allowed_content_types():
+        raise ValidationError(f'Files of type {content_type} are not allowed')
+
+    existing = StoredFile.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        return existing
+
+    name = content_name(sha256, content_type)
+    storage = StoredFile._meta.get_field('file').storage
+    # A previous attempt may have written the file and died before recording it
+    if not (storage.exists(name) and storage.size(name) == size):
+        name = storage.save(name, _as_file(_ChunkReader(open_chunks()), size, name))
+    try:
+        with transaction.atomic():
+            return StoredFile.objects.create(sha256=sha256, size=size, content_type=content_type, file=name)
+    except IntegrityError:
+        # Another request stored the same content first
+        stored = StoredFile.objects.get(sha256=sha256)
+        if stored.file.name != name:
+            storage.delete(name)
+        return stored
+
+
+def store_uploaded_file(uploaded_file):
+    """``StoredFile`` for a multipart ``UploadedFile`` (read in chunks, never whole)"""
+    check_size(uploaded_file.size or 0)
+    return store_stream(uploaded_file.chunks, uploaded_file.name)
+
+
+def start_upload(user, filename, size, sha256=''):
+    """New resumable ``Upload`` of ``size`` bytes; it expires after ``UPLOAD_EXPIRY_HOURS``"""
+    if size < 0:
+        raise ValidationError('Size must not be negative')
+    check_size(size)
+    expiry = timedelta(hours=getattr(settings, 'UPLOAD_EXPIRY_HOURS', 24))
+    return Upload.objects.create(
+        created_by=user, filename=posixpath.basename(filename)[:255], size=size, sha256=sha256.lower(),
+        expires_at=timezone.now() + expiry,
+    )
+
+
+class _LimitedReader(io.RawIOBase):
+    """At most ``limit`` bytes of ``stream``, counting what was read"""
+
+    def __init__(self, stream, limit):
+        self._stream = stream
+        self.remaining = limit
+        self.read_bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        data = self._stream.read(min(len(buffer), self.remaining))
+        n = len(data)
+        buffer[:n] = data
+        self.remaining -= n
+        self.read_bytes += n
+        return n
+
+
+def write_part(upload, offset, stream, length):
+    """Append ``length`` bytes read from ``stream`` at ``offset``; returns the updated upload.
+
+    The body is streamed to a part file before the upload row is touched, so
+    the row is only locked for the bookkeeping. Raises ``UploadConflict`` if
+    ``offset`` is not the current offset (e.g. a retried chunk that did
+    arrive), and ``ValidationError`` for a bad length.
+    """
+    if upload.status != Upload.Status.UPLOADING:
+        raise UploadConflict(f'Upload is {upload.get_status_display().lower()}', upload)
+    if offset != upload.offset:
+        raise UploadConflict(f'Expected offset {upload.offset}', upload)
+    max_chunk = getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024)
+    if length <= 0 or length > max_chunk:
+        raise ValidationError(f'Chunks must be between 1 byte and {max_chunk} bytes')
+    if offset + length > upload.size:
+        raise ValidationError(f'Chunk ends past the declared size of {upload.size} bytes')
+
+    reader = _LimitedReader(stream, length)
+    name = default_storage.save(f'{PARTS_DIR}/{upload.pk}/{offset:012d}', _as_file(reader, length, 'part'))
+    if reader.read_bytes != length:
+        default_storage.delete(name)
+        raise ValidationError(f'Chunk ended after {reader.read_bytes} of {length} bytes')
+
+    with transaction.atomic():
+        locked = Upload.objects.select_for_update().get(pk=upload.pk)
+        if locked.status != Upload.Status.UPLOADING or locked.offset != offset:
+            default_storage.delete(name)
+            raise UploadConflict(f'Expected offset {locked.offset}', locked)
+        locked.parts.append([offset, length, name])
+        locked.offset = offset + length
+        locked.save(update_fields=['parts', 'offset', 'updated_at'])
+    return locked
+
+
+def _iter_parts(parts):
+    for _, _, name in parts:
+        with default_storage.open(name, 'rb') as handle:
+            yield from iter(lambda: handle.read(READ_SIZE), b'')
+
+
+def _delete_parts(parts):
+    for _, _, name in parts:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            logger.warning('Could not delete upload part %s', name, exc_info=True)
+
+
+def complete_upload(upload):
+    """Assemble a fully received upload into its ``StoredFile`` (idempotent once complete)"""
+    now = timezone.now()
+    claimed = Upload.objects.filter(
+        Q(status=Upload.Status.UPLOADING) | Q(status=Upload.Status.ASSEMBLING, updated_at__lt=now - ASSEMBLY_TIMEOUT),
+        pk=upload.pk, offset=F('size'),
+    ).update(status=Upload.Status.ASSEMBLING, updated_at=now)
+    upload.refresh_from_db()
+    if not claimed:
+        if upload.status == Upload.Status.COMPLETE:
+            return upload.stored_file
+        if upload.status == Upload.Status.UPLOADING:
+            raise UploadConflict(f'Only {upload.offset} of {upload.size} bytes received', upload)
+        raise UploadConflict(f'Upload is {upload.get_status_display().lower()}', upload)
+
+    try:
+        stored = store_stream(lambda: _iter_parts(upload.parts), upload.filename, upload.sha256)
+    except ValidationError as e:
+        upload.status = Upload.Status.FAILED
+        upload.error = '; '.join(e.messages)
+        upload.save(update_fields=['status', 'error', 'updated_at'])
+        _delete_parts(upload.parts)
+        raise
+    except Exception:
+        # Storage hiccup: leave the parts so the client can retry completion
+        upload.status = Upload.Status.UPLOADING
+        upload.save(update_fields=['status', 'updated_at'])
+        raise
+
+    parts, upload.parts = upload.parts, []
+    upload.status = Upload.Status.COMPLETE
+    upload.stored_file = stored
+    upload.save(update_fields=['status', 'stored_file', 'parts', 'updated_at'])
+    _delete_parts(parts)
+    return stored
+
+
+def discard_upload(upload):
+    _delete_parts(upload.parts)
+    upload.delete()
+
+
+def purge_uploads(now=None):
+    """Delete expired uploads and their parts, plus parts (older than an hour) left by interrupted chunk writes.
+
+    Stored files are kept; they may be referenced by documents. Returns the
+    number of uploads deleted.
+    """
+    now = now or timezone.now()
+    expired = list(Upload.objects.filter(expires_at__lt=now))
+    for upload in expired:
+        discard_upload(upload)
+
+    try:
+        directories, _ = default_storage.listdir(PARTS_DIR)
+    except (FileNotFoundError, NotImplementedError):
+        directories = []
+    live = {
+        str(pk) for pk in Upload.objects.filter(pk__in=[d for d in directories if _is_uuid(d)]).values_list('pk', flat=True)
+    }
+    known = {name for parts in Upload.objects.filter(pk__in=live).values_list('parts', flat=True) for _, _, name in parts}
+    for directory in directories:
+        _, files = default_storage.listdir(f'{PARTS_DIR}/{directory}')
+        for filename in files:
+            name = f'{PARTS_DIR}/{directory}/{filename}'
+            if (directory not in live or name not in known) and _older_than(name, now - timedelta(hours=1)):
+                default_storage.delete(name)
+    return len(expired)
+
+
+def _older_than(name, when):
+    try:
+        return default_storage.get_modified_time(name) < when
+    except (FileNotFoundError, NotImplementedError):
+        return False
+
+
+def _is_uuid(value):
+    try:
+        Upload._meta.pk.to_python(value)
+    except ValidationError:
+        return False
+    return True
@@ -0,0 +1,30 @@
+from django import template
+from django.utils.html import format_html
+
+from uploads.images import VARIANTS, variant_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(field_file, variant='thumbnail', alt='', css_class=''):
+    """
+    ``<picture>`` for an image field at one of the ``uploads.images`` sizes.
+
+    Pictures without variants fall back to the original; an empty field
+    renders nothing.
+    """
+    if not field_file:
+        return ''
+    width, height, _ = VARIANTS[variant]
+    urls = variant_urls(field_file)
+    if urls is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="max-width: {}px; max-height: {}px" loading="lazy">',
+            field_file.url, alt, css_class, width, height,
+        )
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        urls[variant]['webp'], urls[variant]['jpg'], alt, css_class,
+    )
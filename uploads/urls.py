@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from .views import UploadViewSet, image_variant
+
+app_name = 'uploads'
+
+router = SimpleRouter()
+router.register(r'', UploadViewSet, basename='upload')
+
+urlpatterns = [
+    path('images/<slug:sha256>/<slug:variant>.<slug:ext>', image_variant, name='image-variant'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,114 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .images import FORMATS, IMAGE_TYPES, VARIANTS, generate_variants, variant_name
+from .models import StoredFile, Upload
+from .serializers import UploadSerializer
+from .services import UploadConflict, complete_upload, discard_upload, start_upload, write_part
+
+
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                    mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Chunked, resumable uploads (see uploads.services).
+
+    1. ``POST /`` with ``filename``, ``size`` and optionally ``sha256``
+    2. ``PUT /{id}/chunk/`` with the raw bytes and an ``Upload-Offset``
+       header, repeated until ``offset == size``. A chunk sent at the wrong
+       offset gets 409 and the current offset; ``GET /{id}/`` also reports it
+       so an interrupted upload can resume.
+    3. ``POST /{id}/complete/`` assembles the file. The completed upload's id
+       is then accepted by document endpoints (e.g. ``upload_id`` on student
+       documents).
+    """
+
+    queryset = Upload.objects.select_related('stored_file')
+    serializer_class = UploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        return super().get_queryset().filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        try:
+            serializer.instance = start_upload(
+                self.request.user, data['filename'], data['size'], data.get('sha256', '')
+            )
+        except DjangoValidationError as e:
+            raise ValidationError({'size': e.messages})
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+
+    def _conflict(self, error):
+        return Response(
+            {**self.get_serializer(error.upload).data, 'error': str(error)},
+            status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(error.upload.offset)}
+        )
+
+    @action(detail=True, methods=['put', 'patch'])
+    def chunk(self, request, pk=None):
+        """Append the request body at ``Upload-Offset``; the body is streamed, never parsed"""
+        upload = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise ValidationError({'Upload-Offset': 'An integer Upload-Offset header is required'})
+        try:
+            upload = write_part(upload, offset, request.stream, length)
+        except UploadConflict as e:
+            return self._conflict(e)
+        except DjangoValidationError as e:
+            raise ValidationError({'chunk': e.messages})
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Assemble the received chunks into the stored file"""
+        upload = self.get_object()
+        try:
+            complete_upload(upload)
+        except UploadConflict as e:
+            return self._conflict(e)
+        except DjangoValidationError as e:
+            raise ValidationError({'file': e.messages})
+        return Response(self.get_serializer(upload).data)
+
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def _variant_etag(request, sha256, variant, ext):
+    return f'{sha256}-{variant}-{ext}'
+
+
+@require_safe
+@condition(etag_func=_variant_etag)
+def image_variant(request, sha256, variant, ext):
+    """
+    A resized picture (see uploads.images), generated on first request.
+
+    The URL is derived from the source's content hash, so the response never
+    changes and is cacheable forever, like any other public media file.
+    """
+    if variant not in VARIANTS or ext not in FORMATS:
+        raise Http404('Unknown image variant')
+    storage = StoredFile._meta.get_field('file').storage
+    name = variant_name(sha256, variant, ext)
+    if not storage.exists(name):
+        stored = get_object_or_404(StoredFile, sha256=sha256, content_type__in=IMAGE_TYPES)
+        generate_variants(stored)
+    response = FileResponse(storage.open(name, 'rb'), content_type=FORMATS[ext][1])
+    response['Cache-Control'] = IMMUTABLE
+    return response